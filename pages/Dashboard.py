@@ -13,6 +13,11 @@ from io import BytesIO
 from PyPDF2 import PdfMerger
 from utils.get_connection import init_supabase_connection
 from utils.auth import require_login
+from utils.data_store import get_tables
+from utils import column_manifest
+from utils.academic_rules import get_thresholds
+from utils.aggregates import aggregate, run_aggregate
+from utils.search_index import get_search_index
 
 
 require_login()
@@ -70,28 +75,19 @@ st.markdown("""
 # DATA LOADING & CACHING
 # ========================
 
-@st.cache_data(ttl=300)  
+# Tabel dilayani dari DataStore bersama (tanpa salinan per akses), jadi
+# tidak lagi dibungkus st.cache_data di halaman ini.
 def load_data():
+    """Memastikan snapshot tabel Dashboard tersedia; mengembalikan mahasiswas dan info pemuatan."""
     try:
         supabase = init_supabase_connection()
         if not supabase:
-            return None, None, None, None
-            
-        df_mhs = pd.DataFrame(supabase.table("mahasiswas").select("*").execute().data)
-        df_status = pd.DataFrame(supabase.table("status_akademik_semesters").select("*").execute().data)
-        df_bea = pd.DataFrame(supabase.table("penerimaan_beasiswas").select("*").execute().data)
-        df_semester = pd.DataFrame(supabase.table("semesters").select("*").execute().data)
-        
-        # Data preprocessing
-        if not df_status.empty and 'ipk' in df_status.columns:
-            df_status['ipk'] = pd.to_numeric(df_status['ipk'], errors='coerce')
-        if not df_mhs.empty and 'tahun_masuk' in df_mhs.columns:
-            df_mhs['tahun_masuk'] = pd.to_numeric(df_mhs['tahun_masuk'], errors='coerce')
-            
-        return df_mhs, df_status, df_bea, df_semester
+            return None, {}
+        frames, stats = get_tables(supabase, list(column_manifest.DASHBOARD))
+        return frames["mahasiswas"], stats
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return None, None, None, None
+        return None, {}
 
 # ========================
 # UTILITY FUNCTIONS
@@ -99,20 +95,6 @@ def load_data():
 def safe_divide(a, b):
     return a / b if b != 0 else 0
 
-def get_grade_category(ipk):
-    if pd.isna(ipk):
-        return "Tidak Ada Data"
-    elif ipk >= 3.5:
-        return "Cumlaude (≥3.5)"
-    elif ipk >= 3.0:
-        return "Sangat Baik (3.0-3.49)"
-    elif ipk >= 2.5:
-        return "Baik (2.5-2.99)"
-    elif ipk >= 2.0:
-        return "Cukup (2.0-2.49)"
-    else:
-        return "Kurang (<2.0)"
-
 def create_gauge_chart(value, title, max_val=4.0, threshold_colors=None):
     if threshold_colors is None:
         threshold_colors = [
@@ -149,6 +131,22 @@ def create_gauge_chart(value, title, max_val=4.0, threshold_colors=None):
     fig.update_layout(height=300)
     return fig
 
+def bar_chart(df, x, y, title, color, labels=None, **trace):
+    """
+    Grafik batang langsung dengan graph_objects, setara `px.bar` satu warna.
+    Dipakai untuk grafik yang ikut filter karena jauh lebih cepat dibangun.
+    """
+    labels = labels or {}
+    fig = go.Figure(go.Bar(
+        x=df[x],
+        y=df[y],
+        marker_color=color,
+        hovertemplate=f"{labels.get(x, x)}=%{{x}}<br>{labels.get(y, y)}=%{{y}}<extra></extra>",
+        **trace
+    ))
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+    return fig
+
 def tampilkan_rekomendasi(
     kategori: str,
     prioritas: str,
@@ -202,96 +200,515 @@ def save_charts_to_pdf(figures):
 
 
 # ========================
-# MAIN APPLICATION
+# SEKSI ANALISIS (LAZY)
 # ========================
-def main():
-    # Load data with progress bar
-    with st.spinner('Memuat data dari database...'):
-        df_mhs, df_status, df_bea, df_semester = load_data()
-    
-    if df_mhs is None:
-        st.error("Gagal memuat data. Periksa koneksi database.")
-        return
-    
-    # Check if data is empty
-    if df_mhs.empty:
-        st.warning("Tidak ada data mahasiswa yang tersedia.")
-        return
-    
-    # Data preparation
-    if not df_status.empty:
-        latest_status = df_status.sort_values("tanggal_evaluasi").drop_duplicates("mahasiswa_id", keep="last")
-        df_joined = latest_status.merge(df_mhs, on="mahasiswa_id", how="left")
-        if 'ipk' in df_joined.columns:
-            df_joined["ipk"] = pd.to_numeric(df_joined["ipk"], errors='coerce')
-    else:
-        df_joined = df_mhs.copy()
-        df_joined['ipk'] = np.nan
-    
-    # Add grade categories
-    df_joined['kategori_ipk'] = df_joined['ipk'].apply(get_grade_category)
+# Tabel sumber grafik yang mengikuti filter sidebar
+DASHBOARD_SOURCES = ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"]
+
+# Registry seksi tab: {label: fungsi render(ctx)}. Hanya tab yang aktif yang dijalankan.
+SECTIONS = {}
+
+
+def section(label):
+    """Mendaftarkan fungsi render sebuah tab analisis."""
+    def register(func):
+        SECTIONS[label] = func
+        return func
+    return register
+
+
+# Grafik tiap seksi didaftarkan sebagai agregat sehingga dibangun sekali per
+# (versi snapshot, state filter) dan hanya saat tabnya dibuka.
+@aggregate("grafik_distribusi", DASHBOARD_SOURCES)
+def grafik_distribusi(frames, filters, run):
+    filtered = run("mahasiswa_terfilter", filters)
+    figures = {}
+
+    # Distribusi Program Studi
+    if "jurusan" in filtered.columns and not filtered.empty:
+        jurusan_counts = run("jumlah_per_prodi", filters)
+        fig_bar = bar_chart(
+            jurusan_counts.head(3),
+            x="count", 
+            y="jurusan",
+            orientation='h',
+            title="📚 3 Program Studi dengan Mahasiswa Terbanyak",
+            labels={"jurusan": "", "count": "Jumlah Mahasiswa"},
+            color="#4CAF50"
+        )
+        fig_bar.update_layout(
+            height=400,
+            xaxis_title=None,
+            yaxis_title=None,
+            showlegend=False,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        figures["prodi"] = fig_bar
+
+    # Distribusi IPK
+    # Histogram dihitung sebagai bin jadi; grafik hanya menerima 20 baris
+    histogram = run("histogram_ipk", filters)
+    if histogram is not None:
+        avg_ipk = histogram["rata_rata"]
+        fig_hist = bar_chart(
+            histogram["bins"],
+            x="ipk",
+            y="jumlah",
+            title="📊 Sebaran IPK Mahasiswa",
+            labels={"ipk": "IPK", "jumlah": "Jumlah Mahasiswa"},
+            color="#2196F3",
+            width=histogram["bins"]["lebar"]
+        )
+        fig_hist.add_vline(
+            x=avg_ipk, 
+            line_dash="dash", 
+            line_color="red",
+            annotation_text=f"Rata-rata: {avg_ipk:.2f}",
+            annotation_position="top right"
+        )
+        fig_hist.update_layout(
+            height=400,
+            xaxis_title=None,
+            yaxis_title=None,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        figures["histogram"] = fig_hist
+
+    # Distribusi Kategori IPK
+    if not filtered['kategori_ipk'].isna().all():
+        kategori_counts = run("jumlah_per_kategori_ipk", filters)
+        fig_pie = go.Figure(go.Pie(
+            values=kategori_counts.values,
+            labels=kategori_counts.index,
+            marker_colors=px.colors.qualitative.Pastel,
+            textinfo='percent+label',
+            pull=[0.05]*len(kategori_counts)
+        ))
+        fig_pie.update_layout(
+            title="🎓 Persentase Mahasiswa Berdasarkan Kategori IPK",
+            height=400,
+            showlegend=False,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        figures["kategori"] = fig_pie
+    return figures
+
+
+@section("📊 Distribusi")
+def render_distribusi(ctx):
+    figures = run_aggregate(ctx["supabase"], "grafik_distribusi", ctx["filters"])
+    viz_col1, viz_col2 = st.columns(2)
+    with viz_col1:
+        if "prodi" in figures:
+            st.plotly_chart(figures["prodi"], use_container_width=True)
+    with viz_col2:
+        if "histogram" in figures:
+            st.plotly_chart(figures["histogram"], use_container_width=True)
+    if "kategori" in figures:
+        st.plotly_chart(figures["kategori"], use_container_width=True)
+
+
+# Tren tidak mengikuti filter sidebar, jadi dijalankan tanpa state filter
+@aggregate("grafik_tren", ["mahasiswas", "status_akademik_semesters", "semesters"])
+def grafik_tren(frames, filters, run):
+    figures = {"masuk": None, "ipk_semester": None}
+
+    # Trend penerimaan mahasiswa per tahun
+    if "tahun_masuk" in frames["mahasiswas"].columns:
+        trend_masuk = run("tren_mahasiswa_masuk")
+        fig_masuk = px.bar(
+            trend_masuk,
+            x="tahun_masuk",
+            y="jumlah",
+            title="🗓️ Jumlah Mahasiswa Masuk per Tahun",
+            labels={"tahun_masuk": "Tahun Masuk", "jumlah": "Jumlah Mahasiswa"},
+            text="jumlah",
+            color_discrete_sequence=["#1f77b4"]
+        )
+        fig_masuk.update_traces(textposition='outside')
+        fig_masuk.update_layout(height=450)
+        figures["masuk"] = fig_masuk
+
+    # Trend IPK rata-rata per semester
+    ipk_per_sem = run("rata_ipk_per_semester")
+    if ipk_per_sem is not None:
+        fig_ipk = px.line(
+            ipk_per_sem,
+            x="nama_semester",
+            y="ipk",
+            title="📊 Rata-rata IPK per Semester",
+            markers=True,
+            labels={"nama_semester": "Semester", "ipk": "Rata-rata IPK"},
+            text=ipk_per_sem["ipk"].round(2)
+        )
+        fig_ipk.update_traces(textposition="top center", line=dict(color="#2ca02c", width=3))
+        fig_ipk.add_hline(
+            y=ipk_per_sem['ipk'].mean(),
+            line_dash="dot",
+            annotation_text=f"Rata-rata Keseluruhan: {ipk_per_sem['ipk'].mean():.2f}",
+            annotation_position="top left"
+        )
+        fig_ipk.update_layout(height=450)
+        figures["ipk_semester"] = fig_ipk
+    return figures
+
+
+@section("📈 Trend")
+def render_tren(ctx):
+    st.markdown("### 📈 Trend Mahasiswa dan Performa Akademik")
+    figures = run_aggregate(ctx["supabase"], "grafik_tren")
+
+    trend_col1, trend_col2 = st.columns(2)
+    with trend_col1:
+        if figures["masuk"] is not None:
+            st.plotly_chart(figures["masuk"], use_container_width=True)
+        else:
+            st.info("Data tahun masuk tidak tersedia.")
+    with trend_col2:
+        if figures["ipk_semester"] is not None:
+            st.plotly_chart(figures["ipk_semester"], use_container_width=True)
+        else:
+            st.info("Data IPK per semester tidak tersedia.")
+
+
+@aggregate("grafik_ranking", DASHBOARD_SOURCES)
+def grafik_ranking(frames, filters, run):
+    # Kunci tidak ada = grafik tidak ditampilkan; None = datanya belum cukup
+    filtered = run("mahasiswa_terfilter", filters)
+    figures = {}
+
+    # Top 3 program studi dengan rata-rata IPK tertinggi
+    if "jurusan" in filtered.columns and 'ipk' in filtered.columns:
+        prodi_stats = run("ranking_ipk_prodi", filters)
+        figures["ipk"] = None
+        if not prodi_stats.empty:
+            fig_ipk_rank = bar_chart(
+                prodi_stats,
+                x='jurusan',
+                y='avg_ipk',
+                title='🏅 Top 3 Program Studi dengan Rata-rata IPK Tertinggi',
+                labels={'jurusan': 'Program Studi', 'avg_ipk': 'Rata-rata IPK'},
+                text=prodi_stats['avg_ipk'],
+                color='#1f77b4',
+                texttemplate='%{text:.2f}',
+                textposition='outside'
+            )
+            fig_ipk_rank.update_layout(
+                xaxis_tickangle=-30,
+                yaxis_range=[0, 4],
+                height=500
+            )
+            figures["ipk"] = fig_ipk_rank
+
+    bea_counts = run("ranking_beasiswa_prodi", filters)
+    if bea_counts is not None and "jurusan" in filtered.columns:
+        figures["beasiswa"] = None
+        if not bea_counts.empty:
+            fig_bea_rank = bar_chart(
+                bea_counts,
+                x="jurusan",
+                y="penerima_beasiswa",
+                title="🎖️ Top 3 Program Studi dengan Penerima Beasiswa Terbanyak",
+                labels={"jurusan": "Program Studi", "penerima_beasiswa": "Jumlah Penerima"},
+                text=bea_counts['penerima_beasiswa'],
+                color='#2ca02c',
+                texttemplate='%{text}',
+                textposition='outside'
+            )
+            fig_bea_rank.update_layout(
+                xaxis_tickangle=-30,
+                height=500
+            )
+            figures["beasiswa"] = fig_bea_rank
+    return figures
+
+
+@section("🏆 Ranking")
+def render_ranking(ctx):
+    st.markdown("### 🏆 Ranking Program Studi")
+    figures = run_aggregate(ctx["supabase"], "grafik_ranking", ctx["filters"])
+
+    rank_col1, rank_col2 = st.columns(2)
+    with rank_col1:
+        if figures.get("ipk") is not None:
+            st.plotly_chart(figures["ipk"], use_container_width=True)
+        elif "ipk" in figures:
+            st.info("Belum cukup data untuk menampilkan ranking IPK per prodi.")
+    with rank_col2:
+        if figures.get("beasiswa") is not None:
+            st.plotly_chart(figures["beasiswa"], use_container_width=True)
+        elif "beasiswa" in figures:
+            st.info("Tidak ada data penerima beasiswa yang bisa ditampilkan.")
+
+
+@aggregate("grafik_lanjutan", DASHBOARD_SOURCES)
+def grafik_lanjutan(frames, filters, run):
+    filtered = run("mahasiswa_terfilter", filters)
+    figures = {"beasiswa": None, "korelasi": None, "statistik": None}
+
+    # === A. Analisis Korelasi IPK dan Beasiswa (Bar Chart) ===
+    ipk_beasiswa = run("ipk_per_status_beasiswa", filters)
+    if ipk_beasiswa is not None and 'ipk' in filtered.columns:
+        fig_corr_bar = bar_chart(
+            ipk_beasiswa["rata_rata"],
+            x="Status",
+            y="ipk",
+            text=ipk_beasiswa["rata_rata"]["ipk"],
+            title="🎓 Rata-rata IPK Berdasarkan Status Beasiswa",
+            labels={"Status": "Penerima Beasiswa", "ipk": "Rata-rata IPK"},
+            color="#1f77b4",
+            texttemplate='%{text:.2f}',
+            textposition='outside'
+        )
+        fig_corr_bar.update_layout(height=400)
+        figures["beasiswa"] = fig_corr_bar
+        figures["korelasi"] = ipk_beasiswa["korelasi"]
+
+    # === B. Statistik Ringkasan IPK (Bar Chart) ===
+    df_stat = run("statistik_ipk", filters)
+    if df_stat is not None:
+        fig_stat_bar = bar_chart(
+            df_stat,
+            x="Statistik",
+            y="Nilai",
+            text=df_stat["Nilai"],
+            title="📊 Ringkasan Statistik IPK Mahasiswa",
+            color="#2ca02c",
+            texttemplate='%{text:.2f}',
+            textposition='outside'
+        )
+        fig_stat_bar.update_layout(height=400)
+        figures["statistik"] = fig_stat_bar
+    return figures
+
+
+@section("🔍 Analisis Lanjutan")
+def render_lanjutan(ctx):
+    st.markdown("### 🔍 Analisis Lanjutan Mahasiswa")
+    figures = run_aggregate(ctx["supabase"], "grafik_lanjutan", ctx["filters"])
+
+    analysis_col1, analysis_col2 = st.columns(2)
+    with analysis_col1:
+        if figures["beasiswa"] is not None:
+            st.plotly_chart(figures["beasiswa"], use_container_width=True)
+
+            # Korelasi numerik (dengan interpretasi)
+            corr_val = figures["korelasi"]
+            st.caption(f"**Koefisien Korelasi**: {corr_val:.3f}")
+            if abs(corr_val) >= 0.5:
+                st.success("✅ Korelasi kuat: IPK dan beasiswa memiliki hubungan yang jelas.")
+            elif abs(corr_val) >= 0.3:
+                st.warning("⚠️ Korelasi sedang: Ada kecenderungan hubungan antara IPK dan beasiswa.")
+            else:
+                st.info("ℹ️ Korelasi lemah: Tidak ada hubungan signifikan antara IPK dan beasiswa.")
+    with analysis_col2:
+        if figures["statistik"] is not None:
+            st.plotly_chart(figures["statistik"], use_container_width=True)
+            st.caption("Statistik ringkasan memberikan gambaran sebaran performa akademik.")
+        else:
+            st.info("Tidak ada data IPK valid untuk dianalisis.")
+
+
+# Fragment tersendiri: mengetik di kotak pencarian hanya merender ulang tabel detail
+@section("📋 Data Detail")
+@st.fragment
+def render_detail(ctx):
+    filtered, metrics = ctx["filtered"], ctx["metrics"]
+    st.markdown("### 📋 Detail Data Mahasiswa")
+    
+    # Search functionality
+    search_term = st.text_input("🔍 Cari mahasiswa (nama/NIM):", placeholder="Masukkan nama atau NIM...")
+    
+    # Prepare display data: hasil agregat dipakai bersama, jadi salin dangkal
+    # setelah pencarian saja sebelum menambah kolom (tanpa menyalin data)
+    display_df = filtered
+    
+    if search_term:
+        # Indeks NIM/nama dibangun sekali per snapshot mahasiswas
+        search_index = get_search_index("mahasiswas")
+        display_df = display_df[search_index.mask(search_term, display_df['mahasiswa_id'])]
+    display_df = display_df.copy(deep=False)
+    
+    # Add scholarship status
+    if metrics["penerima_beasiswa"] is not None:
+        display_df['status_beasiswa'] = display_df['penerima_beasiswa'].map({True: '✅ Ya', False: '❌ Tidak'})
+    
+    # Select columns to display
+    display_columns = []
+    available_columns = display_df.columns.tolist()
+    
+    important_cols = ['nama_lengkap', 'nim', 'jurusan', 'tahun_masuk', 'status_mahasiswa', 'ipk', 'kategori_ipk', 'status_beasiswa']
+    for col in important_cols:
+        if col in available_columns:
+            display_columns.append(col)
+    
+    if display_columns:
+        st.dataframe(
+            display_df[display_columns].head(100),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        st.info(f"Menampilkan {min(len(display_df), 100)} dari {len(display_df)} mahasiswa")
     
-    # ========================
-    # SIDEBAR FILTERS
-    # ========================
-    st.sidebar.title("🔍 Filter Data")
+    # Download options
+    col_down1, col_down2 = st.columns(2)
+    with col_down1:
+        if st.button("📥 Download Data Terfilter (CSV)"):
+            csv = display_df.to_csv(index=False)
+            st.download_button(
+                label="Download CSV",
+                data=csv,
+                file_name=f"sidama_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
     
+    with col_down2:
+        if st.button("📊 Download Laporan Excel"):
+            # This would require additional implementation for Excel export
+            st.info("Fitur ekspor Excel akan segera tersedia!")
+
+
+@aggregate("daftar_rekomendasi", DASHBOARD_SOURCES)
+def daftar_rekomendasi(frames, filters, run):
+    filtered = run("mahasiswa_terfilter", filters)
+    thresholds = get_thresholds()
+    rendah_ipk = filtered[filtered['ipk'] < thresholds['ipk_risiko']] if 'ipk' in filtered.columns else pd.DataFrame()
+    nonaktif = filtered[filtered['status_mahasiswa'] != "Aktif"] if 'status_mahasiswa' in filtered.columns else pd.DataFrame()
+    belum_dapat_bea = pd.DataFrame()
+    if not frames["penerimaan_beasiswas"].empty and 'mahasiswa_id' in filtered.columns:
+        ipk_3up = filtered[filtered["ipk"] >= thresholds["ipk_cumlaude"]] if 'ipk' in filtered.columns else pd.DataFrame()
+        belum_dapat_bea = ipk_3up[~ipk_3up["penerima_beasiswa"]]
+    return {"rendah_ipk": rendah_ipk, "belum_dapat_bea": belum_dapat_bea, "nonaktif": nonaktif}
+
+
+@section("💡 Rekomendasi")
+def render_rekomendasi(ctx):
+    st.markdown("### 💡 Rekomendasi Tindakan")
+    daftar = run_aggregate(ctx["supabase"], "daftar_rekomendasi", ctx["filters"])
+
+    # Rekomendasi 1: Akademik
+    tampilkan_rekomendasi(
+        kategori="📕 Akademik: Bimbingan akademik intensif",
+        prioritas="Tinggi",
+        deskripsi=f"Dengan {len(daftar['rendah_ipk'])} mahasiswa ber-IPK rendah, perlu program mentoring dan remedial.",
+        df_mahasiswa=daftar["rendah_ipk"],
+        file_name="mahasiswa_ipk_rendah.csv",
+        warna="#dc3545"
+    )
+
+    # Rekomendasi 2: Beasiswa
+    tampilkan_rekomendasi(
+        kategori="🎓 Beasiswa: Sosialisasi program beasiswa",
+        prioritas="Sedang",
+        deskripsi=f"Ada {len(daftar['belum_dapat_bea'])} mahasiswa ber-IPK ≥ 3.0 yang belum menerima beasiswa.",
+        df_mahasiswa=daftar["belum_dapat_bea"],
+        file_name="mahasiswa_belum_beasiswa.csv",
+        warna="#ffc107"
+    )
+
+    # Rekomendasi 3: Retensi
+    tampilkan_rekomendasi(
+        kategori="🔁 Retensi: Program reengagement mahasiswa non-aktif",
+        prioritas="Tinggi",
+        deskripsi=f"Investigasi dan pendekatan kepada {len(daftar['nonaktif'])} mahasiswa non-aktif diperlukan.",
+        df_mahasiswa=daftar["nonaktif"],
+        file_name="mahasiswa_nonaktif.csv",
+        warna="#dc3545"
+    )
+
+    # Rekomendasi 4: Early Warning Mahasiswa Potensi Terlambat
+    # st.markdown("### ⏰ Mahasiswa Berpotensi Terlambat Lulus")
+
+    # now = datetime.now()
+    # threshold_year = now.year - 4
+    # potensi_terlambat = filtered[
+    #     (filtered['ipk'] < 2.5) & (filtered['tahun_masuk'] <= threshold_year)
+    # ] if 'ipk' in filtered.columns and 'tahun_masuk' in filtered.columns else pd.DataFrame()
+
+    # tampilkan_rekomendasi(
+    #     kategori="⏰ Potensi Terlambat Lulus",
+    #     prioritas="Tinggi",
+    #     deskripsi=f"Terdapat {len(potensi_terlambat)} mahasiswa dengan IPK < 2.5 dan tahun masuk ≤ {threshold_year}.",
+    #     df_mahasiswa=potensi_terlambat,
+    #     file_name="mahasiswa_terlambat_lulus.csv",
+    #     warna="#6f42c1"
+    # )
+
+
+FILTER_KEYS = ("filter_prodi", "filter_tahun", "filter_status", "filter_ipk")
+
+
+def reset_filters():
+    for key in FILTER_KEYS:
+        st.session_state.pop(key, None)
+
+
+# Filter, agregat dan tampilan yang bergantung filter berada dalam satu fragment:
+# mengubah filter (widgetnya ditulis ke sidebar) hanya menjalankan ulang fungsi ini,
+# bukan pemuatan data dan bagian halaman lainnya.
+@st.fragment
+def dashboard_view():
+    supabase = init_supabase_connection()
+    options = run_aggregate(supabase, "opsi_filter")
+
     # Reset filters button
-    if st.sidebar.button("🔄 Reset Semua Filter"):
-        st.rerun()
+    st.sidebar.button("🔄 Reset Semua Filter", on_click=reset_filters)
     
     # Program Studi filter
-    available_prodi = df_mhs["jurusan"].dropna().unique() if "jurusan" in df_mhs.columns else []
     selected_prodi = st.sidebar.multiselect(
         "📚 Program Studi", 
-        options=sorted(available_prodi),
+        options=options["jurusan"],
+        key="filter_prodi",
         help="Pilih satu atau beberapa program studi"
     )
     
     # Tahun Masuk filter
-    available_tahun = df_mhs["tahun_masuk"].dropna().unique() if "tahun_masuk" in df_mhs.columns else []
-    if len(available_tahun) > 0:
+    if len(options["tahun_masuk"]) > 0:
         selected_tahun = st.sidebar.multiselect(
             "📅 Tahun Masuk", 
-            options=sorted(available_tahun),
+            options=options["tahun_masuk"],
+            key="filter_tahun",
             help="Filter berdasarkan tahun masuk"
         )
     else:
         selected_tahun = []
     
     # Status Mahasiswa filter
-    available_status = df_mhs["status_mahasiswa"].dropna().unique() if "status_mahasiswa" in df_mhs.columns else []
     selected_status = st.sidebar.multiselect(
         "👤 Status Mahasiswa", 
-        options=sorted(available_status),
+        options=options["status_mahasiswa"],
+        key="filter_status",
         help="Filter berdasarkan status aktif/tidak aktif"
     )
     
+    # Semua grafik dihitung lewat agregat bernama yang di-cache per state filter
+    filters = {
+        "prodi": tuple(sorted(selected_prodi)),
+        "tahun": tuple(sorted(selected_tahun)),
+        "status": tuple(sorted(selected_status)),
+    }
+    
     # IPK Range filter
-    valid_ipk = df_joined['ipk'].dropna()
-    if not valid_ipk.empty:
-        min_ipk, max_ipk = float(valid_ipk.min()), float(valid_ipk.max())
+    ipk_bounds = run_aggregate(supabase, "rentang_ipk")
+    if ipk_bounds:
+        min_ipk, max_ipk = ipk_bounds
         ipk_range = st.sidebar.slider(
             "📊 Rentang IPK", 
             min_value=0.0, 
             max_value=4.0, 
             value=(max(0.0, min_ipk), min(4.0, max_ipk)), 
             step=0.01,
+            key="filter_ipk",
             help="Geser untuk mengatur rentang IPK"
         )
     else:
         ipk_range = (0.0, 4.0)
     
     # Apply filters
-    filtered = df_joined.copy()
-    if selected_prodi:
-        filtered = filtered[filtered["jurusan"].isin(selected_prodi)]
-    if selected_tahun:
-        filtered = filtered[filtered["tahun_masuk"].isin(selected_tahun)]
-    if selected_status:
-        filtered = filtered[filtered["status_mahasiswa"].isin(selected_status)]
-    if not filtered['ipk'].isna().all():
-        filtered = filtered[filtered["ipk"].between(*ipk_range) | filtered["ipk"].isna()]
+    filters["ipk_range"] = tuple(ipk_range)
+    filtered = run_aggregate(supabase, "mahasiswa_terfilter", filters)
+    metrics = run_aggregate(supabase, "ringkasan_metrik", filters)
     
     # Show filter summary
     if any([selected_prodi, selected_tahun, selected_status]) or ipk_range != (0.0, 4.0):
@@ -314,21 +731,18 @@ def main():
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_mhs = len(filtered)
-        total_all = len(df_mhs)
+        total_mhs = metrics["total"]
         st.metric(
             "Total Mahasiswa", 
             total_mhs
         )
     
     with col2:
-        valid_ipk = filtered['ipk'].dropna()
-        avg_ipk = valid_ipk.mean() if not valid_ipk.empty else 0
-        st.metric("Rata-rata IPK", f"{avg_ipk:.2f}")
+        st.metric("Rata-rata IPK", f"{metrics['rata_ipk']:.2f}")
     
     with col3:
-        if not df_bea.empty:
-            penerima_beasiswa = filtered["mahasiswa_id"].isin(df_bea["mahasiswa_id"]).sum()
+        if metrics["penerima_beasiswa"] is not None:
+            penerima_beasiswa = metrics["penerima_beasiswa"]
             persentase_beasiswa = safe_divide(penerima_beasiswa, total_mhs) * 100
             st.metric(
                 "Penerima Beasiswa", 
@@ -338,7 +752,7 @@ def main():
             st.metric("Penerima Beasiswa", "N/A")
     
     with col4:
-        aktif_count = filtered[filtered["status_mahasiswa"] == "Aktif"].shape[0] if "status_mahasiswa" in filtered.columns else 0
+        aktif_count = metrics["aktif"]
         aktif_persen = safe_divide(aktif_count, total_mhs) * 100
         st.metric(
             "Mahasiswa Aktif", 
@@ -346,7 +760,7 @@ def main():
         )
     
     with col5:
-        ipk_tinggi = filtered[filtered['ipk'] >= 3.5].shape[0] if not filtered['ipk'].isna().all() else 0
+        ipk_tinggi = metrics["ipk_tinggi"]
         ipk_tinggi_persen = safe_divide(ipk_tinggi, total_mhs) * 100
         st.metric(
             "IPK ≥ 3.5", 
@@ -359,390 +773,14 @@ def main():
     # ========================
     st.subheader("📈 Analisis Visual")
     
-    # Create tabs for different analysis
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📊 Distribusi", "📈 Trend", "🏆 Ranking", "🔍 Analisis Lanjutan", "📋 Data Detail"
-    ])
-    
-    with tab1:
-        viz_col1, viz_col2 = st.columns(2)
-        
-        with viz_col1:
-            # Distribusi Program Studi
-            if "jurusan" in filtered.columns and not filtered.empty:
-                jurusan_counts = filtered["jurusan"].value_counts().reset_index()
-                jurusan_counts.columns = ["jurusan", "count"]
-                
-                fig_bar = px.bar(
-                    jurusan_counts.head(3),
-                    x="count", 
-                    y="jurusan",
-                    orientation='h',
-                    title="📚 3 Program Studi dengan Mahasiswa Terbanyak",
-                    labels={"jurusan": "", "count": "Jumlah Mahasiswa"},
-                    color_discrete_sequence=["#4CAF50", "#8BC34A", "#CDDC39"]
-                )
-                fig_bar.update_layout(
-                    height=400,
-                    xaxis_title=None,
-                    yaxis_title=None,
-                    showlegend=False,
-                    margin=dict(l=20, r=20, t=40, b=20)
-                )
-                st.plotly_chart(fig_bar, use_container_width=True)
-
-        with viz_col2:
-            # Distribusi IPK
-            valid_ipk_data = filtered['ipk'].dropna()
-            if not valid_ipk_data.empty:
-                avg_ipk = valid_ipk_data.mean()
-                fig_hist = px.histogram(
-                    valid_ipk_data,
-                    nbins=20,
-                    title="📊 Sebaran IPK Mahasiswa",
-                    labels={"value": "IPK", "count": "Jumlah Mahasiswa"},
-                    color_discrete_sequence=["#2196F3"]
-                )
-                fig_hist.add_vline(
-                    x=avg_ipk, 
-                    line_dash="dash", 
-                    line_color="red",
-                    annotation_text=f"Rata-rata: {avg_ipk:.2f}",
-                    annotation_position="top right"
-                )
-                fig_hist.update_layout(
-                    height=400,
-                    xaxis_title=None,
-                    yaxis_title=None,
-                    margin=dict(l=20, r=20, t=40, b=20)
-                )
-                st.plotly_chart(fig_hist, use_container_width=True)
-
-        # Distribusi Kategori IPK
-        if not filtered['kategori_ipk'].isna().all():
-            kategori_counts = filtered['kategori_ipk'].value_counts()
-            
-            fig_pie = px.pie(
-                values=kategori_counts.values,
-                names=kategori_counts.index,
-                title="🎓 Persentase Mahasiswa Berdasarkan Kategori IPK",
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig_pie.update_traces(textinfo='percent+label', pull=[0.05]*len(kategori_counts))
-            fig_pie.update_layout(
-                height=400,
-                showlegend=False,
-                margin=dict(l=20, r=20, t=40, b=20)
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
-
-    
-    with tab2:
-        st.markdown("### 📈 Trend Mahasiswa dan Performa Akademik")
-
-        trend_col1, trend_col2 = st.columns(2)
-
-        with trend_col1:
-            # Trend penerimaan mahasiswa per tahun
-            if "tahun_masuk" in df_mhs.columns:
-                trend_masuk = df_mhs.groupby("tahun_masuk")["mahasiswa_id"].count().reset_index()
-                trend_masuk.columns = ["tahun_masuk", "jumlah"]
-                trend_masuk = trend_masuk.sort_values("tahun_masuk")
-
-                fig_masuk = px.bar(
-                    trend_masuk,
-                    x="tahun_masuk",
-                    y="jumlah",
-                    title="🗓️ Jumlah Mahasiswa Masuk per Tahun",
-                    labels={"tahun_masuk": "Tahun Masuk", "jumlah": "Jumlah Mahasiswa"},
-                    text="jumlah",
-                    color_discrete_sequence=["#1f77b4"]
-                )
-                fig_masuk.update_traces(textposition='outside')
-                fig_masuk.update_layout(height=450)
-                st.plotly_chart(fig_masuk, use_container_width=True)
-            else:
-                st.info("Data tahun masuk tidak tersedia.")
-
-        with trend_col2:
-            # Trend IPK rata-rata per semester
-            if not df_status.empty and not df_semester.empty:
-                ipk_per_sem = df_status.groupby("semester_id")["ipk"].mean().reset_index()
-                ipk_per_sem = ipk_per_sem.merge(df_semester[['semester_id', 'nama_semester']], on="semester_id", how="left")
-                ipk_per_sem = ipk_per_sem.dropna(subset=['ipk', 'nama_semester'])
-                ipk_per_sem = ipk_per_sem.sort_values("nama_semester") 
-
-                fig_ipk = px.line(
-                    ipk_per_sem,
-                    x="nama_semester",
-                    y="ipk",
-                    title="📊 Rata-rata IPK per Semester",
-                    markers=True,
-                    labels={"nama_semester": "Semester", "ipk": "Rata-rata IPK"},
-                    text=ipk_per_sem["ipk"].round(2)
-                )
-                fig_ipk.update_traces(textposition="top center", line=dict(color="#2ca02c", width=3))
-                fig_ipk.add_hline(
-                    y=ipk_per_sem['ipk'].mean(),
-                    line_dash="dot",
-                    annotation_text=f"Rata-rata Keseluruhan: {ipk_per_sem['ipk'].mean():.2f}",
-                    annotation_position="top left"
-                )
-                fig_ipk.update_layout(height=450)
-                st.plotly_chart(fig_ipk, use_container_width=True)
-            else:
-                st.info("Data IPK per semester tidak tersedia.")
-
-
-    
-    with tab3:
-        st.markdown("### 🏆 Ranking Program Studi")
-
-        rank_col1, rank_col2 = st.columns(2)
-
-        with rank_col1:
-            # Top 3 program studi dengan rata-rata IPK tertinggi
-            if "jurusan" in filtered.columns and 'ipk' in filtered.columns:
-                prodi_stats = filtered.groupby("jurusan").agg({
-                    'ipk': ['mean', 'count']
-                }).round(3)
-                prodi_stats.columns = ['avg_ipk', 'ipk_count']
-                prodi_stats = prodi_stats.reset_index()
-                prodi_stats = prodi_stats[prodi_stats['ipk_count'] >= 5] 
-                prodi_stats = prodi_stats.sort_values('avg_ipk', ascending=False).head(3)
-
-                if not prodi_stats.empty:
-                    fig_ipk_rank = px.bar(
-                        prodi_stats,
-                        x='jurusan',
-                        y='avg_ipk',
-                        title='🏅 Top 3 Program Studi dengan Rata-rata IPK Tertinggi',
-                        labels={'jurusan': 'Program Studi', 'avg_ipk': 'Rata-rata IPK'},
-                        text='avg_ipk',
-                        color_discrete_sequence=['#1f77b4']
-                    )
-                    fig_ipk_rank.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-                    fig_ipk_rank.update_layout(
-                        xaxis_tickangle=-30,
-                        yaxis_range=[0, 4],
-                        height=500
-                    )
-                    st.plotly_chart(fig_ipk_rank, use_container_width=True)
-                else:
-                    st.info("Belum cukup data untuk menampilkan ranking IPK per prodi.")
-
-        with rank_col2:
-            if not df_bea.empty and "jurusan" in filtered.columns:
-                df_bea_unique = df_bea.drop_duplicates(subset=["mahasiswa_id"])
-                bea_filtered = filtered.copy()
-                bea_filtered["penerima_beasiswa"] = bea_filtered["mahasiswa_id"].isin(df_bea_unique["mahasiswa_id"])
-                bea_counts = bea_filtered.groupby("jurusan")["penerima_beasiswa"].sum().reset_index()
-                bea_counts = bea_counts.sort_values("penerima_beasiswa", ascending=False).head(3)
-
-                if not bea_counts.empty:
-                    fig_bea_rank = px.bar(
-                        bea_counts,
-                        x="jurusan",
-                        y="penerima_beasiswa",
-                        title="🎖️ Top 3 Program Studi dengan Penerima Beasiswa Terbanyak",
-                        labels={"jurusan": "Program Studi", "penerima_beasiswa": "Jumlah Penerima"},
-                        text='penerima_beasiswa',
-                        color_discrete_sequence=['#2ca02c']
-                    )
-                    fig_bea_rank.update_traces(texttemplate='%{text}', textposition='outside')
-                    fig_bea_rank.update_layout(
-                        xaxis_tickangle=-30,
-                        height=500
-                    )
-                    st.plotly_chart(fig_bea_rank, use_container_width=True)
-                else:
-                    st.info("Tidak ada data penerima beasiswa yang bisa ditampilkan.")
-
-    
-    with tab4:
-        st.markdown("### 🔍 Analisis Lanjutan Mahasiswa")
-
-        analysis_col1, analysis_col2 = st.columns(2)
-
-        # === A. Analisis Korelasi IPK dan Beasiswa (Bar Chart) ===
-        with analysis_col1:
-            if not df_bea.empty and 'ipk' in filtered.columns:
-                filtered["dapat_beasiswa"] = filtered["mahasiswa_id"].isin(df_bea["mahasiswa_id"]).astype(int)
-                avg_by_bea = filtered.groupby("dapat_beasiswa")["ipk"].mean().reset_index()
-                avg_by_bea["Status"] = avg_by_bea["dapat_beasiswa"].map({1: "Ya", 0: "Tidak"})
-
-                fig_corr_bar = px.bar(
-                    avg_by_bea,
-                    x="Status",
-                    y="ipk",
-                    text="ipk",
-                    title="🎓 Rata-rata IPK Berdasarkan Status Beasiswa",
-                    labels={"Status": "Penerima Beasiswa", "ipk": "Rata-rata IPK"},
-                    color_discrete_sequence=["#1f77b4"]
-                )
-                fig_corr_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-                fig_corr_bar.update_layout(height=400)
-                st.plotly_chart(fig_corr_bar, use_container_width=True)
-
-                # Korelasi numerik (dengan interpretasi)
-                corr_val = filtered["ipk"].corr(filtered["dapat_beasiswa"])
-                st.caption(f"**Koefisien Korelasi**: {corr_val:.3f}")
-                if abs(corr_val) >= 0.5:
-                    st.success("✅ Korelasi kuat: IPK dan beasiswa memiliki hubungan yang jelas.")
-                elif abs(corr_val) >= 0.3:
-                    st.warning("⚠️ Korelasi sedang: Ada kecenderungan hubungan antara IPK dan beasiswa.")
-                else:
-                    st.info("ℹ️ Korelasi lemah: Tidak ada hubungan signifikan antara IPK dan beasiswa.")
-
-        # === B. Statistik Ringkasan IPK (Bar Chart) ===
-        with analysis_col2:
-            valid_ipk = filtered['ipk'].dropna()
-            if not valid_ipk.empty:
-                stat_summary = {
-                    "Mean": valid_ipk.mean(),
-                    "Median": valid_ipk.median(),
-                    "Min": valid_ipk.min(),
-                    "Max": valid_ipk.max(),
-                    "Q1 (25%)": valid_ipk.quantile(0.25),
-                    "Q3 (75%)": valid_ipk.quantile(0.75)
-                }
-
-                df_stat = pd.DataFrame(stat_summary.items(), columns=["Statistik", "Nilai"])
-                fig_stat_bar = px.bar(
-                    df_stat,
-                    x="Statistik",
-                    y="Nilai",
-                    text="Nilai",
-                    title="📊 Ringkasan Statistik IPK Mahasiswa",
-                    color_discrete_sequence=["#2ca02c"]
-                )
-                fig_stat_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-                fig_stat_bar.update_layout(height=400)
-                st.plotly_chart(fig_stat_bar, use_container_width=True)
-
-                st.caption("Statistik ringkasan memberikan gambaran sebaran performa akademik.")
-            else:
-                st.info("Tidak ada data IPK valid untuk dianalisis.")
-
-    
-    with tab5:
-        # Data Detail Tab
-        st.markdown("### 📋 Detail Data Mahasiswa")
-        
-        # Search functionality
-        search_term = st.text_input("🔍 Cari mahasiswa (nama/NIM):", placeholder="Masukkan nama atau NIM...")
-        
-        # Prepare display data
-        display_df = filtered.copy()
-        
-        if search_term:
-            if 'nama_lengkap' in display_df.columns:
-                mask = display_df['nama_lengkap'].str.contains(search_term, case=False, na=False)
-                if 'nim' in display_df.columns:
-                    mask |= display_df['nim'].str.contains(search_term, case=False, na=False)
-                display_df = display_df[mask]
-        
-        # Add scholarship status
-        if not df_bea.empty:
-            display_df['status_beasiswa'] = display_df['mahasiswa_id'].isin(df_bea['mahasiswa_id']).map({True: '✅ Ya', False: '❌ Tidak'})
-        
-        # Select columns to display
-        display_columns = []
-        available_columns = display_df.columns.tolist()
-        
-        important_cols = ['nama_lengkap', 'nim', 'jurusan', 'tahun_masuk', 'status_mahasiswa', 'ipk', 'kategori_ipk', 'status_beasiswa']
-        for col in important_cols:
-            if col in available_columns:
-                display_columns.append(col)
-        
-        if display_columns:
-            st.dataframe(
-                display_df[display_columns].head(100),
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            st.info(f"Menampilkan {min(len(display_df), 100)} dari {len(display_df)} mahasiswa")
-        
-        # Download options
-        col_down1, col_down2 = st.columns(2)
-        with col_down1:
-            if st.button("📥 Download Data Terfilter (CSV)"):
-                csv = display_df.to_csv(index=False)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f"sidama_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
-        
-        with col_down2:
-            if st.button("📊 Download Laporan Excel"):
-                # This would require additional implementation for Excel export
-                st.info("Fitur ekspor Excel akan segera tersedia!")
-    
-    # ========================
-    # INSIGHT OTOMATIS & REKOMENDASI TINDAKAN
-    # ========================
-    st.subheader("💡 Rekomendasi Tindakan")
-
-    # Persiapan data
-    valid_ipk = filtered['ipk'].dropna()
-    rendah_ipk = filtered[filtered['ipk'] < 2.5] if 'ipk' in filtered.columns else pd.DataFrame()
-    nonaktif = filtered[filtered['status_mahasiswa'] != "Aktif"] if 'status_mahasiswa' in filtered.columns else pd.DataFrame()
-    belum_dapat_bea = pd.DataFrame()
-    if not df_bea.empty and 'mahasiswa_id' in filtered.columns:
-        ipk_3up = filtered[filtered["ipk"] >= 3.5] if 'ipk' in filtered.columns else pd.DataFrame()
-        belum_dapat_bea = ipk_3up[~ipk_3up["mahasiswa_id"].isin(df_bea["mahasiswa_id"])]
-
-    # Rekomendasi 1: Akademik
-    tampilkan_rekomendasi(
-        kategori="📕 Akademik: Bimbingan akademik intensif",
-        prioritas="Tinggi",
-        deskripsi=f"Dengan {len(rendah_ipk)} mahasiswa ber-IPK rendah, perlu program mentoring dan remedial.",
-        df_mahasiswa=rendah_ipk,
-        file_name="mahasiswa_ipk_rendah.csv",
-        warna="#dc3545"
-    )
-
-    # Rekomendasi 2: Beasiswa
-    tampilkan_rekomendasi(
-        kategori="🎓 Beasiswa: Sosialisasi program beasiswa",
-        prioritas="Sedang",
-        deskripsi=f"Ada {len(belum_dapat_bea)} mahasiswa ber-IPK ≥ 3.0 yang belum menerima beasiswa.",
-        df_mahasiswa=belum_dapat_bea,
-        file_name="mahasiswa_belum_beasiswa.csv",
-        warna="#ffc107"
-    )
-
-    # Rekomendasi 3: Retensi
-    tampilkan_rekomendasi(
-        kategori="🔁 Retensi: Program reengagement mahasiswa non-aktif",
-        prioritas="Tinggi",
-        deskripsi=f"Investigasi dan pendekatan kepada {len(nonaktif)} mahasiswa non-aktif diperlukan.",
-        df_mahasiswa=nonaktif,
-        file_name="mahasiswa_nonaktif.csv",
-        warna="#dc3545"
-    )
-
-    # Rekomendasi 4: Early Warning Mahasiswa Potensi Terlambat
-    # st.markdown("### ⏰ Mahasiswa Berpotensi Terlambat Lulus")
-
-    # now = datetime.now()
-    # threshold_year = now.year - 4
-    # potensi_terlambat = filtered[
-    #     (filtered['ipk'] < 2.5) & (filtered['tahun_masuk'] <= threshold_year)
-    # ] if 'ipk' in filtered.columns and 'tahun_masuk' in filtered.columns else pd.DataFrame()
-
-    # tampilkan_rekomendasi(
-    #     kategori="⏰ Potensi Terlambat Lulus",
-    #     prioritas="Tinggi",
-    #     deskripsi=f"Terdapat {len(potensi_terlambat)} mahasiswa dengan IPK < 2.5 dan tahun masuk ≤ {threshold_year}.",
-    #     df_mahasiswa=potensi_terlambat,
-    #     file_name="mahasiswa_terlambat_lulus.csv",
-    #     warna="#6f42c1"
-    # )
-
+    # Tab melacak state sehingga hanya seksi yang sedang dibuka yang dihitung dan dirender
+    ctx = {"supabase": supabase, "filters": filters, "filtered": filtered, "metrics": metrics}
+    tabs = st.tabs(list(SECTIONS), key="dashboard_tab", on_change="rerun")
+    for tab, render in zip(tabs, SECTIONS.values()):
+        if tab.open is False:
+            continue
+        with tab:
+            render(ctx)
     
     # ========================
     # EXPORT & REPORTING
@@ -765,12 +803,12 @@ def main():
                     "IPK < 2.5"
                 ],
                 "Nilai": [
-                    len(filtered),
-                    f"{valid_ipk.mean():.2f}" if not valid_ipk.empty else "Tidak tersedia",
+                    metrics["total"],
+                    f"{metrics['rata_ipk']:.2f}" if metrics["ipk_valid"] else "Tidak tersedia",
                     f"{aktif_count} ({aktif_persen:.1f}%)" if 'aktif_count' in locals() else "Tidak tersedia",
                     f"{penerima_beasiswa} ({persentase_beasiswa:.1f}%)" if 'penerima_beasiswa' in locals() else "Tidak tersedia",
                     f"{ipk_tinggi} ({ipk_tinggi_persen:.1f}%)" if 'ipk_tinggi' in locals() else "Tidak tersedia",
-                    f"{(valid_ipk < 2.5).sum()} ({((valid_ipk < 2.5).sum()/len(valid_ipk)*100):.1f}%)" if not valid_ipk.empty else "Tidak tersedia"
+                    f"{metrics['ipk_rendah']} ({metrics['ipk_rendah'] / metrics['ipk_valid'] * 100:.1f}%)" if metrics["ipk_valid"] else "Tidak tersedia"
                 ]
             }
 
@@ -792,10 +830,7 @@ def main():
         if st.button("🖨️ Simpan Grafik ke PDF"):
             st.info("⏳ Sedang menyiapkan file PDF...")
 
-            figures = []
-            if 'fig_bar' in locals(): figures.append(fig_bar)
-            if 'fig_hist' in locals(): figures.append(fig_hist)
-            if 'fig_pie' in locals(): figures.append(fig_pie)
+            figures = list(run_aggregate(supabase, "grafik_distribusi", filters).values())
 
             if figures:
                 pdf_buffer = save_charts_to_pdf(figures)
@@ -810,6 +845,40 @@ def main():
             else:
                 st.warning("⚠️ Tidak ada grafik yang tersedia untuk diekspor.")
 
+
+# ========================
+# MAIN APPLICATION
+# ========================
+def main():
+    # Load data with progress bar
+    with st.spinner('Memuat data dari database...'):
+        df_options, load_stats = load_data()
+    
+    if df_options is None:
+        st.error("Gagal memuat data. Periksa koneksi database.")
+        return
+    
+    # Check if data is empty
+    if df_options.empty:
+        st.warning("Tidak ada data mahasiswa yang tersedia.")
+        return
+    
+    # ========================
+    # SIDEBAR FILTERS
+    # ========================
+    st.sidebar.title("🔍 Filter Data")
+    
+    dashboard_view()
+
+    # Info pemuatan data per tabel
+    if load_stats:
+        with st.sidebar.expander("⏱️ Info Pemuatan Data"):
+            st.dataframe(
+                pd.DataFrame.from_dict(load_stats, orient="index").rename_axis("tabel").reset_index(),
+                use_container_width=True,
+                hide_index=True
+            )
+    
     # ========================
     # FOOTER
     # ========================
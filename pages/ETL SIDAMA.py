@@ -229,9 +229,9 @@ else:
             1. **Pilih Tabel Tujuan**
                Pilih tabel di database Supabase yang ingin Anda isi dengan data dari file Excel.
             2. **Download Template**
-                Unduh template Excel yang sesuai dengan struktur tabel yang dipilih.
-            3. **Unggah File Excel yang Telah Diisi**
-                Unggah file Excel yang telah diisi sesuai template.
+                Unduh template Excel atau CSV yang sesuai dengan struktur tabel yang dipilih.
+            3. **Unggah File yang Telah Diisi**
+                Unggah file Excel, CSV atau Parquet yang telah diisi sesuai template.
             """)
             st.info("Pastikan format data di Excel sesuai dengan tipe data di database.")
         elif st.session_state.active_tab == "API Extractor":
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 from utils.auth import require_login
+from utils.data_store import get_data_store, get_tables
+from utils import column_manifest
+from utils.cache import cached, table_tag
 import plotly.express as px
 from supabase import create_client
 from io import BytesIO
@@ -108,15 +111,19 @@ def init_supabase_connection():
 
 supabase = init_supabase_connection()
 
-@st.cache_data(ttl=3600)
-def load_data():
-    mahasiswa_df = pd.DataFrame(supabase.table("mahasiswas").select("*").execute().data)
-    beasiswa_df = pd.DataFrame(supabase.table("beasiswas").select("*").execute().data)
-    penerimaan_df = pd.DataFrame(supabase.table("penerimaan_beasiswas").select("*").execute().data)
-    semester_df = pd.DataFrame(supabase.table("semesters").select("*").execute().data)
-    status_df = pd.DataFrame(supabase.table("status_akademik_semesters").select("*").execute().data)
-    partisipasi_df = pd.DataFrame(supabase.table("partisipasi_kegiatans").select("*").execute().data)
-    kegiatan_df = pd.DataFrame(supabase.table("kegiatan_mahasiswas").select("*").execute().data)
+@cached(tags=[table_tag(name) for name in column_manifest.EFEKTIFITAS_BEASISWA])
+def build_datasets(versions, _frames):
+    """
+    Membangun dataset analisis dari snapshot bersama. Di-cache per versi snapshot
+    dan dibagikan tanpa disalin karena halaman hanya membaca hasilnya.
+    """
+    mahasiswa_df = _frames["mahasiswas"].copy(deep=False)
+    beasiswa_df = _frames["beasiswas"]
+    penerimaan_df = _frames["penerimaan_beasiswas"]
+    semester_df = _frames["semesters"].copy(deep=False)
+    status_df = _frames["status_akademik_semesters"]
+    partisipasi_df = _frames["partisipasi_kegiatans"]
+    kegiatan_df = _frames["kegiatan_mahasiswas"]
 
     mahasiswa_df['status_beasiswa'] = mahasiswa_df['mahasiswa_id'].isin(penerimaan_df['mahasiswa_id']).map({True: 'Penerima', False: 'Non-Penerima'})
 
@@ -143,6 +150,13 @@ def load_data():
 
     return df_analisis, partisipasi_analisis, df_beasiswa, kegiatan_df
 
+def load_data():
+    table_names = list(column_manifest.EFEKTIFITAS_BEASISWA)
+    frames, _ = get_tables(supabase, table_names)
+    store = get_data_store()
+    versions = tuple(store.version(name) for name in table_names)
+    return build_datasets(versions, frames)
+
 # ------------------- Load Data -------------------
 df_analisis, partisipasi_analisis, df_beasiswa, kegiatan_df = load_data()
 
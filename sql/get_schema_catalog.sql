@@ -0,0 +1,89 @@
+-- Katalog skema dalam satu panggilan RPC untuk ETL SIDAMA (utils/schema_catalog.py).
+-- Mengembalikan {"version": md5, "tables": {tabel: [kolom, ...]}}. Bila
+-- `known_version` sama dengan versi saat ini, "tables" tidak dikirim.
+--
+-- Fungsi berjalan sebagai pemiliknya (security definer) karena metadata constraint
+-- di information_schema hanya terlihat oleh pemilik tabel. Karena itu search_path
+-- dikosongkan (semua objek ditulis lengkap dengan skemanya) dan hanya pengguna yang
+-- sudah login yang boleh memanggilnya.
+create or replace function public.get_schema_catalog(known_version text default null)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+with cols as (
+    select c.table_name, c.column_name, c.ordinal_position, c.data_type, c.udt_name,
+           c.is_nullable, c.character_maximum_length, c.column_default
+    from information_schema.columns c
+    join information_schema.tables t
+      on t.table_schema = c.table_schema and t.table_name = c.table_name
+    where c.table_schema = 'public' and t.table_type = 'BASE TABLE'
+),
+constraint_columns as (
+    select tc.constraint_name, tc.constraint_type, kcu.table_name, kcu.column_name,
+           count(*) over (partition by tc.constraint_name) as column_count
+    from information_schema.table_constraints tc
+    join information_schema.key_column_usage kcu
+      on kcu.constraint_name = tc.constraint_name and kcu.table_schema = tc.table_schema
+    where tc.table_schema = 'public' and tc.constraint_type in ('PRIMARY KEY', 'UNIQUE', 'FOREIGN KEY')
+),
+foreign_keys as (
+    select cc.table_name, cc.column_name, ccu.table_name as ref_table, ccu.column_name as ref_column
+    from constraint_columns cc
+    join information_schema.constraint_column_usage ccu
+      on ccu.constraint_name = cc.constraint_name and ccu.table_schema = 'public'
+    where cc.constraint_type = 'FOREIGN KEY' and cc.column_count = 1
+),
+enums as (
+    select t.typname, jsonb_agg(e.enumlabel order by e.enumsortorder) as labels
+    from pg_catalog.pg_type t
+    join pg_catalog.pg_enum e on e.enumtypid = t.oid
+    join pg_catalog.pg_namespace n on n.oid = t.typnamespace
+    where n.nspname = 'public'
+    group by t.typname
+),
+catalog as (
+    select coalesce(jsonb_object_agg(table_name, columns), '{}'::jsonb) as tables
+    from (
+        select c.table_name,
+               jsonb_agg(jsonb_build_object(
+                   'column_name', c.column_name,
+                   'data_type', c.data_type,
+                   'udt_name', c.udt_name,
+                   'is_nullable', c.is_nullable,
+                   'character_maximum_length', c.character_maximum_length,
+                   'column_default', c.column_default,
+                   'is_primary_key', exists (
+                       select 1 from constraint_columns k
+                       where k.table_name = c.table_name and k.column_name = c.column_name
+                         and k.constraint_type = 'PRIMARY KEY'
+                   ),
+                   'is_unique', exists (
+                       select 1 from constraint_columns k
+                       where k.table_name = c.table_name and k.column_name = c.column_name
+                         and k.constraint_type in ('PRIMARY KEY', 'UNIQUE') and k.column_count = 1
+                   ),
+                   'enum_values', en.labels,
+                   'references', (
+                       select jsonb_build_object('table', fk.ref_table, 'column', fk.ref_column)
+                       from foreign_keys fk
+                       where fk.table_name = c.table_name and fk.column_name = c.column_name
+                       limit 1
+                   )
+               ) order by c.ordinal_position) as columns
+        from cols c
+        left join enums en on c.data_type = 'USER-DEFINED' and en.typname = c.udt_name
+        group by c.table_name
+    ) per_table
+)
+select case
+    when known_version = md5(tables::text) then jsonb_build_object('version', known_version)
+    else jsonb_build_object('version', md5(tables::text), 'tables', tables)
+end
+from catalog;
+$$;
+
+revoke execute on function public.get_schema_catalog(text) from public, anon;
+grant execute on function public.get_schema_catalog(text) to authenticated, service_role;
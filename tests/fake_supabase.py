@@ -0,0 +1,89 @@
+from postgrest.exceptions import APIError
+
+
+class Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class Query:
+    """Query builder PostgREST minimal di atas list of dict untuk pengujian."""
+
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+        self.columns, self.count, self.bounds = "*", None, None
+        self.filters, self.orders, self.referenced = [], [], set()
+
+    def select(self, *columns, count=None):
+        self.columns, self.count = ",".join(columns), count
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append(column)
+        self.referenced.add(column)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def _filter(self, column, test):
+        self.referenced.add(column)
+        self.filters.append(lambda row: row.get(column) is not None and test(row[column]))
+        return self
+
+    def in_(self, column, values):
+        return self._filter(column, lambda v: v in values)
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v >= value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v <= value)
+
+    def execute(self):
+        if self.db.failures:
+            raise self.db.failures.pop(0)
+        selected = set(self.columns.split(",")) if self.columns != "*" else set()
+        for column in sorted((selected | self.referenced) & self.db.missing_columns.get(self.name, set())):
+            raise APIError({"code": "42703", "message": f"column {self.name}.{column} does not exist"})
+        rows = [row for row in self.db.tables[self.name] if all(f(row) for f in self.filters)]
+        for column in reversed(self.orders):
+            rows = sorted(rows, key=lambda row: row[column])
+        total = len(rows)
+        if self.bounds:
+            start, end = self.bounds
+            if self.db.max_rows:
+                end = min(end, start + self.db.max_rows - 1)
+            rows = rows[start:end + 1]
+        if self.columns != "*":
+            rows = [{c: row.get(c) for c in self.columns.split(",")} for row in rows]
+        self.db.calls.append((self.name, len(self.filters)))
+        return Response(rows, total if self.count and self.db.exact_count else None)
+
+
+class FakeSupabase:
+    """
+    `table()` di atas data di memori; `failures` berisi exception yang dilempar
+    berurutan dan `missing_columns` ({tabel: {kolom}}) meniru kolom yang tidak ada.
+    `max_rows` meniru batas db-max-rows server; `exact_count=False` meniru server
+    yang tidak mengirim jumlah baris.
+    """
+
+    def __init__(self, tables, missing_columns=None, max_rows=None, exact_count=True):
+        self.tables = tables
+        self.missing_columns = missing_columns or {}
+        self.max_rows = max_rows
+        self.exact_count = exact_count
+        self.failures = []
+        self.calls = []
+
+    def table(self, name):
+        return Query(self, name)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.academic_rules import (
+    classify_grade, classify_peringatan_dini, classify_rekomendasi, classify_status_studi,
+)
+
+
+# Aturan per baris dari versi awal halaman, sebagai acuan label
+def baseline_status_studi(total_sks, semester_aktif):
+    if semester_aktif > 8 and total_sks < 144:
+        return "Potensi Telat"
+    elif total_sks / semester_aktif < 12:
+        return "Underload"
+    return "Aman"
+
+
+def baseline_peringatan_dini(ipk):
+    if ipk < 2.5:
+        return "⚠️ Risiko Tinggi Drop-Out"
+    elif ipk < 3.0:
+        return "⚠️ Butuh Intervensi Akademik"
+    return "✅ Aman"
+
+
+def baseline_grade(ipk):
+    if pd.isna(ipk):
+        return "Tidak Ada Data"
+    elif ipk >= 3.5:
+        return "Cumlaude (≥3.5)"
+    elif ipk >= 3.0:
+        return "Sangat Baik (3.0-3.49)"
+    elif ipk >= 2.5:
+        return "Baik (2.5-2.99)"
+    elif ipk >= 2.0:
+        return "Cukup (2.0-2.49)"
+    return "Kurang (<2.0)"
+
+
+IPK = pd.Series([0.0, 1.99, 2.0, 2.49, 2.5, 2.99, 3.0, 3.49, 3.5, 4.0, np.nan])
+
+
+@pytest.fixture(autouse=True)
+def _default_thresholds(monkeypatch):
+    monkeypatch.setattr("utils.academic_rules.st.secrets", {})
+
+
+def test_status_studi_boundaries():
+    total_sks = pd.Series([143, 144, 143, 96, 95, 12, 11, 200])
+    semester = pd.Series([9, 9, 8, 8, 8, 1, 1, 12])
+    expected = [baseline_status_studi(s, n) for s, n in zip(total_sks, semester)]
+    assert classify_status_studi(total_sks, semester).tolist() == expected
+
+
+def test_peringatan_dini_boundaries():
+    assert classify_peringatan_dini(IPK).tolist() == [baseline_peringatan_dini(v) for v in IPK]
+
+
+def test_grade_boundaries():
+    assert classify_grade(IPK).astype(str).tolist() == [baseline_grade(v) for v in IPK]
+
+
+def test_rekomendasi_follows_status_and_warning():
+    status = classify_status_studi(pd.Series([143, 144, 144]), pd.Series([9, 9, 9]))
+    warning = classify_peringatan_dini(pd.Series([3.2, 3.2, 2.9]))
+    assert classify_rekomendasi(status, warning).tolist() == ["Konsultasi Dosen Wali", "-", "Konsultasi Dosen Wali"]
+
+
+def test_threshold_overrides():
+    assert classify_peringatan_dini(pd.Series([2.7]), {"ipk_risiko": 2.8}).tolist() == ["⚠️ Risiko Tinggi Drop-Out"]
@@ -0,0 +1,63 @@
+import pytest
+
+from tests.fake_supabase import FakeSupabase
+from utils import aggregates
+from utils.aggregates import AggregateEngine, aggregate
+from utils.cache import TieredCache
+from utils.data_store import DataStore
+
+
+def _db():
+    mahasiswas = [
+        {"mahasiswa_id": i, "nama_lengkap": f"N{i}", "nim": str(i), "jurusan": "AB"[i % 2],
+         "tahun_masuk": 2020 + i % 3, "status_mahasiswa": "Aktif", "updated_at": "2024-01-01"}
+        for i in range(12)
+    ]
+    status = [
+        {"status_akademik_id": i, "mahasiswa_id": i, "semester_id": 1, "ipk": 2.0 + i * 0.15,
+         "tanggal_evaluasi": "2024-01-01"}
+        for i in range(12)
+    ]
+    bea = [{"mahasiswa_id": 0, "beasiswa_id": 1, "semester_penerimaan_id": 1, "updated_at": "2024-01-01"}]
+    return FakeSupabase({"mahasiswas": mahasiswas, "status_akademik_semesters": status, "penerimaan_beasiswas": bea})
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr("utils.academic_rules.st.secrets", {})
+    return AggregateEngine(DataStore(snapshot_dir=None), TieredCache(max_bytes=50_000_000))
+
+
+def test_filtered_metrics(engine):
+    db = _db()
+    metrik = engine.run(db, "ringkasan_metrik", {"prodi": ("A",)})
+    assert metrik["total"] == 6
+    assert metrik["penerima_beasiswa"] == 1
+    assert engine.run(db, "mahasiswa_terfilter", {"ipk_range": (2.0, 2.5)})["mahasiswa_id"].tolist() == [0, 1, 2, 3]
+
+
+def test_ipk_bounds_ignore_filters(engine):
+    db = _db()
+    assert engine.run(db, "rentang_ipk") == pytest.approx((2.0, 3.65))
+    assert engine.run(db, "rentang_ipk", {"prodi": ("A",)}) == pytest.approx((2.0, 3.65))
+
+
+def test_results_are_cached_per_filters_and_snapshot_version(engine, monkeypatch):
+    calls = []
+    monkeypatch.setitem(aggregates.AGGREGATES, "hitung", None)
+
+    @aggregate("hitung", ["mahasiswas"])
+    def hitung(frames, filters, run):
+        calls.append(dict(filters))
+        return len(frames["mahasiswas"])
+
+    db = _db()
+    assert engine.run(db, "hitung", {"prodi": ("A",)}) == 12
+    assert engine.run(db, "hitung", {"prodi": ("A",)}) == 12
+    assert engine.run(db, "hitung", {"prodi": ("B",)}) == 12
+    assert len(calls) == 2
+
+    db.tables["mahasiswas"].append({**db.tables["mahasiswas"][0], "mahasiswa_id": 99, "updated_at": "2024-02-01"})
+    engine._store.expire(["mahasiswas"])
+    assert engine.run(db, "hitung", {"prodi": ("A",)}) == 13
+    assert len(calls) == 3
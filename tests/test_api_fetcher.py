@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from utils import api_fetcher
+from utils.api_fetcher import ColumnBuffer, _next_request, extract_records, fetch_source, fetch_sources
+
+URL = "https://api.test/mahasiswa"
+
+
+class Response:
+    def __init__(self, payload, links=None):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode()
+        self.headers = {}
+        self.links = links or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+    """Melayani halaman berdasarkan parameter `page`; `fail` berisi URL yang selalu gagal."""
+
+    def __init__(self, pages, fail=()):
+        self.pages = pages
+        self.fail = set(fail)
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None, headers=None):
+        self.requests.append((url, dict(params or {})))
+        if url in self.fail:
+            raise ConnectionError(url)
+        page = (params or {}).get("page", 1)
+        return Response({"data": self.pages[page - 1], "meta": {"page": page, "total_pages": len(self.pages)}})
+
+
+@pytest.fixture(autouse=True)
+def _no_http_cache(monkeypatch):
+    monkeypatch.setattr(api_fetcher, "get_response_cache", lambda: None)
+
+
+@pytest.mark.parametrize("links, payload, expected", [
+    ({"next": {"url": "/mahasiswa?page=2"}}, {}, ("https://api.test/mahasiswa?page=2", {})),
+    ({}, {"data": [1], "next": "https://api.test/m?after=5"}, ("https://api.test/m?after=5", {})),
+    ({}, {"data": [1], "meta": {"next_cursor": "abc"}}, (URL, {"cursor": "abc"})),
+    ({}, {"data": [1], "page": 2, "total_pages": 3}, (URL, {"page": 3})),
+    ({}, {"data": [1], "page": 3, "total_pages": 3}, None),
+    ({}, {"data": [1, 2], "offset": 0, "limit": 2, "total": 5}, (URL, {"offset": 2, "limit": 2})),
+    ({}, {"data": [1], "offset": 4, "limit": 2, "total": 5}, None),
+])
+def test_next_request_detection(links, payload, expected):
+    assert _next_request(links, payload, URL, {}, len(extract_records(payload))) == expected
+
+
+def test_fetch_source_follows_pages_into_columns():
+    session = Session([[{"id": 1, "nama": "A"}], [{"id": 2}, {"id": 3, "ipk": 3.5}]])
+    table, stats = fetch_source({"url": URL}, session=session)
+    assert (stats["rows"], stats["pages"], stats["cached_pages"]) == (3, 2, 0)
+    assert table.to_pydict() == {"id": [1, 2, 3], "nama": ["A", None, None], "ipk": [None, None, 3.5]}
+
+
+def test_fetch_source_stops_on_repeated_link():
+    class Looping(Session):
+        def get(self, url, params=None, timeout=None, headers=None):
+            self.requests.append(url)
+            return Response([{"id": len(self.requests)}], links={"next": {"url": URL}})
+
+    session = Looping([])
+    _, stats = fetch_source({"url": URL}, session=session)
+    assert stats["pages"] == 1
+
+
+def test_fetch_sources_reports_errors_per_alias(monkeypatch):
+    session = Session([[{"id": 1}]], fail={"https://api.test/rusak"})
+    monkeypatch.setattr(api_fetcher, "get_http_session", lambda: session)
+    results = {alias: (data, error) for alias, data, _, error in fetch_sources(
+        {"ok": URL, "rusak": "https://api.test/rusak"}, max_workers=2,
+    )}
+    assert results["ok"][0].num_rows == 1 and results["ok"][1] is None
+    assert results["rusak"][0] is None and isinstance(results["rusak"][1], ConnectionError)
+
+
+def test_column_buffer_backfills_new_keys():
+    buffer = ColumnBuffer()
+    buffer.extend([{"a": 1}, "nilai"])
+    buffer.extend([{"b": 2}])
+    assert len(buffer) == 3
+    assert buffer.drain() == {"a": [1, None, None], "value": [None, "nilai", None], "b": [None, None, 2]}
+    assert len(buffer) == 0
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+
+from utils.artifact_store import ArtifactStore, frame_to_table
+
+
+def _frame(n=3):
+    return pd.DataFrame({"nim": [f"{i:04d}" for i in range(n)], "ipk": [3.5] * n})
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = ArtifactStore(max_bytes=10_000_000, disk_dir=str(tmp_path))
+    first = store.put_frame("https://api.test/a", _frame(), fetched_at="2026-01-01T00:00:00")
+    second = store.put_frame("https://api.test/b", _frame(), fetched_at="2026-01-02T00:00:00")
+
+    assert first.content_hash == second.content_hash
+    assert not first.deduplicated and second.deduplicated
+    assert first.key != second.key
+    assert store.stats()["artefak_di_memori"] == 1
+    assert len(os.listdir(tmp_path)) == 1
+    assert store.get(first.content_hash) is store.get(second.content_hash)
+    assert store.latest("https://api.test/b") is second
+
+
+def test_different_content_gets_new_hash(tmp_path):
+    store = ArtifactStore(max_bytes=10_000_000, disk_dir=str(tmp_path))
+    first = store.put_frame("https://api.test/a", _frame(3))
+    second = store.put_frame("https://api.test/a", _frame(4))
+    assert first.content_hash != second.content_hash
+    assert not second.deduplicated
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_dedup_survives_restart_via_disk(tmp_path):
+    table = frame_to_table(_frame())
+    digest = ArtifactStore(max_bytes=10_000_000, disk_dir=str(tmp_path)).put("https://api.test/a", table).content_hash
+
+    restarted = ArtifactStore(max_bytes=10_000_000, disk_dir=str(tmp_path))
+    handle = restarted.put("https://api.test/a", table)
+    assert handle.content_hash == digest and handle.deduplicated
+    assert restarted.get(digest).to_pandas().equals(_frame())
@@ -0,0 +1,34 @@
+import httpx
+from postgrest.exceptions import APIError
+
+from utils import bulk_loader
+from utils.bulk_loader import STATUS_FAILED, STATUS_OK, _send_with_retry
+
+
+def _send(monkeypatch, failures):
+    calls = []
+
+    def send_batch(supabase, table_name, rows, mode, on_conflict):
+        calls.append(len(rows))
+        if failures:
+            raise failures.pop(0)
+
+    monkeypatch.setattr(bulk_loader, "send_batch", send_batch)
+    report = _send_with_retry(None, "mahasiswas", 1, [{"nim": "1"}], "insert", None, max_retries=3, backoff=0)
+    return report, calls
+
+
+def test_constraint_violation_fails_without_retry(monkeypatch):
+    duplicate = APIError({"code": "23505", "message": "duplicate key value violates unique constraint"})
+    report, calls = _send(monkeypatch, [duplicate])
+    assert report["status"] == STATUS_FAILED
+    assert report["percobaan"] == 1
+    assert len(calls) == 1
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    unavailable = APIError({"code": 503, "message": "Service Unavailable"})
+    report, calls = _send(monkeypatch, [httpx.ReadTimeout("timeout"), unavailable])
+    assert report["status"] == STATUS_OK
+    assert report["percobaan"] == 3
+    assert len(calls) == 3
@@ -0,0 +1,26 @@
+import sys
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.cache import TieredCache, estimate_size
+
+
+def test_estimate_size_counts_nested_figures_and_text():
+    figure = go.Figure(go.Bar(x=[f"prodi {i}" for i in range(2000)], y=list(range(2000))))
+    assert estimate_size({"grafik": {"distribusi": figure}}) > 20_000 > sys.getsizeof(figure)
+
+    frame = pd.DataFrame({"nama": ["mahasiswa dengan nama panjang"] * 1000}, dtype=object)
+    assert estimate_size(frame) > 50_000
+
+
+def test_invalidation_reaches_other_processes(tmp_path):
+    writer = TieredCache(max_bytes=10_000_000, disk_dir=str(tmp_path))
+    reader = TieredCache(max_bytes=10_000_000, disk_dir=str(tmp_path))
+    writer.set("k", "lama", tags=["table:mahasiswas"], disk=True)
+    assert reader.get("k") == (True, "lama")
+
+    writer.invalidate("table:mahasiswas")
+    assert reader.get("k") == (False, None)
+    reader.clear()
+    assert reader.get("k") == (False, None)
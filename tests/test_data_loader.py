@@ -0,0 +1,59 @@
+import pytest
+
+from tests.fake_supabase import FakeSupabase
+from utils.data_loader import load_queries, table_query
+
+ROWS = [{"mahasiswa_id": i, "jurusan": "AB"[i % 2]} for i in range(2500)]
+
+
+def _load(db, **kwargs):
+    queries = {"mahasiswas": table_query(db, "mahasiswas", order_by="mahasiswa_id")}
+    frames, stats = load_queries(queries, max_workers=4, **kwargs)
+    return frames["mahasiswas"], stats["mahasiswas"]
+
+
+@pytest.mark.parametrize("page_size, pages", [(1000, 3), (2500, 1), (3000, 1), (7, 358)])
+def test_pages_cover_every_row_once(page_size, pages):
+    frame, stats = _load(FakeSupabase({"mahasiswas": ROWS}), page_size=page_size)
+    assert frame["mahasiswa_id"].tolist() == list(range(2500))
+    assert stats["rows"] == 2500
+    assert stats["pages"] == pages
+
+
+def test_first_page_requests_exact_count_only():
+    db = FakeSupabase({"mahasiswas": ROWS})
+    counts = []
+    original = db.table
+
+    def table(name):
+        query = original(name)
+        select = query.select
+
+        def tracked(*columns, count=None):
+            counts.append(count)
+            return select(*columns, count=count)
+        query.select = tracked
+        return query
+
+    db.table = table
+    _load(db, page_size=1000)
+    assert counts.count("exact") == 1
+    assert len(counts) == 3
+
+
+def test_server_row_cap_below_page_size():
+    frame, stats = _load(FakeSupabase({"mahasiswas": ROWS}, max_rows=300), page_size=1000)
+    assert frame["mahasiswa_id"].tolist() == list(range(2500))
+    assert stats["pages"] == 9
+
+
+def test_without_count_pages_are_fetched_sequentially():
+    frame, stats = _load(FakeSupabase({"mahasiswas": ROWS}, exact_count=False), page_size=1000)
+    assert frame["mahasiswa_id"].tolist() == list(range(2500))
+    assert stats["pages"] == 3
+
+
+def test_empty_table():
+    frame, stats = _load(FakeSupabase({"mahasiswas": []}), page_size=1000)
+    assert frame.empty
+    assert stats["rows"] == 0
@@ -0,0 +1,138 @@
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from tests.fake_supabase import FakeSupabase
+from utils.data_store import DataStore
+
+
+def _mahasiswa(i, updated_at="2024-01-01"):
+    return {
+        "mahasiswa_id": i, "nama_lengkap": f"N{i}", "nim": str(i), "jurusan": "A",
+        "tahun_masuk": 2020, "status_mahasiswa": "Aktif", "updated_at": updated_at,
+    }
+
+
+def _store_with_snapshot():
+    db = FakeSupabase({"mahasiswas": [_mahasiswa(i) for i in range(5)]})
+    store = DataStore(snapshot_dir=None)
+    _, stats = store.get_tables(db, ["mahasiswas"])
+    assert stats["mahasiswas"]["mode"] == "full"
+    return db, store
+
+
+def test_transient_failure_keeps_delta_sync():
+    db, store = _store_with_snapshot()
+
+    store.expire(["mahasiswas"])
+    db.failures.append(httpx.ReadTimeout("timeout"))
+    with pytest.raises(httpx.ReadTimeout):
+        store.get_tables(db, ["mahasiswas"])
+    assert not store._delta_disabled
+
+    db.tables["mahasiswas"].append(_mahasiswa(5, "2024-02-01"))
+    frames, stats = store.get_tables(db, ["mahasiswas"])
+    assert stats["mahasiswas"]["mode"] == "delta"
+    assert len(frames["mahasiswas"]) == 6
+
+
+def test_missing_watermark_column_falls_back_to_full_sync():
+    db, store = _store_with_snapshot()
+
+    store.expire(["mahasiswas"])
+    db.missing_columns["mahasiswas"] = {"updated_at"}
+    _, stats = store.get_tables(db, ["mahasiswas"])
+    assert store._delta_disabled == {"mahasiswas"}
+    assert stats["mahasiswas"]["mode"] == "full"
+
+
+def test_missing_watermark_disables_delta_only_for_that_table():
+    db = FakeSupabase(
+        {
+            "mahasiswas": [_mahasiswa(i) for i in range(3)],
+            "semesters": [{"semester_id": 1, "nama_semester": "Ganjil 2024"}],
+        },
+        missing_columns={"semesters": {"updated_at"}},
+    )
+    store = DataStore(snapshot_dir=None)
+    store.get_tables(db, ["mahasiswas", "semesters"])
+    assert store._delta_disabled == {"semesters"}
+
+    store.expire(["mahasiswas", "semesters"])
+    _, stats = store.get_tables(db, ["mahasiswas", "semesters"])
+    assert stats["mahasiswas"]["mode"] == "delta"
+    assert stats["semesters"]["mode"] == "full"
+
+
+def test_delta_merge_keeps_awards_from_every_semester():
+    def award(semester, updated_at="2024-01-01"):
+        return {
+            "mahasiswa_id": 1, "beasiswa_id": 7, "semester_penerimaan_id": semester,
+            "jumlah_diterima": 1000, "updated_at": updated_at,
+        }
+
+    db = FakeSupabase({"penerimaan_beasiswas": [award(1), award(2)]})
+    store = DataStore(snapshot_dir=None)
+    frames, _ = store.get_tables(db, ["penerimaan_beasiswas"])
+    assert len(frames["penerimaan_beasiswas"]) == 2
+
+    db.tables["penerimaan_beasiswas"].append(award(3, "2024-02-01"))
+    store.expire(["penerimaan_beasiswas"])
+    frames, stats = store.get_tables(db, ["penerimaan_beasiswas"])
+    assert stats["penerimaan_beasiswas"]["mode"] == "delta"
+    assert frames["penerimaan_beasiswas"]["semester_penerimaan_id"].tolist() == [1, 2, 3]
+
+
+def test_delta_merge_replaces_changed_rows_and_keeps_order():
+    db = FakeSupabase({"mahasiswas": [_mahasiswa(i, f"2024-01-0{i + 1}") for i in range(5)]})
+    store = DataStore(snapshot_dir=None)
+    store.get_tables(db, ["mahasiswas"])
+    version = store.version("mahasiswas")
+
+    db.tables["mahasiswas"][2] = {**_mahasiswa(2, "2024-03-01"), "jurusan": "B"}
+    db.tables["mahasiswas"].append(_mahasiswa(9, "2024-03-01"))
+    store.expire(["mahasiswas"])
+    frames, stats = store.get_tables(db, ["mahasiswas"])
+
+    frame = frames["mahasiswas"]
+    assert stats["mahasiswas"]["mode"] == "delta"
+    # Hanya baris dengan watermark >= watermark snapshot (2024-01-05) yang diunduh
+    assert stats["mahasiswas"]["rows"] == 3
+    assert frame["mahasiswa_id"].tolist() == [0, 1, 2, 3, 4, 9]
+    assert frame.loc[frame["mahasiswa_id"] == 2, "jurusan"].item() == "B"
+    assert store.version("mahasiswas") == version + 1
+
+
+def test_empty_delta_keeps_snapshot_version():
+    db, store = _store_with_snapshot()
+    version = store.version("mahasiswas")
+
+    db.tables["mahasiswas"] = []
+    store.expire(["mahasiswas"])
+    frames, stats = store.get_tables(db, ["mahasiswas"])
+    assert (stats["mahasiswas"]["mode"], stats["mahasiswas"]["rows"]) == ("delta", 0)
+    assert len(frames["mahasiswas"]) == 5
+    assert store.version("mahasiswas") == version
+
+
+def test_watermark_planning():
+    db, store = _store_with_snapshot()
+    mode, query = store._plan(db, "mahasiswas")
+    assert mode == "delta"
+    assert query().filters
+
+    # Tabel append-only memakai gt pada primary key
+    rows = [{"status_akademik_id": k, "mahasiswa_id": k, "semester_id": 1, "ipk": 3.0} for k in range(4)]
+    db.tables["status_akademik_semesters"] = rows
+    store.get_tables(db, ["status_akademik_semesters"])
+    mode, query = store._plan(db, "status_akademik_semesters")
+    assert mode == "delta"
+    assert query().execute().data == []
+    rows.append({"status_akademik_id": 4, "mahasiswa_id": 4, "semester_id": 1, "ipk": 3.5})
+    assert [row["status_akademik_id"] for row in query().execute().data] == [4]
+
+    # Setelah interval sinkronisasi penuh, watermark diabaikan
+    store.full_sync_interval = -1
+    mode, query = store._plan(db, "mahasiswas")
+    assert mode == "full"
+    assert not query().filters
@@ -0,0 +1,48 @@
+import json
+
+from tests.fake_supabase import FakeSupabase
+from utils.data_store import DataStore
+
+
+def _rows(n):
+    return [
+        {"mahasiswa_id": i, "nama_lengkap": f"N{i}", "nim": str(i), "jurusan": "A",
+         "tahun_masuk": 2020, "status_mahasiswa": "Aktif", "updated_at": "2024-01-01"}
+        for i in range(n)
+    ]
+
+
+def _warm(tmp_path):
+    db = FakeSupabase({"mahasiswas": _rows(3)})
+    DataStore(snapshot_dir=str(tmp_path)).get_tables(db, ["mahasiswas"])
+    return db
+
+
+def test_new_process_serves_from_disk_without_fetching(tmp_path):
+    _warm(tmp_path)
+    db = FakeSupabase({"mahasiswas": _rows(5)})
+    store = DataStore(snapshot_dir=str(tmp_path))
+    frames, stats = store.get_tables(db, ["mahasiswas"], max_age=10 ** 9)
+    assert stats["mahasiswas"]["mode"] == "disk"
+    assert len(frames["mahasiswas"]) == 3
+    assert db.calls == []
+    assert store.version("mahasiswas") == 1
+
+
+def test_snapshot_with_other_columns_or_format_is_ignored(tmp_path):
+    _warm(tmp_path)
+    meta_path = tmp_path / "mahasiswas.json"
+    meta = json.loads(meta_path.read_text())
+    for change in ({"columns": ["mahasiswa_id"]}, {"format": -1}):
+        meta_path.write_text(json.dumps({**meta, **change}))
+        db = FakeSupabase({"mahasiswas": _rows(5)})
+        frames, stats = DataStore(snapshot_dir=str(tmp_path)).get_tables(db, ["mahasiswas"])
+        assert stats["mahasiswas"]["mode"] == "full"
+        assert len(frames["mahasiswas"]) == 5
+
+
+def test_invalidate_removes_disk_files(tmp_path):
+    _warm(tmp_path)
+    store = DataStore(snapshot_dir=str(tmp_path))
+    store.invalidate("mahasiswas")
+    assert not list(tmp_path.iterdir())
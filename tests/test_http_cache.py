@@ -0,0 +1,49 @@
+import os
+
+from utils.api_fetcher import _get_page, source_config
+from utils.http_cache import ResponseCache
+
+
+class Response:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.links = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None, headers=None):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+def test_entry_pruned_before_304_falls_back_to_full_fetch(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    config = source_config({"url": "https://api.test/mahasiswa"})
+    cache.store(config["url"], {}, Response(200, b"[1]", {"ETag": '"v1"'}))
+    entry = cache.lookup(config["url"], {})
+
+    os.remove(entry["path"])
+    session = Session([Response(304), Response(200, b"[2]", {"ETag": '"v2"'})])
+    cache.lookup = lambda url, params, headers=None: entry
+    body, _, cached = _get_page(session, cache, config["url"], {}, config)
+    assert (body, cached) == (b"[2]", False)
+    assert session.requests[0] == {"If-None-Match": '"v1"'}
+    assert session.requests[1] == {}
+
+
+def test_authorization_is_part_of_the_cache_key(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    url = "https://api.test/mahasiswa"
+    cache.store(url, {}, Response(200, b"[1]", {"ETag": '"a"'}), headers={"Authorization": "Bearer a"})
+    assert cache.lookup(url, {}, {"Authorization": "Bearer a"})["etag"] == '"a"'
+    assert cache.lookup(url, {}, {"Authorization": "Bearer b"}) is None
+    assert cache.lookup(url, {}) is None
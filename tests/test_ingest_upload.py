@@ -0,0 +1,87 @@
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import load_workbook
+from postgrest.exceptions import APIError
+
+from utils import bulk_loader
+from utils.excel_uploader import ENUM_SHEET, GUIDE_SHEET, UPLOAD_SHEET, _build_excel_template, ingest_upload, iter_upload_blocks
+
+SPECS = [
+    {"name": "nim", "kind": "text", "required": True, "max_length": None, "enum_values": None},
+    {"name": "nama", "kind": "text", "required": True, "max_length": None, "enum_values": None},
+]
+
+
+def _csv(rows):
+    lines = ["nim,nama"] + [f"{nim},{nama}" for nim, nama in rows]
+    return BytesIO("\n".join(lines).encode("utf-8"))
+
+
+def test_resume_skips_batches_already_sent(monkeypatch):
+    monkeypatch.setattr(bulk_loader, "DEFAULT_BATCH_ROWS", 2)
+    sent, fail_nims = [], {"0008"}
+
+    def send_batch(supabase, table_name, rows, mode, on_conflict):
+        nims = [row["nim"] for row in rows]
+        if fail_nims & set(nims):
+            raise APIError({"code": "23505", "message": "duplicate key value violates unique constraint"})
+        sent.extend(nims)
+
+    monkeypatch.setattr(bulk_loader, "send_batch", send_batch)
+    rows = [(f"{i:04d}", "" if i == 7 else f"Mhs {i}") for i in range(1, 10)]
+
+    # Blok kedua (baris 5-8): batch 1 [0005, 0006] masuk, batch 2 [0008] gagal
+    first = list(ingest_upload(None, "mahasiswas", _csv(rows), "csv", SPECS, block_rows=4))
+    assert [report[1] for report in first] == [4, 2]
+    resume, _, rejected, error = first[-1]
+    assert resume == {"rows": 4, "skip_batches": [1]}
+    assert rejected["nim"].tolist() == ["0007"]
+    assert error is not None
+
+    fail_nims.clear()
+    second = list(ingest_upload(None, "mahasiswas", _csv(rows), "csv", SPECS, resume=resume, block_rows=4))
+    assert [report[1] for report in second] == [1, 1]
+    assert [report[3] for report in second] == [None, None]
+    assert second[-1][0] == {"rows": 9, "skip_batches": []}
+    # Baris ditolak blok yang dilanjutkan tidak dilaporkan dua kali
+    assert second[0][2].empty
+    assert sorted(sent) == [f"{i:04d}" for i in range(1, 10) if i != 7]
+    assert len(sent) == len(set(sent))
+
+
+def test_parquet_blocks_are_fixed_size_after_skip():
+    buffer = BytesIO()
+    pd.DataFrame({"nim": [f"{i:04d}" for i in range(10)]}).to_parquet(buffer, row_group_size=4)
+    blocks = list(iter_upload_blocks(buffer, "parquet", SPECS, block_rows=3, skip_rows=4))
+    assert [offset for offset, _ in blocks] == [4, 7]
+    assert [block["nim"].tolist() for _, block in blocks] == [["0004", "0005", "0006"], ["0007", "0008", "0009"]]
+
+
+def test_csv_text_columns_keep_leading_zeros():
+    blocks = list(iter_upload_blocks(_csv([("0001", "Ana"), ("0002", "Budi")]), "csv", SPECS, block_rows=1, skip_rows=1))
+    assert [(offset, block["nim"].tolist()) for offset, block in blocks] == [(1, ["0002"])]
+
+
+def test_excel_template_round_trips_through_block_reader():
+    columns = [
+        {"column_name": "nim", "data_type": "text", "is_nullable": "NO"},
+        {"column_name": "status", "data_type": "USER-DEFINED", "is_nullable": "YES"},
+    ]
+    specs = SPECS[:1] + [{"name": "status", "kind": "enum", "required": False, "max_length": None, "enum_values": ["Aktif", "Lulus"]}]
+    # Lewati cache agar template dibangun ulang di setiap test
+    content = _build_excel_template.__wrapped__(columns, specs, "mahasiswas", "v1")
+
+    workbook = load_workbook(BytesIO(content))
+    assert workbook.sheetnames == [UPLOAD_SHEET, GUIDE_SHEET, ENUM_SHEET]
+    assert workbook[ENUM_SHEET].sheet_state == "hidden"
+    assert [cell.value for cell in workbook[ENUM_SHEET]["B"]] == ["status", "Aktif", "Lulus"]
+    validation = workbook[UPLOAD_SHEET].data_validations.dataValidation[0]
+    assert validation.formula1 == f"'{ENUM_SHEET}'!$B$2:$B$3"
+    assert [row[1] for row in workbook[GUIDE_SHEET].iter_rows(min_row=2, values_only=True)] == ["YA", "TIDAK"]
+
+    workbook[UPLOAD_SHEET].append(["0001", "Aktif"])
+    filled = BytesIO()
+    workbook.save(filled)
+    blocks = list(iter_upload_blocks(filled, "excel", specs))
+    assert [block.to_dict("records") for _, block in blocks] == [[{"nim": "0001", "status": "Aktif"}]]
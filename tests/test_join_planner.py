@@ -0,0 +1,52 @@
+import pandas as pd
+
+from utils.join_planner import normalize_key, plan_joins, run_join_plan
+
+
+def _rule(left, left_key, right, right_key, join_type="INNER"):
+    return {
+        "left_api_alias": left, "left_on_key": left_key,
+        "right_api_alias": right, "right_on_key": right_key, "join_type": join_type,
+    }
+
+
+def test_long_numeric_keys_are_normalized_exactly():
+    keys = pd.Series(["123456789012345678901", " 987654321098765432109 ", "9007199254740993", "9007199254740993.0", "007"])
+    assert normalize_key(keys).tolist() == [
+        "123456789012345678901", "987654321098765432109", "9007199254740993", "9007199254740993", "7",
+    ]
+    mixed = pd.Series([9007199254740993, "9007199254740993", 12.0, None], dtype=object)
+    assert normalize_key(mixed).tolist() == ["9007199254740993", "9007199254740993", "12", pd.NA]
+
+
+def test_distinct_long_keys_do_not_join():
+    frames = {
+        "a": pd.DataFrame({"id": ["123456789012345678901", "9007199254740993"], "x": [1, 2]}),
+        "b": pd.DataFrame({"id": ["987654321098765432109", 9007199254740992], "y": [3, 4]}),
+    }
+    result, _, _ = run_join_plan(frames, [_rule("a", "id", "b", "id")])
+    assert result.empty
+
+
+def test_reordered_inner_joins_keep_user_column_names():
+    frames = {
+        "a": pd.DataFrame({"id": range(50), "kode": range(50), "nama": [f"a{i}" for i in range(50)]}),
+        "b": pd.DataFrame({"id": list(range(50)) * 3, "nama": ["b"] * 150}),
+        "c": pd.DataFrame({"kode": [1, 2], "nama": ["c1", "c2"]}),
+    }
+    rules = [_rule("a", "id", "b", "id"), _rule("a", "kode", "c", "kode")]
+    # Aturan kedua lebih selektif sehingga dijalankan lebih dulu
+    assert plan_joins(frames, rules)[0] is rules[1]
+
+    result, _, _ = run_join_plan(frames, rules)
+    expected = pd.merge(frames["a"], frames["b"], on="id", suffixes=("", "_b"))
+    expected = pd.merge(expected, frames["c"], on="kode", suffixes=("", "_c"))
+    assert result.columns.tolist() == expected.columns.tolist() == ["id", "kode", "nama", "nama_b", "nama_c"]
+    pd.testing.assert_frame_equal(
+        result.sort_values(["id"]).reset_index(drop=True),
+        expected.sort_values(["id"]).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+    reversed_result, _, _ = run_join_plan(frames, rules[::-1])
+    assert reversed_result.columns.tolist() == ["id", "kode", "nama", "nama_c", "nama_b"]
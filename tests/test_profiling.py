@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from utils.profiling import SKETCH_SIZE, profile_frames
+
+
+def _chunks(values, size):
+    return [pd.DataFrame({"nim": values[i:i + size]}) for i in range(0, len(values), size)]
+
+
+def test_distinct_is_exact_below_sketch_size():
+    values = [f"{i % 500:05d}" for i in range(3000)] + [None] * 1000
+    row = profile_frames(_chunks(values, 700)).iloc[0]
+    assert row["distinct"] == 500
+    assert not row["distinct_perkiraan"]
+    assert row["rasio_null"] == 0.25
+
+
+def test_kmv_estimate_within_error_bounds():
+    distinct = 100_000
+    values = np.random.default_rng(7).integers(0, distinct, 300_000).astype(str).tolist()
+    actual = len(set(values))
+    row = profile_frames(_chunks(values, 25_000)).iloc[0]
+    assert row["distinct_perkiraan"]
+    # Galat standar KMV ~ 1/sqrt(k); batas 5 sigma
+    assert abs(row["distinct"] - actual) / actual < 5 / np.sqrt(SKETCH_SIZE)
+
+
+def test_sketch_does_not_depend_on_chunking():
+    values = [str(i) for i in range(50_000)]
+    whole = profile_frames([pd.DataFrame({"nim": values})]).iloc[0]["distinct"]
+    assert profile_frames(_chunks(values, 3_000)).iloc[0]["distinct"] == whole
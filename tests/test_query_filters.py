@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.fake_supabase import FakeSupabase
+from utils.data_loader import apply_filters, fetch_table, filter_frame
+
+ROWS = [
+    {"mahasiswa_id": i, "nama_lengkap": f"N{i}", "jurusan": "ABC"[i % 3], "tahun_masuk": 2019 + i % 4}
+    for i in range(30)
+]
+
+FILTERS = [
+    [("jurusan", "in", ["A", "C"])],
+    [("jurusan", "in", []), ("tahun_masuk", "gte", np.float64(2021.0))],
+    [("tahun_masuk", "lte", np.int64(2020)), ("jurusan", "eq", "B")],
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_server_and_local_filters_agree(filters):
+    db = FakeSupabase({"mahasiswas": ROWS})
+    frame, _ = fetch_table(db, "mahasiswas", columns=["mahasiswa_id", "jurusan", "tahun_masuk"],
+                           filters=filters, order_by="mahasiswa_id")
+    local = filter_frame(pd.DataFrame(ROWS), filters)
+    assert frame["mahasiswa_id"].tolist() == local["mahasiswa_id"].tolist()
+    assert list(frame.columns) == ["mahasiswa_id", "jurusan", "tahun_masuk"]
+
+
+def test_filter_values_become_plain_literals():
+    calls = []
+
+    class Query:
+        def gte(self, column, value):
+            calls.append((column, value, type(value)))
+            return self
+
+        def in_(self, column, values):
+            calls.append((column, values, type(values[0])))
+            return self
+
+    apply_filters(Query(), [("tahun_masuk", "gte", np.float64(2021.0)), ("jurusan", "in", np.array([1, 2]))])
+    assert calls == [("tahun_masuk", 2021, int), ("jurusan", [1, 2], int)]
+
+
+def test_unknown_operator_is_rejected():
+    with pytest.raises(ValueError):
+        apply_filters(object(), [("ipk", "like", "3%")])
+    with pytest.raises(ValueError):
+        filter_frame(pd.DataFrame(ROWS), [("jurusan", "like", "A")])
@@ -0,0 +1,76 @@
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from utils.schema_catalog import SchemaCatalog
+
+CATALOG = {
+    "version": "v1",
+    "tables": {"mahasiswas": [{"column_name": "mahasiswa_id", "data_type": "integer", "is_nullable": "NO"}]},
+}
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class CatalogSupabase:
+    def __init__(self):
+        self.failures = []
+        self.calls = []
+
+    def rpc(self, name, params=None):
+        self.calls.append(name)
+        if self.failures:
+            raise self.failures.pop(0)
+        if name == "get_schema_catalog":
+            return Response(CATALOG)
+        if name == "get_public_tables":
+            return Response([{"table_name": "mahasiswas"}])
+        return Response([])
+
+
+def test_transient_error_keeps_batched_catalog():
+    db = CatalogSupabase()
+    catalog = SchemaCatalog(db)
+    db.failures.append(httpx.ConnectError("offline"))
+    with pytest.raises(httpx.ConnectError):
+        catalog.table_names()
+    assert catalog.batched
+
+    assert catalog.table_names() == ["mahasiswas"]
+    assert db.calls == ["get_schema_catalog", "get_schema_catalog"]
+
+
+def test_missing_function_falls_back_to_per_table_rpcs():
+    db = CatalogSupabase()
+    catalog = SchemaCatalog(db)
+    db.failures.append(APIError({"code": "PGRST202", "message": "Could not find the function"}))
+    assert catalog.table_names() == ["mahasiswas"]
+    assert not catalog.batched
+    assert "get_public_tables" in db.calls
+
+
+def test_fallback_keeps_catalog_until_tables_change(monkeypatch):
+    db = CatalogSupabase()
+    catalog = SchemaCatalog(db)
+    db.failures.append(APIError({"code": "PGRST202", "message": "Could not find the function"}))
+    catalog.columns("mahasiswas")
+    version = catalog.version
+    specs = catalog.column_specs("mahasiswas")
+
+    # Pemeriksaan berikutnya tanpa perubahan: versi, isi dan spesifikasi tetap
+    catalog.refresh()
+    catalog.columns("mahasiswas")
+    assert catalog.version == version
+    assert catalog.column_specs("mahasiswas") is specs
+
+    details = [{"column_name": "mahasiswa_id", "data_type": "integer", "is_nullable": "NO"}]
+    monkeypatch.setattr(catalog, "_load_table", lambda table_name: details)
+    catalog.refresh()
+    assert catalog.columns("mahasiswas") == details
+    assert catalog.version != version
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from utils.schema_validation import ERROR_COLUMN, is_blank, validate_frame
+
+NAMA_SPEC = {"name": "nama", "kind": "text", "required": True, "max_length": None, "enum_values": None}
+
+
+def test_is_blank_string_dtype():
+    values = pd.Series(["  ", "Ana", None], dtype="string")
+    assert is_blank(values).tolist() == [True, False, True]
+
+
+def test_whitespace_only_required_field_is_rejected():
+    df = pd.DataFrame({"nama": ["  ", "Ana"]})
+    valid, rejected = validate_frame(df, [NAMA_SPEC])
+    assert valid["nama"].tolist() == ["Ana"]
+    assert len(rejected) == 1
+    assert "wajib diisi" in rejected[ERROR_COLUMN].iloc[0]
+
+
+def test_valid_and_rejected_rows_partition_the_frame():
+    specs = [
+        NAMA_SPEC,
+        {"name": "angkatan", "kind": "integer", "required": False, "max_length": None, "enum_values": None},
+        {"name": "tanggal_lahir", "kind": "date", "required": False, "max_length": None, "enum_values": None},
+    ]
+    df = pd.DataFrame({
+        "nama": ["Ana", "Budi", None, "Citra"],
+        "angkatan": ["2021", "2021.5", "2022", None],
+        "tanggal_lahir": ["2003-01-31", "31/12/2003", "bukan tanggal", "15/08/2004"],
+        "catatan": ["x", "y", "z", "w"],
+    })
+    valid, rejected = validate_frame(df, specs)
+
+    assert valid.index.tolist() == [0, 3]
+    assert rejected.index.tolist() == [1, 2]
+    # Kolom di luar skema tidak dikirim, nilai valid sudah dikonversi
+    assert list(valid.columns) == ["nama", "angkatan", "tanggal_lahir"]
+    assert valid["angkatan"].tolist()[0] == 2021 and pd.isna(valid["angkatan"].iloc[1])
+    assert valid["tanggal_lahir"].tolist() == ["2003-01-31", "2004-08-15"]
+    # Baris ditolak tetap berisi nilai asli beserta semua alasannya
+    assert rejected.loc[1, "angkatan"] == "2021.5"
+    assert rejected.loc[1, ERROR_COLUMN] == "angkatan: bukan bilangan bulat"
+    assert rejected.loc[2, ERROR_COLUMN] == "nama: wajib diisi; tanggal_lahir: format tanggal tidak dikenali"
+
+
+def test_missing_required_column_rejects_every_row():
+    valid, rejected = validate_frame(pd.DataFrame({"angkatan": [2021, 2022]}), [NAMA_SPEC])
+    assert valid.empty
+    assert rejected[ERROR_COLUMN].tolist() == ["nama: kolom wajib tidak ada"] * 2
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from utils.search_index import build_search_index
+
+STUDENTS = pd.DataFrame({
+    "mahasiswa_id": [1, 2, 3, 4],
+    "nim": ["2012001", "2101234", "1900007", None],
+    "nama_lengkap": ["Andi Santoso", "Siti Rahayu", "Dewi Lestari", "Bagus Ananta"],
+})
+
+
+def _contains(query):
+    # Perilaku awal: str.contains tanpa membedakan huruf pada nama dan NIM
+    mask = STUDENTS["nama_lengkap"].str.contains(query, case=False, na=False)
+    mask |= STUDENTS["nim"].str.contains(query, case=False, na=False)
+    return STUDENTS.loc[mask, "mahasiswa_id"].tolist()
+
+
+@pytest.mark.parametrize("query", ["an", "12", "a", "7", "ti", "anto", "2012001", "ESTA"])
+def test_search_matches_substring_scan(query):
+    index = build_search_index(STUDENTS)
+    assert sorted(index.search(query).tolist()) == sorted(_contains(query))
+
+
+def test_find_nim_is_exact():
+    index = build_search_index(STUDENTS)
+    assert index.find_nim(" 2101234 ").tolist() == [2]
+    assert index.find_nim("210123").tolist() == []
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from tests.fake_supabase import FakeSupabase
+from utils.data_store import DataStore
+
+
+def _rows(n, updated_at="2024-01-01"):
+    return [
+        {"mahasiswa_id": i, "nama_lengkap": f"N{i}", "nim": str(i), "jurusan": "A",
+         "tahun_masuk": 2020, "status_mahasiswa": "Aktif", "updated_at": updated_at}
+        for i in range(n)
+    ]
+
+
+def test_callers_share_one_snapshot_frame():
+    db = FakeSupabase({"mahasiswas": _rows(3)})
+    store = DataStore(snapshot_dir=None)
+    first, _ = store.get_tables(db, ["mahasiswas"])
+    second, _ = store.get_tables(db, ["mahasiswas"])
+    assert first["mahasiswas"] is second["mahasiswas"]
+    assert len(db.calls) == 1
+
+
+def test_concurrent_cold_requests_fetch_once():
+    db = FakeSupabase({"mahasiswas": _rows(3)})
+    store = DataStore(snapshot_dir=None)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.get_tables(db, ["mahasiswas"])[0]["mahasiswas"]))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4
+    assert all(frame is results[0] for frame in results)
+    assert len(db.calls) == 1
+
+
+def test_stale_snapshot_is_served_while_revalidating():
+    db = FakeSupabase({"mahasiswas": _rows(3)})
+    store = DataStore(snapshot_dir=None)
+    store.get_tables(db, ["mahasiswas"])
+
+    version = store.version("mahasiswas")
+    db.tables["mahasiswas"] = _rows(4, "2024-02-01")
+    frames, _ = store.get_tables(db, ["mahasiswas"], max_age=-1)
+    assert len(frames["mahasiswas"]) == 3
+
+    deadline = time.time() + 5
+    while store.version("mahasiswas") == version and time.time() < deadline:
+        time.sleep(0.01)
+    frames, _ = store.get_tables(db, ["mahasiswas"])
+    assert len(frames["mahasiswas"]) == 4
+
+
+def test_derived_objects_are_built_once_per_version():
+    db = FakeSupabase({"mahasiswas": _rows(3)})
+    store = DataStore(snapshot_dir=None)
+    store.get_tables(db, ["mahasiswas"])
+    builds = []
+
+    def builder(frame):
+        builds.append(len(frame))
+        return object()
+
+    first = store.derived("mahasiswas", "index", builder)
+    assert store.derived("mahasiswas", "index", builder) is first
+
+    db.tables["mahasiswas"].append(_rows(4, "2024-02-01")[3])
+    store.expire(["mahasiswas"])
+    store.get_tables(db, ["mahasiswas"])
+    assert store.derived("mahasiswas", "index", builder) is not first
+    assert builds == [3, 4]
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from utils.spill import prune_session_dirs, spill_frame, spill_join
+
+
+def test_prune_removes_only_expired_session_dirs(tmp_path):
+    for name in ("lama", "baru", "milik_sesi"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "part-00000.parquet").write_bytes(b"x")
+    old = time.time() - 3 * 3600
+    os.utime(tmp_path / "lama", (old, old))
+    os.utime(tmp_path / "milik_sesi", (old, old))
+
+    prune_session_dirs(str(tmp_path), max_age=3600, keep="milik_sesi")
+
+    assert sorted(os.listdir(tmp_path)) == ["baru", "milik_sesi"]
+
+
+def _rule(left_key, right_key, join_type):
+    return {
+        "left_api_alias": "a", "left_on_key": left_key,
+        "right_api_alias": "b", "right_on_key": right_key, "join_type": join_type,
+    }
+
+
+def _spilled_join(tmp_path, left, right, rule, partitions=8):
+    sources = {"a": spill_frame(left, str(tmp_path / "a"), 7), "b": spill_frame(right, str(tmp_path / "b"), 7)}
+    result, steps, _ = spill_join(sources, [rule], str(tmp_path / "join"), partitions=partitions)
+    frame = pd.concat(list(result.iter_frames()), ignore_index=True)
+    return frame, steps
+
+
+def _sorted(frame):
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("how", ["INNER", "LEFT"])
+def test_spill_join_matches_pandas_merge(tmp_path, how):
+    # Kunci 20-39 hanya ada di kiri sehingga sebagian partisi kanan kosong
+    left = pd.DataFrame({"id": range(40), "nama": [f"m{i}" for i in range(40)]})
+    right = pd.DataFrame({"id": [i % 20 for i in range(30)], "nama": [f"b{i}" for i in range(30)], "nilai": range(30)})
+
+    frame, steps = _spilled_join(tmp_path, left, right, _rule("id", "id", how))
+    expected = pd.merge(left, right, on="id", how=how.lower(), suffixes=("", "_b"))
+    assert list(frame.columns) == list(expected.columns) == ["id", "nama", "nama_b", "nilai"]
+    pd.testing.assert_frame_equal(_sorted(frame), _sorted(expected), check_dtype=False)
+    assert steps[0]["baris_hasil"] == len(expected)
+
+
+def test_spill_join_with_different_key_names(tmp_path):
+    left = pd.DataFrame({"kode": ["1", "2", "3"], "x": [1, 2, 3]})
+    right = pd.DataFrame({"kode_ref": [1, 1, 2], "y": [10, 11, 20]})
+
+    frame, _ = _spilled_join(tmp_path, left, right, _rule("kode", "kode_ref", "LEFT"), partitions=4)
+    assert list(frame.columns) == ["kode", "x", "kode_ref", "y"]
+    assert sorted(frame["y"].dropna().tolist()) == [10, 11, 20]
+    assert frame.loc[frame["kode"] == "3", "y"].isna().all()
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.student_summary import build_student_summary
+
+SEMESTERS = pd.DataFrame({
+    "mahasiswa_id": [1, 1, 1, 2, 2, 3],
+    "nama_lengkap": ["Andi", "Andi", "Andi", "Siti", "Siti", "Dewi"],
+    "nim": ["01", "01", "01", "02", "02", "03"],
+    "program_studi": ["TI", "TI", "TI", "SI", "SI", "TI"],
+    "tahun_masuk": [2020, 2020, 2020, 2021, 2021, 2022],
+    "semester_id": [1, 2, 2, 1, 2, 1],
+    "sks_lulus_semester": [20, 18, 0, 21, np.nan, 12],
+    "ipk": [3.1, 3.2, 3.25, 2.4, np.nan, 3.9],
+    "ips": [3.1, 3.3, 3.3, 2.4, 2.0, 3.9],
+})
+
+
+def baseline_summary(df):
+    # Beberapa groupby + merge dari versi awal halaman
+    sks_lulus = df.groupby("mahasiswa_id")["sks_lulus_semester"].sum().reset_index(name="total_sks")
+    semester_aktif = df.groupby("mahasiswa_id")["semester_id"].nunique().reset_index(name="semester_aktif")
+    ipk_terakhir = df.groupby("mahasiswa_id")["ipk"].last().reset_index(name="ipk_terakhir")
+    ips_terakhir = df.groupby("mahasiswa_id")["ips"].last().reset_index(name="ips_terakhir")
+    summary = df[["mahasiswa_id", "nama_lengkap", "nim", "program_studi", "tahun_masuk"]].drop_duplicates()
+    return summary.merge(sks_lulus, on="mahasiswa_id").merge(semester_aktif, on="mahasiswa_id") \
+        .merge(ipk_terakhir, on="mahasiswa_id").merge(ips_terakhir, on="mahasiswa_id")
+
+
+def test_summary_matches_original_grouping():
+    pd.testing.assert_frame_equal(
+        build_student_summary(SEMESTERS).reset_index(drop=True),
+        baseline_summary(SEMESTERS).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_empty_input_keeps_columns():
+    summary = build_student_summary(SEMESTERS.iloc[0:0])
+    assert summary.empty
+    assert {"mahasiswa_id", "total_sks", "semester_aktif", "ipk_terakhir", "ips_terakhir"} <= set(summary.columns)
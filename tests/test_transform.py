@@ -0,0 +1,30 @@
+import pandas as pd
+
+from utils.schema_validation import ERROR_COLUMN
+from utils.transform import default_converters, transform_frame
+
+SPECS = [
+    {"name": "nim", "kind": "text", "required": True, "max_length": 10, "enum_values": None},
+    {"name": "status", "kind": "enum", "required": True, "max_length": None, "enum_values": ["Aktif", "Lulus"]},
+    {"name": "angkatan", "kind": "integer", "required": False, "max_length": None, "enum_values": None},
+]
+
+
+def test_transform_splits_rows_after_converters():
+    frame = pd.DataFrame({
+        "student_id": [" 2101 ", "2102", "21030000000"],
+        "state": ["aktif ", "LULUS", "Aktif"],
+        "year": ["2021", "x", "2021"],
+    })
+    converters = default_converters(SPECS)
+    valid, rejected = transform_frame(frame, {"student_id": "nim", "state": "status", "year": "angkatan"}, SPECS, converters)
+
+    assert valid.to_dict("records") == [{"nim": "2101", "status": "Aktif", "angkatan": 2021}]
+    assert rejected.index.tolist() == [1, 2]
+    assert rejected[ERROR_COLUMN].tolist() == ["angkatan: bukan bilangan bulat", "nim: lebih dari 10 karakter"]
+
+
+def test_unmapped_required_column_is_not_validated():
+    valid, rejected = transform_frame(pd.DataFrame({"student_id": ["2101"]}), {"student_id": "nim"}, SPECS)
+    assert valid["nim"].tolist() == ["2101"]
+    assert rejected.empty
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Ambang batas aturan akademik; dapat ditimpa lewat secrets bagian [academic_rules]
+DEFAULT_THRESHOLDS = {
+    "sks_lulus": 144,
+    "max_semester": 8,
+    "min_sks_per_semester": 12,
+    "ipk_cukup": 2.0,
+    "ipk_risiko": 2.5,
+    "ipk_intervensi": 3.0,
+    "ipk_cumlaude": 3.5,
+}
+
+STATUS_STUDI = ["Potensi Telat", "Underload", "Aman"]
+
+PERINGATAN_RISIKO = "⚠️ Risiko Tinggi Drop-Out"
+PERINGATAN_INTERVENSI = "⚠️ Butuh Intervensi Akademik"
+PERINGATAN_AMAN = "✅ Aman"
+PERINGATAN_DINI = [PERINGATAN_RISIKO, PERINGATAN_INTERVENSI, PERINGATAN_AMAN]
+
+REKOMENDASI = ["Konsultasi Dosen Wali", "-"]
+
+KATEGORI_TANPA_DATA = "Tidak Ada Data"
+KATEGORI_IPK = [
+    "Kurang (<2.0)",
+    "Cukup (2.0-2.49)",
+    "Baik (2.5-2.99)",
+    "Sangat Baik (3.0-3.49)",
+    "Cumlaude (≥3.5)",
+]
+
+
+def get_thresholds(overrides=None):
+    """Menggabungkan ambang default, secrets dan `overrides` (prioritas terakhir)."""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    try:
+        thresholds.update({k: float(v) for k, v in st.secrets.get("academic_rules", {}).items()})
+    except Exception:
+        pass
+    thresholds.update(overrides or {})
+    return thresholds
+
+
+def _categorical(values, categories, index):
+    return pd.Series(pd.Categorical(values, categories=categories), index=index)
+
+
+def classify_status_studi(total_sks: pd.Series, semester_aktif: pd.Series, thresholds=None) -> pd.Series:
+    """Potensi Telat / Underload / Aman berdasarkan total SKS dan semester aktif."""
+    t = get_thresholds(thresholds)
+    sks = pd.to_numeric(total_sks, errors="coerce").to_numpy(dtype=float)
+    semester = pd.to_numeric(semester_aktif, errors="coerce").to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sks_per_semester = sks / semester
+    values = np.select(
+        [
+            (semester > t["max_semester"]) & (sks < t["sks_lulus"]),
+            sks_per_semester < t["min_sks_per_semester"],
+        ],
+        STATUS_STUDI[:2],
+        default=STATUS_STUDI[2],
+    )
+    return _categorical(values, STATUS_STUDI, total_sks.index)
+
+
+def classify_peringatan_dini(ipk: pd.Series, thresholds=None) -> pd.Series:
+    """Peringatan dini berdasarkan IPK; IPK kosong dianggap aman."""
+    t = get_thresholds(thresholds)
+    values = pd.to_numeric(ipk, errors="coerce").to_numpy(dtype=float)
+    result = np.select(
+        [values < t["ipk_risiko"], values < t["ipk_intervensi"]],
+        PERINGATAN_DINI[:2],
+        default=PERINGATAN_AMAN,
+    )
+    return _categorical(result, PERINGATAN_DINI, ipk.index)
+
+
+def needs_intervention(status_studi: pd.Series, peringatan_dini: pd.Series) -> pd.Series:
+    """Mask mahasiswa yang berpotensi telat atau mendapat peringatan dini."""
+    return (status_studi == STATUS_STUDI[0]) | (peringatan_dini != PERINGATAN_AMAN)
+
+
+def classify_rekomendasi(status_studi: pd.Series, peringatan_dini: pd.Series) -> pd.Series:
+    """Rekomendasi tindak lanjut dari status studi dan peringatan dini."""
+    mask = needs_intervention(status_studi, peringatan_dini).to_numpy()
+    return _categorical(np.where(mask, REKOMENDASI[0], REKOMENDASI[1]), REKOMENDASI, status_studi.index)
+
+
+def classify_grade(ipk: pd.Series, thresholds=None) -> pd.Series:
+    """Kategori predikat IPK sebagai categorical; IPK kosong menjadi 'Tidak Ada Data'."""
+    t = get_thresholds(thresholds)
+    bins = [-np.inf, t["ipk_cukup"], t["ipk_risiko"], t["ipk_intervensi"], t["ipk_cumlaude"], np.inf]
+    kategori = pd.cut(pd.to_numeric(ipk, errors="coerce"), bins=bins, labels=KATEGORI_IPK, right=False)
+    kategori = kategori.cat.add_categories([KATEGORI_TANPA_DATA])
+    return kategori.fillna(KATEGORI_TANPA_DATA)
+
+
+def classify_students(df_summary: pd.DataFrame, thresholds=None) -> pd.DataFrame:
+    """Menambahkan kolom Status Studi, Peringatan Dini dan Rekomendasi ke ringkasan mahasiswa."""
+    df_summary = df_summary.copy(deep=False)
+    df_summary["Status Studi"] = classify_status_studi(df_summary["total_sks"], df_summary["semester_aktif"], thresholds)
+    df_summary["Peringatan Dini"] = classify_peringatan_dini(df_summary["ipk_terakhir"], thresholds)
+    df_summary["Rekomendasi"] = classify_rekomendasi(df_summary["Status Studi"], df_summary["Peringatan Dini"])
+    return df_summary
@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from supabase import Client
+
+from utils.academic_rules import classify_grade, get_thresholds
+from utils.cache import get_cache, make_key, table_tag
+from utils.data_loader import filter_frame
+from utils.data_store import get_data_store
+
+# Registry agregat bernama: {nama: (fungsi, tabel sumber)}
+AGGREGATES = {}
+
+
+def aggregate(name, tables):
+    """
+    Mendaftarkan fungsi agregat bernama.
+
+    Fungsi dipanggil sebagai `func(frames, filters, run)`: `frames` berisi
+    snapshot tabel sumber, `filters` adalah state filter aktif, dan
+    `run(nama, filters)` memanggil agregat lain (ikut ter-cache).
+    """
+    def register(func):
+        AGGREGATES[name] = (func, tuple(tables))
+        return func
+    return register
+
+
+class AggregateEngine:
+    """
+    Mengeksekusi agregat bernama di atas snapshot DataStore.
+
+    Hasil di-cache di TieredCache bersama per kombinasi nama agregat, versi
+    snapshot tabel sumber dan state filter, dengan tag tabel sumber. Grafik
+    hanya menerima hasil kecil yang sudah jadi; perubahan data (versi baru atau
+    `invalidate_tables`) otomatis membuat hasil lama tidak terpakai.
+    """
+
+    def __init__(self, store, cache):
+        self._store = store
+        self._cache = cache
+
+    def run(self, supabase: Client, name, filters=None):
+        func, tables = AGGREGATES[name]
+        filters = filters or {}
+        frames, _ = self._store.get_tables(supabase, list(tables))
+        key = make_key("aggregate", name, tuple(self._store.version(t) for t in tables), filters)
+
+        hit, result = self._cache.get(key)
+        if hit:
+            return result
+
+        result = func(frames, filters, lambda other, other_filters=None: self.run(supabase, other, other_filters))
+        self._cache.set(key, result, tags=[table_tag(t) for t in tables])
+        return result
+
+
+@st.cache_resource
+def get_aggregate_engine():
+    """Satu AggregateEngine per proses di atas DataStore dan cache bersama."""
+    return AggregateEngine(get_data_store(), get_cache())
+
+
+def run_aggregate(supabase: Client, name, filters=None):
+    """Pintasan untuk menjalankan agregat bernama. Hasilnya dipakai bersama; jangan diubah."""
+    return get_aggregate_engine().run(supabase, name, filters)
+
+
+# ========================
+# AGREGAT DASHBOARD
+# ========================
+
+@aggregate("mahasiswa_dasar", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def mahasiswa_dasar(frames, filters, run):
+    """
+    Status akademik terakhir tiap mahasiswa + data mahasiswa, kategori IPK dan
+    status beasiswa. Tidak bergantung filter, jadi dihitung sekali per versi snapshot.
+    """
+    df_mhs = frames["mahasiswas"]
+    df_status = frames["status_akademik_semesters"]
+    df_bea = frames["penerimaan_beasiswas"]
+
+    if not df_status.empty:
+        latest_status = df_status.sort_values("tanggal_evaluasi").drop_duplicates("mahasiswa_id", keep="last")
+        df_joined = latest_status.merge(df_mhs, on="mahasiswa_id", how="left")
+    else:
+        df_joined = df_mhs.copy()
+        df_joined["ipk"] = np.nan
+
+    df_joined["kategori_ipk"] = classify_grade(df_joined["ipk"], get_thresholds())
+    df_joined["penerima_beasiswa"] = df_joined["mahasiswa_id"].isin(df_bea["mahasiswa_id"]) if not df_bea.empty else False
+    return df_joined
+
+
+@aggregate("mahasiswa_terfilter", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def mahasiswa_terfilter(frames, filters, run):
+    """`mahasiswa_dasar` setelah semua filter (hanya mask, tanpa join ulang)."""
+    # Saat filter aktif, mahasiswa tanpa data (hasil left join) otomatis tidak lolos filter
+    df_joined = filter_frame(run("mahasiswa_dasar"), [
+        ("jurusan", "in", filters.get("prodi", ())),
+        ("tahun_masuk", "in", filters.get("tahun", ())),
+        ("status_mahasiswa", "in", filters.get("status", ())),
+    ])
+
+    ipk_range = filters.get("ipk_range")
+    if ipk_range and not df_joined["ipk"].isna().all():
+        df_joined = df_joined[df_joined["ipk"].between(*ipk_range) | df_joined["ipk"].isna()]
+    return df_joined.reset_index(drop=True)
+
+
+@aggregate("opsi_filter", ["mahasiswas"])
+def opsi_filter(frames, filters, run):
+    """Pilihan unik untuk filter sidebar, sekali per versi snapshot mahasiswas."""
+    df_mhs = frames["mahasiswas"]
+    return {
+        column: sorted(df_mhs[column].dropna().unique()) if column in df_mhs.columns else []
+        for column in ("jurusan", "tahun_masuk", "status_mahasiswa")
+    }
+
+
+@aggregate("rentang_ipk", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def rentang_ipk(frames, filters, run):
+    """Batas slider IPK dari seluruh mahasiswa (tanpa filter), sekali per versi snapshot."""
+    valid_ipk = run("mahasiswa_dasar")["ipk"].dropna()
+    if valid_ipk.empty:
+        return None
+    return float(valid_ipk.min()), float(valid_ipk.max())
+
+
+@aggregate("ringkasan_metrik", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def ringkasan_metrik(frames, filters, run):
+    filtered = run("mahasiswa_terfilter", filters)
+    thresholds = get_thresholds()
+    valid_ipk = filtered["ipk"].dropna()
+    return {
+        "total": len(filtered),
+        "rata_ipk": valid_ipk.mean() if not valid_ipk.empty else 0,
+        "penerima_beasiswa": int(filtered["penerima_beasiswa"].sum()) if not frames["penerimaan_beasiswas"].empty else None,
+        "aktif": int((filtered["status_mahasiswa"] == "Aktif").sum()) if "status_mahasiswa" in filtered.columns else 0,
+        "ipk_tinggi": int((valid_ipk >= thresholds["ipk_cumlaude"]).sum()),
+        "ipk_rendah": int((valid_ipk < thresholds["ipk_risiko"]).sum()),
+        "ipk_valid": len(valid_ipk),
+    }
+
+
+@aggregate("jumlah_per_prodi", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def jumlah_per_prodi(frames, filters, run):
+    filtered = run("mahasiswa_terfilter", filters)
+    counts = filtered["jurusan"].value_counts().reset_index()
+    counts.columns = ["jurusan", "count"]
+    return counts
+
+
+@aggregate("histogram_ipk", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def histogram_ipk(frames, filters, run):
+    valid_ipk = run("mahasiswa_terfilter", filters)["ipk"].dropna()
+    if valid_ipk.empty:
+        return None
+    counts, edges = np.histogram(valid_ipk, bins=20)
+    return {
+        "bins": pd.DataFrame({"ipk": (edges[:-1] + edges[1:]) / 2, "jumlah": counts, "lebar": np.diff(edges)}),
+        "rata_rata": valid_ipk.mean(),
+    }
+
+
+@aggregate("jumlah_per_kategori_ipk", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def jumlah_per_kategori_ipk(frames, filters, run):
+    counts = run("mahasiswa_terfilter", filters)["kategori_ipk"].value_counts()
+    return counts[counts > 0]
+
+
+@aggregate("tren_mahasiswa_masuk", ["mahasiswas"])
+def tren_mahasiswa_masuk(frames, filters, run):
+    df_mhs = frames["mahasiswas"]
+    trend = df_mhs.groupby("tahun_masuk")["mahasiswa_id"].count().reset_index()
+    trend.columns = ["tahun_masuk", "jumlah"]
+    return trend.sort_values("tahun_masuk")
+
+
+@aggregate("rata_ipk_per_semester", ["status_akademik_semesters", "semesters"])
+def rata_ipk_per_semester(frames, filters, run):
+    df_status, df_semester = frames["status_akademik_semesters"], frames["semesters"]
+    if df_status.empty or df_semester.empty:
+        return None
+    ipk_per_sem = df_status.groupby("semester_id")["ipk"].mean().reset_index()
+    ipk_per_sem = ipk_per_sem.merge(df_semester[["semester_id", "nama_semester"]], on="semester_id", how="left")
+    ipk_per_sem = ipk_per_sem.dropna(subset=["ipk", "nama_semester"])
+    return ipk_per_sem.sort_values("nama_semester")
+
+
+@aggregate("ranking_ipk_prodi", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def ranking_ipk_prodi(frames, filters, run):
+    filtered = run("mahasiswa_terfilter", filters)
+    prodi_stats = filtered.groupby("jurusan")["ipk"].agg(avg_ipk="mean", ipk_count="count").round(3).reset_index()
+    prodi_stats = prodi_stats[prodi_stats["ipk_count"] >= 5]
+    return prodi_stats.sort_values("avg_ipk", ascending=False).head(3)
+
+
+@aggregate("ranking_beasiswa_prodi", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def ranking_beasiswa_prodi(frames, filters, run):
+    if frames["penerimaan_beasiswas"].empty:
+        return None
+    filtered = run("mahasiswa_terfilter", filters)
+    bea_counts = filtered.groupby("jurusan")["penerima_beasiswa"].sum().reset_index()
+    return bea_counts.sort_values("penerima_beasiswa", ascending=False).head(3)
+
+
+@aggregate("ipk_per_status_beasiswa", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def ipk_per_status_beasiswa(frames, filters, run):
+    if frames["penerimaan_beasiswas"].empty:
+        return None
+    filtered = run("mahasiswa_terfilter", filters)
+    dapat_beasiswa = filtered["penerima_beasiswa"].astype(int)
+    avg_by_bea = filtered["ipk"].groupby(dapat_beasiswa).mean().rename_axis("dapat_beasiswa").reset_index()
+    avg_by_bea["Status"] = avg_by_bea["dapat_beasiswa"].map({1: "Ya", 0: "Tidak"})
+    return {"rata_rata": avg_by_bea, "korelasi": filtered["ipk"].corr(dapat_beasiswa)}
+
+
+@aggregate("statistik_ipk", ["mahasiswas", "status_akademik_semesters", "penerimaan_beasiswas"])
+def statistik_ipk(frames, filters, run):
+    valid_ipk = run("mahasiswa_terfilter", filters)["ipk"].dropna()
+    if valid_ipk.empty:
+        return None
+    stat_summary = {
+        "Mean": valid_ipk.mean(),
+        "Median": valid_ipk.median(),
+        "Min": valid_ipk.min(),
+        "Max": valid_ipk.max(),
+        "Q1 (25%)": valid_ipk.quantile(0.25),
+        "Q3 (75%)": valid_ipk.quantile(0.75),
+    }
+    return pd.DataFrame(stat_summary.items(), columns=["Statistik", "Nilai"])
@@ -1,84 +1,124 @@
 # api_extractor_module.py
 
+import os
 import streamlit as st
-import requests
 from supabase import Client
 import pandas as pd
-
-@st.cache_data(ttl=3600)
-def get_supabase_tables(_supabase: Client):
-    result = _supabase.rpc("get_public_tables").execute()
-    return sorted([row["table_name"] for row in result.data]) if result.data else []
-
-@st.cache_data(ttl=300)
-def get_table_columns_with_details(_supabase: Client, table_name: str):
-    result = _supabase.rpc("get_columns_with_details", {"t_name": table_name}).execute()
-    return result.data or []
-
-@st.cache_data(ttl=300)
-def get_enum_values(_supabase: Client, table_name: str, column_name: str):
-    result = _supabase.rpc("get_enum_values", {"schema_name": "public", "table_name": table_name, "column_name": column_name}).execute()
-    return [row["enum_value"] for row in result.data] if result.data else []
-
-@st.cache_data(ttl=300)
-def is_enum_column(_supabase: Client, table_name: str, column_name: str):
+from utils.api_fetcher import fetch_sources, get_fetch_config, source_config
+from utils.artifact_store import ArtifactHandle, get_artifact_store
+from utils.bulk_loader import (
+    MODE_INSERT, MODE_UPSERT, STATUS_OK, failed_batches, make_batches, run_bulk_insert, run_bulk_insert_chunks,
+    to_json_rows,
+)
+from utils.cache import cached
+from utils.data_store import invalidate_tables
+from utils.join_planner import build_frames, run_join_plan
+from utils.mapping_engine import is_key_column, load_mapping_profile, save_mapping_profile, suggest_mapping
+from utils.profiling import dataset_key, get_profile
+from utils.schema_catalog import get_column_specs, get_public_tables, get_table_columns
+from utils.schema_validation import is_required
+from utils.spill import SpilledFrame, SpillWriter, session_spill_dir, spill_frame, spill_join
+from utils.transform import default_converters, transform_frame
+
+# Jumlah baris contoh yang dibaca dari artefak untuk mapping dan preview
+SAMPLE_ROWS = 1000
+
+NO_MAP = "-- JANGAN MAP --"
+
+@cached()
+def get_mapping_suggestions(_profile, _specs, key_columns, dataset: str, table_name: str):
+    """Saran mapping, dihitung sekali per (dataset, tabel)."""
+    return suggest_mapping(_profile, _specs, key_columns)
+
+def mapping_source_key():
+    """Identitas sumber untuk profil mapping: URL semua API yang datanya sedang dipakai."""
+    sources = st.session_state.api_sources
+    return " + ".join(sorted(source_config(sources[alias])["url"] for alias in st.session_state.api_data if alias in sources))
+
+def converters_to_frame(converters, specs):
+    rows = []
+    for spec in specs:
+        converter = converters.get(spec["name"], {})
+        rows.append({
+            "kolom": spec["name"],
+            "tipe": spec["kind"],
+            "trim": bool(converter.get("trim")),
+            "format_tanggal": converter.get("date_format") or "",
+            "default": "" if converter.get("default") is None else str(converter["default"]),
+            "peta_enum": ", ".join(f"{k}={v}" for k, v in (converter.get("enum_map") or {}).items()),
+        })
+    return pd.DataFrame(rows)
+
+def converters_from_frame(editor_df):
+    converters = {}
+    for row in editor_df.to_dict("records"):
+        pairs = [pair.split("=", 1) for pair in str(row["peta_enum"] or "").split(",") if "=" in pair]
+        converters[row["kolom"]] = {
+            "trim": bool(row["trim"]),
+            "date_format": str(row["format_tanggal"] or "").strip() or None,
+            "enum_map": {k.strip(): v.strip() for k, v in pairs},
+            "default": str(row["default"]) if row["default"] not in (None, "") else None,
+        }
+    return converters
+
+def _to_spilled(frame, path):
+    if isinstance(frame, ArtifactHandle):
+        writer = SpillWriter(path)
+        for table in frame.iter_tables():
+            writer.write_table(table)
+        return writer.close()
+    return spill_frame(frame, path)
+
+def load_sample(source):
+    """Contoh baris dari handle data; None (dan handle dilepas) bila artefak sudah dihapus."""
     try:
-        result = _supabase.rpc("check_column_is_enum", {"schema_name": "public", "table_name": table_name, "column_name": column_name}).execute()
-        return result.data[0].get('is_enum', False) if result.data else False
-    except:
-        return False
-
-def get_unique_api_values(field_name, sample_data):
-    values = {str(item[field_name]) for item in sample_data if field_name in item and item[field_name] is not None}
-    return sorted(list(values))
+        return source.head(SAMPLE_ROWS)
+    except KeyError as e:
+        st.warning(f"{e}")
+        st.session_state.sample_source = None
+        return None
 
 def execute_sequential_join_pipeline(api_data, join_rules):
     """
-    Mengeksekusi serangkaian aturan join secara berurutan (A->B, B->C, ...).
-    Hasil dari satu join akan menjadi input 'left' untuk join berikutnya.
+    Mengeksekusi serangkaian aturan join (A->B, B->C, ...) lewat join planner:
+    setiap sumber dibangun sekali, kunci dinormalkan, dan urutan INNER join
+    disusun agar hasil antara tetap kecil.
+    Mengembalikan (DataFrame/SpilledFrame hasil atau None, laporan per langkah, peringatan).
+    Sumber di ArtifactStore dibuka sebagai DataFrame hanya selama join berjalan.
     """
     if not join_rules:
         print("Error: Tidak ada aturan join yang didefinisikan.")
-        return None
+        return None, [], []
 
-    # --- PERUBAHAN 1: Inisialisasi DataFrame hasil ---
-    # Kita mulai dengan tabel 'kiri' dari aturan PERTAMA sebagai dasar.
+    aliases = {join_rules[0]['left_api_alias']}
+    aliases.update(rule['right_api_alias'] for rule in join_rules)
+    aliases.update(rule['left_api_alias'] for rule in join_rules)
     try:
-        base_alias = join_rules[0]['left_api_alias']
-        result_df = pd.DataFrame(api_data[base_alias])
-    except KeyError:
-        print(f"Error: Data untuk alias '{base_alias}' tidak ditemukan.")
-        return None
-
-    # Lakukan join secara sekuensial
-    for i, rule in enumerate(join_rules):
-        try:
-            # Ambil tabel 'kanan' untuk join saat ini
-            right_alias = rule['right_api_alias']
-            right_df = pd.DataFrame(api_data[right_alias])
-            
-            # --- PERUBAHAN 2: Logika Join Inti ---
-            # 'left' DataFrame sekarang adalah 'result_df' yang terus diperbarui.
-            # 'left_on' adalah kunci dari 'result_df'.
-            # 'right_on' adalah kunci dari 'right_df' yang baru.
-            result_df = pd.merge(
-                left=result_df,
-                right=right_df,
-                left_on=rule['left_on_key'],
-                right_on=rule['right_on_key'],
-                how=rule['join_type'].lower(),
-                suffixes=('', f'_{right_alias}')
-            )
-        except KeyError as e:
-            # Error jika kolom kunci join tidak ditemukan
-            print(f"Error pada aturan join ke-{i+1}: Kolom kunci tidak ditemukan -> {e}")
-            return None
-        except Exception as e:
-            # Error umum lainnya
-            print(f"Error pada aturan join ke-{i+1} ({rule['left_api_alias']} -> {right_alias}): {e}")
-            return None
+        frames = build_frames(api_data, aliases)
+    except KeyError as e:
+        print(f"Error: {e}")
+        return None, [], []
 
-    return result_df
+    try:
+        if any(isinstance(frame, SpilledFrame) for frame in frames.values()):
+            # Mode hemat memori: semua sumber di disk, join dipartisi per hash kunci
+            work_dir = os.path.join(session_spill_dir(), "join")
+            frames = {
+                alias: frame if isinstance(frame, SpilledFrame) else _to_spilled(frame, os.path.join(work_dir, f"src_{alias}"))
+                for alias, frame in frames.items()
+            }
+            return spill_join(frames, join_rules, work_dir)
+        frames = {
+            alias: frame.to_frame() if isinstance(frame, ArtifactHandle) else frame
+            for alias, frame in frames.items()
+        }
+        return run_join_plan(frames, join_rules)
+    except KeyError as e:
+        # Error jika kolom kunci join tidak ditemukan
+        print(f"Error pada aturan join: Kolom kunci tidak ditemukan -> {e}")
+    except Exception as e:
+        print(f"Error pada aturan join: {e}")
+    return None, [], []
 
 
 
@@ -89,11 +129,11 @@ def display_api_extractor(supabase: Client):
 
     # Inisialisasi state
     if 'api_sources' not in st.session_state:
-        st.session_state.api_sources = {} # {alias: url}
+        st.session_state.api_sources = {} # {alias: {url, timeout, paginate, ttl}}
     if 'join_rules' not in st.session_state:
         st.session_state.join_rules = []
     if 'api_data' not in st.session_state:
-        st.session_state.api_data = {} # {alias: data}
+        st.session_state.api_data = {} # {alias: ArtifactHandle/SpilledFrame}
 
     # --- 1. Mengelola Sumber API ---
     with st.expander("1. Daftarkan Sumber API", expanded=True):
@@ -101,9 +141,18 @@ def display_api_extractor(supabase: Client):
             col1, col2 = st.columns(2)
             api_alias = col1.text_input("Nama Alias (tanpa spasi)", placeholder="mahasiswa")
             api_url = col2.text_input("URL API", placeholder="https://api.example.com/mahasiswa")
+            col3, col4, col5 = st.columns(3)
+            api_timeout = col3.number_input("Timeout (detik)", min_value=1, max_value=600, value=get_fetch_config()["timeout"])
+            api_ttl = col4.number_input(
+                "TTL cache (detik)", min_value=0, value=0,
+                help="Selama TTL, respons tersimpan dipakai tanpa menghubungi server. 0 = selalu validasi ulang (ETag/Last-Modified)."
+            )
+            api_paginate = col5.checkbox("Ikuti paginasi otomatis", value=True, help="Link header, cursor, page atau offset")
             if st.form_submit_button("➕ Tambah API"):
                 if api_alias and api_url:
-                    st.session_state.api_sources[api_alias] = api_url
+                    st.session_state.api_sources[api_alias] = {
+                        "url": api_url, "timeout": int(api_timeout), "paginate": api_paginate, "ttl": int(api_ttl),
+                    }
                     st.success(f"API '{api_alias}' ditambahkan.")
                 else:
                     st.warning("Alias dan URL tidak boleh kosong.")
@@ -114,20 +163,41 @@ def display_api_extractor(supabase: Client):
 
     # --- 2. Ambil Data dari Semua API ---
     if st.session_state.api_sources:
+        spill_mode = st.checkbox(
+            "💾 Mode hemat memori (simpan data ke disk)",
+            help="Untuk API dengan jutaan record: data ditulis ke file kolumnar dan join dijalankan per partisi."
+        )
+        refresh = st.checkbox(
+            "🔄 Abaikan cache HTTP (unduh ulang semua)",
+            help="Secara default halaman yang tidak berubah (HTTP 304) atau masih dalam TTL diambil dari cache lokal."
+        )
         if st.button("Ambil Data dari Semua API Terdaftar"):
             st.session_state.api_data = {}
-            with st.spinner("Mengambil data..."):
-                for alias, url in st.session_state.api_sources.items():
-                    try:
-                        r = requests.get(url)
-                        r.raise_for_status()
-                        data = r.json()
-                        if isinstance(data, dict):
-                            data = next((v for v in data.values() if isinstance(v, list)), [])
+            st.session_state.sample_source = None
+            fetch_stats = {}
+            spill_dir = session_spill_dir(reset=True) if spill_mode else None
+            store = get_artifact_store()
+            with st.spinner("Mengambil data dari semua API secara paralel..."):
+                for alias, data, stats, error in fetch_sources(st.session_state.api_sources, spill_dir=spill_dir, refresh=refresh):
+                    if error is None:
+                        if not isinstance(data, SpilledFrame):
+                            # Payload disimpan sekali di store bersama; session hanya memegang handle
+                            data = store.put(source_config(st.session_state.api_sources[alias])["url"], data)
+                            stats["dipakai_ulang"] = data.deduplicated
                         st.session_state.api_data[alias] = data
-                        st.success(f"Data untuk '{alias}' berhasil diambil.")
-                    except Exception as e:
-                        st.error(f"Gagal mengambil data untuk '{alias}': {e}")
+                        fetch_stats[alias] = stats
+                        st.success(
+                            f"Data untuk '{alias}' berhasil diambil ({stats['rows']} baris, {stats['pages']} halaman, "
+                            f"{stats['cached_pages']} dari cache)."
+                        )
+                    else:
+                        st.error(f"Gagal mengambil data untuk '{alias}': {error}")
+            if fetch_stats:
+                st.dataframe(
+                    pd.DataFrame.from_dict(fetch_stats, orient="index").rename_axis("alias").reset_index(),
+                    use_container_width=True,
+                    hide_index=True
+                )
 
 
     if st.session_state.api_data:
@@ -136,18 +206,16 @@ def display_api_extractor(supabase: Client):
         if num_sources == 1:
             st.info("💡 Mode Proses Tunggal terdeteksi. Data siap untuk di-map.")
             
-            # Langsung siapkan data untuk mapping
+            # Langsung siapkan data untuk mapping; yang disimpan hanya handle
             alias = list(st.session_state.api_data.keys())[0]
-            single_api_data = st.session_state.api_data[alias]
-            
-            # Konversi ke format yang konsisten (DataFrame)
-            df = pd.DataFrame(single_api_data)
-            st.session_state.sample_data = df.to_dict('records')
-            st.session_state.sample_fields = list(df.columns)
-
-            st.dataframe(df.head())
-            with st.expander("Lihat detail data pertama (JSON)"):
-                st.json(st.session_state.sample_data[0])            
+            st.session_state.sample_source = st.session_state.api_data[alias]
+            st.session_state.sample_fields = list(st.session_state.sample_source.columns)
+
+            df = load_sample(st.session_state.sample_source)
+            if df is not None and not df.empty:
+                st.dataframe(df.head())
+                with st.expander("Lihat detail data pertama (JSON)"):
+                    st.json(df.head(1).to_dict('records')[0])
         elif num_sources > 1:
             st.info("💡 Mode Join Engine terdeteksi. Silakan definisikan aturan join.")
             with st.expander("2. Definisikan Aturan Join", expanded=True):
@@ -177,59 +245,126 @@ def display_api_extractor(supabase: Client):
     if st.session_state.join_rules:
         if st.button("🚀 Eksekusi Rangkaian Join"):
             with st.spinner("Melakukan join..."):
-                final_df = execute_sequential_join_pipeline(st.session_state.api_data, st.session_state.join_rules)
+                final_df, join_steps, join_warnings = execute_sequential_join_pipeline(
+                    st.session_state.api_data, st.session_state.join_rules
+                )
 
-                if final_df is not None:
+                for warning in join_warnings:
+                    st.warning(f"⚠️ {warning}")
+                if final_df is None:
+                    st.error("Join gagal dieksekusi. Periksa alias dan kolom kunci pada aturan join.")
+                else:
                     st.success("Join berhasil dieksekusi!")
-                    st.session_state.sample_data = final_df.to_dict('records')
+                    st.dataframe(pd.DataFrame(join_steps), use_container_width=True, hide_index=True)
+                    if not isinstance(final_df, SpilledFrame):
+                        join_key = "join:" + "+".join(sorted(st.session_state.api_data))
+                        final_df = get_artifact_store().put_frame(join_key, final_df)
+                    st.session_state.sample_source = final_df
                     st.session_state.sample_fields = list(final_df.columns)
-                    
-                    st.dataframe(final_df.head())
-                    with st.expander("Lihat detail hasil join pertama (JSON)"):
-                        st.json(st.session_state.sample_data[0])
 
-    mapping = st.session_state.get("mapping", {})
-    if "sample_fields" in st.session_state and st.session_state.sample_fields:
+                    sample_df = final_df.head(SAMPLE_ROWS)
+                    st.dataframe(sample_df.head())
+                    if not sample_df.empty:
+                        with st.expander("Lihat detail hasil join pertama (JSON)"):
+                            st.json(sample_df.head(1).to_dict('records')[0])
+
+    mapping, specs, converters = {}, [], {}
+    source = st.session_state.get("sample_source")
+    sample_df = load_sample(source) if source is not None else None
+    if sample_df is not None and st.session_state.get("sample_fields"):
         st.header("2. Mapping Field API ke Data Warehouse")
         
-        tables = get_supabase_tables(supabase)
+        tables = get_public_tables(supabase)
         selected_table = st.selectbox("Pilih Tabel Supabase:", tables, key="select_table")
     
         if selected_table:
-            columns_details = get_table_columns_with_details(supabase, selected_table)
+            columns_details = get_table_columns(supabase, selected_table)
             column_names = [col['column_name'] for col in columns_details]
-            required_columns = {col['column_name'] for col in columns_details if col['is_nullable'] == 'NO'}
-            
-            mapping = {}
-            
+            required_columns = {col['column_name'] for col in columns_details if is_required(col)}
+            specs = get_column_specs(supabase, selected_table)
+            key_columns = tuple(sorted(col['column_name'] for col in columns_details if is_key_column(col)))
+
+            # Profil dihitung sekali per dataset, bukan per field di setiap rerun
+            dataset = dataset_key(source)
+            profile = get_profile(source, dataset)
+            suggestions = get_mapping_suggestions(profile, specs, key_columns, dataset, selected_table)
+            suggested = dict(zip(suggestions["field"], suggestions["kolom"]))
+            source_key = mapping_source_key()
+            saved = load_mapping_profile(source_key, selected_table)
+
+            # Isi awal mapping (profil tersimpan, kalau tidak ada: saran otomatis) sekali per dataset dan tabel
+            widget_prefix = f"map_{selected_table}_"
+            prefill_key = f"mapping_prefill_{selected_table}_{dataset}"
+            if prefill_key not in st.session_state:
+                initial = saved["mapping"] if saved else suggested
+                for field in st.session_state.sample_fields:
+                    value = initial.get(field, NO_MAP)
+                    st.session_state[widget_prefix + field] = value if value in column_names else NO_MAP
+                st.session_state[f"converters_base_{selected_table}"] = {
+                    **default_converters(specs), **(saved.get("converters", {}) if saved else {})
+                }
+                st.session_state[prefill_key] = True
+
             st.write("### Mapping Field API ke Kolom Database")
             st.info("Kolom dengan tanda (*) wajib diisi (NOT NULL). Lacak progres Anda di dasbor bawah.")
-            
-            for field in st.session_state.sample_fields:
-                st.write(f"**Field API: `{field}`**")
-                
-                sample_values = get_unique_api_values(field, st.session_state.sample_data)
-                if sample_values:
-                    st.write(f"Contoh nilai: {', '.join(sample_values[:5])}")
-                
-                options = ["-- JANGAN MAP --"] + column_names
-                def format_label(col_name):
-                    if col_name in required_columns:
-                        return f"{col_name} (*)"
-                    return col_name
-                
-                col = st.selectbox(
-                    f"Map ke kolom:", 
-                    options,
-                    key=f"map_{field}",
-                    format_func=lambda x: format_label(x) if x != '-- JANGAN MAP --' else x
+
+            info_col, action_col = st.columns([3, 1])
+            if saved:
+                info_col.success(f"📂 Profil mapping tersimpan dimuat (disimpan {saved['saved_at']}).")
+            else:
+                info_col.info(f"✨ {len(suggested)} field diisi otomatis dari saran mapping.")
+            if action_col.button("✨ Terapkan Saran"):
+                for field in st.session_state.sample_fields:
+                    st.session_state[widget_prefix + field] = suggested.get(field, NO_MAP)
+                st.rerun()
+            with st.expander("Lihat skor saran mapping"):
+                st.dataframe(suggestions, use_container_width=True, hide_index=True)
+
+            profile = profile.set_index("field")
+            options = [NO_MAP] + column_names
+            def format_label(col_name):
+                if col_name in required_columns:
+                    return f"{col_name} (*)"
+                return col_name
+
+            # Semua pilihan dalam satu form: perubahan baru diproses saat form dikirim
+            with st.form(f"mapping_form_{selected_table}"):
+                for field in st.session_state.sample_fields:
+                    st.write(f"**Field API: `{field}`**")
+
+                    if field in profile.index:
+                        stats = profile.loc[field]
+                        distinct = f"≈{stats['distinct']:,}" if stats["distinct_perkiraan"] else f"{stats['distinct']:,}"
+                        st.caption(f"Tipe: {stats['tipe']} · Distinct: {distinct} · Null: {stats['rasio_null']:.1%}")
+                        if stats["contoh"]:
+                            st.write(f"Contoh nilai: {', '.join(stats['contoh'])}")
+
+                    col = st.selectbox(
+                        f"Map ke kolom:",
+                        options,
+                        key=widget_prefix + field,
+                        format_func=lambda x: format_label(x) if x != NO_MAP else x
+                    )
+                    if col and col != NO_MAP:
+                        mapping[field] = col
+
+                    st.divider()
+
+                st.write("**⚙️ Konverter per Kolom**")
+                st.caption(
+                    "Nilai di-cast ke tipe kolom. Format tanggal mis. %d/%m/%Y; peta ENUM mis. Aktif=aktif, Lulus=lulus; "
+                    "default dipakai untuk nilai kosong."
                 )
-                if col and col != '-- JANGAN MAP --':
-                    mapping[field] = col
-                
-                
-                st.divider()
-    
+                converter_df = st.data_editor(
+                    converters_to_frame(st.session_state[f"converters_base_{selected_table}"], specs),
+                    disabled=["kolom", "tipe"],
+                    hide_index=True,
+                    use_container_width=True,
+                    key=f"converters_editor_{selected_table}",
+                )
+                converters = converters_from_frame(converter_df)
+                st.form_submit_button("✅ Terapkan Mapping")
+
             st.subheader("📊 Dasbor Progres Pemetaan")
     
             mapped_columns = set(mapping.values())
@@ -294,61 +429,101 @@ def display_api_extractor(supabase: Client):
             all_required_mapped = required_columns.issubset(mapped_columns)
             
             if st.button("💾 Simpan Mapping", disabled=not all_required_mapped):
-
-                st.success("Mapping berhasil disimpan!") 
+                save_mapping_profile(source_key, selected_table, mapping, converters)
+                st.success("Mapping berhasil disimpan! ETL berikutnya dari sumber yang sama langsung memakai mapping ini.")
             
             if not all_required_mapped:
                 st.error("Tombol 'Simpan Mapping' akan aktif setelah semua kolom wajib (yang ditandai ❌ pada tab Checklist Wajib) di-map.")
 
-    if "sample_fields" in st.session_state and st.session_state.sample_data and mapping:
+    if sample_df is not None and not sample_df.empty and mapping:
         st.header("3. Preview Transformasi Data")
 
-        preview_rows = []
-        for item in st.session_state.sample_data[:3]:  
-            row = {}
-            for src_field, dest_col in mapping.items():
-                original_value = item.get(src_field)
-
-
-                row[dest_col] = original_value
-
-            preview_rows.append(row)
-
-        if preview_rows:
+        preview_valid, preview_rejected = transform_frame(sample_df, mapping, specs, converters)
+        if not preview_valid.empty:
             st.write("**Preview data yang akan dikirim:**")
-            st.json(preview_rows)
+            st.json(to_json_rows(preview_valid.head(3)))
+        if not preview_rejected.empty:
+            st.warning(f"{len(preview_rejected)} dari {len(sample_df)} baris contoh akan ditolak.")
+            st.dataframe(preview_rejected.head(20), use_container_width=True, hide_index=True)
 
-    if "sample_fields" in st.session_state and st.session_state.sample_data and mapping:
+    if sample_df is not None and not sample_df.empty and mapping:
         st.header("4. Kirim Data ke Supabase")
 
-        if st.button("🚀 Inject Data"):
-            rows = []
-            errors = []
-
-            for i, item in enumerate(st.session_state.sample_data):
-                row = {}
-                try:
-                    for src_field, dest_col in mapping.items():
-                        original_value = item.get(src_field)
-
-                        row[dest_col] = original_value
-
-                    rows.append(row)
-                except Exception as e:
-                    errors.append(f"Error pada data ke-{i+1}: {str(e)}")
-
-            if errors:
-                st.error("Ada error dalam transformasi data:")
-                for error in errors:
-                    st.write(f"⚠️ {error}")
+        load_col1, load_col2 = st.columns(2)
+        load_mode = load_col1.radio(
+            "Mode pengiriman",
+            [MODE_INSERT, MODE_UPSERT],
+            format_func=lambda m: "Insert" if m == MODE_INSERT else "Upsert (timpa jika konflik)",
+            horizontal=True,
+        )
+        conflict_cols = []
+        if load_mode == MODE_UPSERT:
+            conflict_cols = load_col2.multiselect(
+                "Kolom kunci konflik", sorted(set(mapping.values())),
+                help="Kolom unik/primary key yang menentukan baris yang sama"
+            )
 
-            if rows:
-                try:
-                    result = supabase.table(selected_table).insert(rows).execute()
-                    if result.data:
-                        st.success(f"✅ Berhasil mengirim {len(result.data)} data ke tabel '{selected_table}'")
+        if st.button("🚀 Inject Data"):
+            # Data dialirkan per chunk dari artefak/disk; hanya satu chunk di memori
+            frames, total_rows = source.iter_frames(columns=list(mapping)), len(source)
+            rejected_parts = []
+
+            def batch_chunks():
+                next_number = 1
+                for frame in frames:
+                    # Transformasi kolumnar: proyeksi, konverter, cast dan validasi per kolom
+                    valid, rejected = transform_frame(frame, mapping, specs, converters)
+                    if not rejected.empty:
+                        rejected_parts.append(rejected)
+                    batches = make_batches(to_json_rows(valid), start=next_number)
+                    next_number += len(batches)
+                    yield batches
+
+            try:
+                report, failed = run_bulk_insert_chunks(
+                    supabase, selected_table, batch_chunks(), total_rows, load_mode, ",".join(conflict_cols)
+                )
+                # Hanya batch yang gagal yang disimpan untuk dikirim ulang
+                st.session_state.inject_job = {
+                    "table": selected_table,
+                    "mode": load_mode,
+                    "on_conflict": ",".join(conflict_cols),
+                    "batches": failed,
+                }
+                st.session_state.inject_report = report
+                st.session_state.inject_rejected = pd.concat(rejected_parts) if rejected_parts else None
+                if not report.empty and (report["status"] == STATUS_OK).any():
+                    invalidate_tables([selected_table])
+            except Exception as e:
+                st.error(f"Ada error dalam transformasi data: {e}")
+
+        job = st.session_state.get("inject_job")
+        report = st.session_state.get("inject_report")
+        if job and report is not None and not report.empty and job["table"] == selected_table:
+            ok = report[report["status"] == STATUS_OK]
+            failed = failed_batches(job["batches"], report)
+            if failed:
+                st.warning(f"{len(ok)} dari {len(report)} batch berhasil ({int(ok['baris'].sum())} baris). {len(failed)} batch gagal.")
+            else:
+                st.success(f"✅ Berhasil mengirim {int(ok['baris'].sum())} data ke tabel '{selected_table}' dalam {len(report)} batch.")
+
+            with st.expander("📋 Laporan per Batch", expanded=bool(failed)):
+                st.dataframe(report, use_container_width=True, hide_index=True)
+
+            rejected = st.session_state.get("inject_rejected")
+            if rejected is not None and not rejected.empty:
+                st.warning(f"{len(rejected)} baris ditolak saat transformasi dan tidak dikirim.")
+                st.download_button(
+                    "📥 Unduh Baris Ditolak (CSV)",
+                    rejected.to_csv(index=False).encode("utf-8"),
+                    file_name=f"ditolak_{selected_table}.csv",
+                    mime="text/csv",
+                )
 
-                    else:
-                        st.error("Gagal mengirim data.")
-                except Exception as e:
-                    st.error(f"Error saat mengirim data: {str(e)}")
\ No newline at end of file
+            if failed and st.button(f"🔁 Ulangi {len(failed)} Batch Gagal"):
+                retry_report = run_bulk_insert(supabase, job["table"], failed, job["mode"], job["on_conflict"])
+                if (retry_report["status"] == STATUS_OK).any():
+                    invalidate_tables([job["table"]])
+                report = pd.concat([report[~report["batch"].isin(retry_report["batch"])], retry_report])
+                st.session_state.inject_report = report.sort_values("batch").reset_index(drop=True)
+                st.rerun()
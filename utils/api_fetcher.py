@@ -0,0 +1,296 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+
+import pandas as pd
+import pyarrow as pa
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.http_cache import conditional_headers, get_response_cache, is_fresh
+from utils.spill import SpillWriter, get_spill_config, to_arrow_array
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_PAGES = 1000
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Kunci umum tempat API menaruh daftar record dan informasi paginasi
+RECORD_KEYS = ("data", "results", "items", "records", "rows")
+META_KEYS = ("meta", "pagination", "paging", "links")
+NEXT_URL_KEYS = ("next", "next_url", "nextUrl", "next_page_url")
+CURSOR_KEYS = ("next_cursor", "nextCursor", "cursor", "next_token", "nextPageToken")
+PAGE_KEYS = ("page", "current_page", "currentPage")
+TOTAL_PAGE_KEYS = ("total_pages", "last_page", "totalPages", "pageCount")
+OFFSET_KEYS = ("offset", "skip")
+LIMIT_KEYS = ("limit", "per_page", "page_size", "pageSize")
+TOTAL_KEYS = ("total", "count", "total_count", "totalCount")
+
+
+def get_fetch_config():
+    """Timeout, retry, backoff, jumlah worker dan batas halaman dari secrets (jika ada)."""
+    config = {
+        "timeout": DEFAULT_TIMEOUT,
+        "max_retries": DEFAULT_MAX_RETRIES,
+        "backoff": DEFAULT_BACKOFF,
+        "max_workers": DEFAULT_MAX_WORKERS,
+        "max_pages": DEFAULT_MAX_PAGES,
+    }
+    try:
+        config.update({k: type(config[k])(v) for k, v in st.secrets.get("api_fetch", {}).items() if k in config})
+    except Exception:
+        pass
+    return config
+
+
+@st.cache_resource
+def get_http_session():
+    """
+    Satu requests.Session per proses dengan connection pool dan retry+backoff
+    untuk status sementara (429/5xx), dipakai bersama oleh semua worker.
+    """
+    config = get_fetch_config()
+    retry = Retry(
+        total=config["max_retries"],
+        backoff_factor=config["backoff"],
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=config["max_workers"], pool_maxsize=config["max_workers"])
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+def source_config(source):
+    """
+    Menormalkan entri api_sources (URL atau dict) menjadi dict konfigurasi sumber.
+    `headers` (mis. Authorization) dikirim pada setiap halaman dan ikut menjadi kunci cache.
+    """
+    if isinstance(source, str):
+        source = {"url": source}
+    return {"timeout": get_fetch_config()["timeout"], "paginate": True, "ttl": 0, "headers": {}, **source}
+
+
+class ColumnBuffer:
+    """
+    Penampung record berbentuk kolom: setiap halaman langsung ditambahkan ke
+    list per kolom sehingga tidak ada list-of-dict besar yang disimpan.
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def extend(self, records):
+        for record in records:
+            if not isinstance(record, dict):
+                record = {"value": record}
+            for key in record:
+                if key not in self._columns:
+                    self._columns[key] = [None] * self._rows
+            for key, values in self._columns.items():
+                values.append(record.get(key))
+            self._rows += 1
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self._columns)
+
+    def to_table(self) -> pa.Table:
+        """Isi buffer sebagai tabel Arrow (kolumnar dan ringkas untuk ArtifactStore)."""
+        return pa.table({name: to_arrow_array(values) for name, values in self._columns.items()})
+
+    def drain(self):
+        """Mengambil isi buffer (dict kolom) lalu mengosongkannya, untuk ditulis ke disk."""
+        columns = self._columns
+        self._columns, self._rows = {}, 0
+        return columns
+
+
+def extract_records(payload):
+    """Mengambil daftar record dari body JSON (list langsung atau list di dalam dict)."""
+    if isinstance(payload, list):
+        return payload
+    if not isinstance(payload, dict):
+        return []
+    for key in RECORD_KEYS:
+        if isinstance(payload.get(key), list):
+            return payload[key]
+    return next((v for v in payload.values() if isinstance(v, list)), [])
+
+
+def _first(containers, keys):
+    for container in containers:
+        for key in keys:
+            value = container.get(key)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _next_request(links, payload, url, params, record_count):
+    """
+    Menentukan (url, params) halaman berikutnya, atau None bila selesai.
+    Urutan deteksi: header Link, URL/cursor berikutnya di body, nomor halaman,
+    lalu offset/limit.
+    """
+    next_link = links.get("next", {}).get("url")
+    if next_link:
+        return urljoin(url, next_link), {}
+    if not isinstance(payload, dict) or record_count == 0:
+        return None
+
+    containers = [payload] + [payload[k] for k in META_KEYS if isinstance(payload.get(k), dict)]
+
+    next_url = _first(containers, NEXT_URL_KEYS)
+    if isinstance(next_url, str):
+        return urljoin(url, next_url), {}
+
+    cursor = _first(containers, CURSOR_KEYS)
+    if cursor is not None and not isinstance(cursor, (dict, list, bool)):
+        return url, {**params, "cursor": cursor}
+
+    page, total_pages = _first(containers, PAGE_KEYS), _first(containers, TOTAL_PAGE_KEYS)
+    if page is not None and total_pages is not None:
+        page, total_pages = int(page), int(total_pages)
+        return (url, {**params, "page": page + 1}) if page < total_pages else None
+
+    offset, total = _first(containers, OFFSET_KEYS), _first(containers, TOTAL_KEYS)
+    if offset is not None and total is not None:
+        limit = _first(containers, LIMIT_KEYS)
+        next_offset = int(offset) + record_count
+        if next_offset < int(total):
+            params = {**params, "offset": next_offset}
+            if limit is not None:
+                params["limit"] = int(limit)
+            return url, params
+    return None
+
+
+def _get_page(session, cache, url, params, config, refresh=False):
+    """
+    Body dan header Link satu halaman, beserta apakah body berasal dari cache.
+    Dalam TTL sumber server tidak dihubungi; selain itu permintaan dikirim
+    kondisional dan body tersimpan dipakai ulang bila server menjawab 304.
+    `refresh` selalu mengunduh penuh, tetapi hasilnya tetap disimpan ke cache.
+    """
+    headers = config["headers"]
+    entry = cache.lookup(url, params, headers) if cache and not refresh else None
+    if is_fresh(entry, config["ttl"]):
+        body = cache.body(entry)
+        if body is not None:
+            return body, entry["links"], True
+        entry = None
+
+    response = session.get(
+        url, params=params or None, timeout=config["timeout"], headers={**headers, **conditional_headers(entry)},
+    )
+    if response.status_code == 304 and entry:
+        body = cache.touch(entry)
+        if body is not None:
+            return body, entry["links"], True
+        # Entri terhapus di antara lookup dan 304: unduh ulang tanpa header kondisional
+        response = session.get(url, params=params or None, timeout=config["timeout"], headers=headers)
+    response.raise_for_status()
+    if cache:
+        cache.store(url, params, response, config["ttl"], headers)
+    return response.content, response.links, False
+
+
+def fetch_source(source, session=None, max_pages=None, spill_path=None, refresh=False):
+    """
+    Mengambil seluruh halaman satu sumber API ke ColumnBuffer.
+    Mengembalikan (tabel Arrow, stats {rows, pages, cached_pages, seconds}).
+    Bila `spill_path` diisi, buffer ditulis ke part Parquet setiap beberapa
+    puluh ribu baris dan yang dikembalikan adalah SpilledFrame.
+    """
+    config = source_config(source)
+    session = session or get_http_session()
+    cache = get_response_cache()
+    max_pages = max_pages or get_fetch_config()["max_pages"]
+    buffer = ColumnBuffer()
+    writer = SpillWriter(spill_path) if spill_path else None
+    spill_rows = get_spill_config()["rows"]
+    total_rows = 0
+    url, params = config["url"], dict(config.get("params", {}))
+    seen = set()
+    pages = cached_pages = 0
+    start = time.perf_counter()
+
+    while url and pages < max_pages:
+        request_key = (url, tuple(sorted(params.items())))
+        if request_key in seen:
+            # Server mengembalikan tautan yang sama; hentikan agar tidak berputar
+            break
+        seen.add(request_key)
+
+        body, links, cached = _get_page(session, cache, url, params, config, refresh)
+        payload = json.loads(body)
+        records = extract_records(payload)
+        buffer.extend(records)
+        total_rows += len(records)
+        pages += 1
+        cached_pages += cached
+        if writer and len(buffer) >= spill_rows:
+            writer.write_columns(buffer.drain())
+
+        if not config["paginate"]:
+            break
+        next_request = _next_request(links, payload, url, params, len(records))
+        if next_request is None:
+            break
+        url, params = next_request
+
+    stats = {
+        "rows": total_rows,
+        "pages": pages,
+        "cached_pages": cached_pages,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    if writer:
+        writer.write_columns(buffer.drain())
+        return writer.close(), stats
+    return buffer.to_table(), stats
+
+
+def fetch_sources(sources, max_workers=None, spill_dir=None, refresh=False):
+    """
+    Mengambil semua sumber {alias: url|dict} secara paralel. Dengan
+    `spill_dir`, setiap sumber ditulis ke subdirektori alias di sana.
+    `refresh=True` mengabaikan cache HTTP dan mengunduh ulang semuanya.
+
+    Menghasilkan (alias, tabel Arrow/SpilledFrame atau None, stats, error) sesuai urutan
+    selesai, sehingga total waktu ekstraksi mengikuti sumber paling lambat.
+    """
+    if not sources:
+        return
+    max_workers = max_workers or get_fetch_config()["max_workers"]
+    session = get_http_session()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sources))) as executor:
+        futures = {
+            executor.submit(
+                fetch_source, source, session, None, os.path.join(spill_dir, alias) if spill_dir else None, refresh
+            ): alias
+            for alias, source in sources.items()
+        }
+        for future in as_completed(futures):
+            alias = futures[future]
+            try:
+                data, stats = future.result()
+                yield alias, data, stats, None
+            except Exception as e:
+                yield alias, None, {}, e
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.spill import to_arrow_array
+
+DEFAULT_ARTIFACT_DIR = os.path.join(".sidama_cache", "artifacts")
+DEFAULT_MAX_MB = 512
+DEFAULT_MAX_DISK_MB = 2048
+
+# Ukuran chunk saat artefak dialirkan ke pemanggil (mis. inject per batch)
+CHUNK_ROWS = 50_000
+
+
+def get_artifact_config():
+    """Batas memori/disk dan direktori artefak dari secrets bagian [artifact_store] (jika ada)."""
+    config = {"max_mb": DEFAULT_MAX_MB, "max_disk_mb": DEFAULT_MAX_DISK_MB, "dir": DEFAULT_ARTIFACT_DIR}
+    try:
+        config.update({k: type(config[k])(v) for k, v in st.secrets.get("artifact_store", {}).items() if k in config})
+    except Exception:
+        pass
+    return config
+
+
+class _HashSink:
+    """Objek file tulis-saja yang hanya meneruskan byte ke fungsi hash."""
+
+    def __init__(self):
+        self.hash = hashlib.blake2b(digest_size=20)
+        self.closed = False
+
+    def write(self, data):
+        self.hash.update(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def content_hash(table: pa.Table) -> str:
+    """Hash isi tabel (skema + data) lewat serialisasi IPC tanpa menyalin seluruh tabel."""
+    sink = _HashSink()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.hash.hexdigest()
+
+
+def frame_to_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame -> tabel Arrow; kolom object bertipe campuran dijadikan teks."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.table({str(name): to_arrow_array(df[name].tolist()) for name in df.columns})
+
+
+class ArtifactHandle:
+    """
+    Handle ringan ke artefak di ArtifactStore, kunci (url, waktu ambil, hash isi).
+    Antarmukanya sama dengan SpilledFrame sehingga mapping dan inject tidak
+    perlu membedakan data di memori atau di disk.
+    """
+
+    def __init__(self, url, fetched_at, digest, rows, columns, deduplicated=False):
+        self.url = url
+        self.fetched_at = fetched_at
+        self.content_hash = digest
+        self.rows = rows
+        self.columns = list(columns)
+        self.deduplicated = deduplicated
+
+    @property
+    def key(self):
+        return self.url, self.fetched_at, self.content_hash
+
+    def __len__(self):
+        return self.rows
+
+    def table(self) -> pa.Table:
+        return get_artifact_store().get(self.content_hash)
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self.table().schema
+
+    def iter_tables(self, columns=None):
+        table = self.table()
+        if columns:
+            table = table.select(columns)
+        yield from (pa.Table.from_batches([batch], table.schema) for batch in table.to_batches(CHUNK_ROWS))
+
+    def iter_frames(self, columns=None):
+        for table in self.iter_tables(columns):
+            yield table.to_pandas()
+
+    def head(self, n=1000) -> pd.DataFrame:
+        return self.table().slice(0, n).to_pandas()
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.table().to_pandas()
+
+
+class ArtifactStore:
+    """
+    Penyimpanan payload API bersama untuk semua sesi dalam satu proses.
+
+    Artefak disimpan sebagai tabel Arrow, dialamatkan dengan hash isinya,
+    sehingga pengambilan ulang sumber yang tidak berubah (oleh pengguna mana
+    pun) memakai salinan yang sama. Tier memori dibatasi ukuran byte dengan
+    eviksi LRU; setiap artefak juga ditulis ke disk sebagai Parquet agar handle
+    tetap bisa dibuka setelah dikeluarkan dari memori atau setelah restart.
+    Session state hanya menyimpan ArtifactHandle.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # hash -> pa.Table, urutan LRU
+        self._bytes = 0
+        self._latest = {}  # url -> handle terakhir
+        self._lock = threading.Lock()
+
+    # ---------- Disk ----------
+
+    def _path(self, digest):
+        return os.path.join(self.disk_dir, f"{digest}.parquet")
+
+    def _write_disk(self, digest, table):
+        if not self.disk_dir or os.path.exists(self._path(digest)):
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            pq.write_table(table, self._path(digest) + ".tmp")
+            os.replace(self._path(digest) + ".tmp", self._path(digest))
+            self._prune_disk(keep=digest)
+        except OSError as e:
+            print(f"Gagal menyimpan artefak '{digest}' ke disk: {e}")
+
+    def _prune_disk(self, keep):
+        if not self.max_disk_bytes:
+            return
+        files = [
+            entry for entry in os.scandir(self.disk_dir)
+            if entry.name.endswith(".parquet") and entry.name != f"{keep}.parquet"
+        ]
+        total = sum(entry.stat().st_size for entry in files) + os.path.getsize(self._path(keep))
+        # File yang paling lama tidak dipakai dihapus lebih dulu (mtime diperbarui saat dibaca)
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+            if total <= self.max_disk_bytes:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _read_disk(self, digest):
+        if not self.disk_dir or not os.path.exists(self._path(digest)):
+            return None
+        try:
+            return pq.read_table(self._path(digest), memory_map=True)
+        except Exception as e:
+            print(f"Gagal membaca artefak '{digest}' dari disk: {e}")
+            return None
+
+    # ---------- Memori ----------
+
+    def _remember(self, digest, table):
+        self._memory[digest] = table
+        self._bytes += table.nbytes
+        while self._bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    # ---------- API ----------
+
+    def put(self, url, table: pa.Table, fetched_at=None) -> ArtifactHandle:
+        """Menyimpan tabel hasil ambil `url`; isi yang sudah ada dipakai ulang, tidak disalin."""
+        digest = content_hash(table)
+        fetched_at = fetched_at or datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            deduplicated = digest in self._memory or (self.disk_dir and os.path.exists(self._path(digest)))
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                table = self._memory[digest]
+            else:
+                self._remember(digest, table)
+            handle = ArtifactHandle(url, fetched_at, digest, table.num_rows, table.column_names, bool(deduplicated))
+            self._latest[url] = handle
+        self._write_disk(digest, table)
+        return handle
+
+    def put_frame(self, url, df: pd.DataFrame, fetched_at=None) -> ArtifactHandle:
+        return self.put(url, frame_to_table(df), fetched_at)
+
+    def get(self, digest) -> pa.Table:
+        """Tabel artefak dari memori atau disk; KeyError bila sudah dihapus dari keduanya."""
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                return self._memory[digest]
+        table = self._read_disk(digest)
+        if table is None:
+            raise KeyError(f"Artefak '{digest}' sudah tidak tersedia. Ambil ulang data dari API.")
+        try:
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+        with self._lock:
+            if digest not in self._memory:
+                self._remember(digest, table)
+        return table
+
+    def latest(self, url):
+        """Handle artefak terakhir untuk `url`, atau None."""
+        return self._latest.get(url)
+
+    def stats(self):
+        return {
+            "artefak_di_memori": len(self._memory),
+            "mb_di_memori": round(self._bytes / 1e6, 1),
+            "batas_mb": round(self.max_bytes / 1e6, 1),
+        }
+
+
+@st.cache_resource
+def get_artifact_store():
+    """Satu ArtifactStore per proses, dipakai bersama semua sesi."""
+    config = get_artifact_config()
+    return ArtifactStore(
+        max_bytes=config["max_mb"] * 1_000_000,
+        disk_dir=config["dir"] or None,
+        max_disk_bytes=config["max_disk_mb"] * 1_000_000,
+    )
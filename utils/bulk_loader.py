@@ -0,0 +1,164 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import streamlit as st
+from supabase import Client
+
+from utils.postgrest_errors import is_transient
+
+DEFAULT_BATCH_ROWS = 500
+DEFAULT_BATCH_BYTES = 1_000_000
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+MODE_INSERT = "insert"
+MODE_UPSERT = "upsert"
+
+STATUS_OK = "berhasil"
+STATUS_FAILED = "gagal"
+
+
+def get_bulk_config():
+    """Batas ukuran batch, jumlah worker dan retry dari secrets bagian [bulk_insert] (jika ada)."""
+    config = {
+        "batch_rows": DEFAULT_BATCH_ROWS,
+        "batch_bytes": DEFAULT_BATCH_BYTES,
+        "max_workers": DEFAULT_MAX_WORKERS,
+        "max_retries": DEFAULT_MAX_RETRIES,
+        "backoff": DEFAULT_BACKOFF,
+    }
+    try:
+        config.update({k: type(config[k])(v) for k, v in st.secrets.get("bulk_insert", {}).items() if k in config})
+    except Exception:
+        pass
+    return config
+
+
+def to_json_rows(df: pd.DataFrame):
+    """DataFrame -> list of dict yang aman untuk JSON (NaN jadi null, tanggal jadi ISO)."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def make_batches(rows, max_rows=None, max_bytes=None, start=1):
+    """
+    Membagi baris menjadi batch yang dibatasi jumlah baris dan perkiraan ukuran
+    payload JSON. Mengembalikan list of (nomor batch, baris), bernomor mulai `start`.
+    """
+    config = get_bulk_config()
+    max_rows = max_rows or config["batch_rows"]
+    max_bytes = max_bytes or config["batch_bytes"]
+
+    batches, current, current_bytes = [], [], 0
+    for row in rows:
+        size = len(json.dumps(row, default=str)) + 1
+        if current and (len(current) >= max_rows or current_bytes + size > max_bytes):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(row)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return list(enumerate(batches, start=start))
+
+
+def send_batch(supabase: Client, table_name: str, rows, mode=MODE_INSERT, on_conflict=None):
+    """Mengirim satu batch tanpa mengembalikan representasi baris."""
+    query = supabase.table(table_name)
+    if mode == MODE_UPSERT:
+        query = query.upsert(rows, on_conflict=on_conflict or "", returning="minimal")
+    else:
+        query = query.insert(rows, returning="minimal")
+    return query.execute()
+
+
+def _send_with_retry(supabase, table_name, number, rows, mode, on_conflict, max_retries, backoff):
+    start = time.perf_counter()
+    error = None
+    for attempt in range(1, max_retries + 2):
+        try:
+            send_batch(supabase, table_name, rows, mode, on_conflict)
+            error = None
+            break
+        except Exception as e:
+            error = e
+            # Error deterministik (4xx, constraint) langsung dilaporkan gagal tanpa backoff
+            if not is_transient(e) or attempt > max_retries:
+                break
+            time.sleep(backoff * 2 ** (attempt - 1))
+    return {
+        "batch": number,
+        "baris": len(rows),
+        "status": STATUS_OK if error is None else STATUS_FAILED,
+        "percobaan": attempt,
+        "detik": round(time.perf_counter() - start, 3),
+        "error": "" if error is None else str(error),
+    }
+
+
+def insert_batches(supabase: Client, table_name: str, batches, mode=MODE_INSERT, on_conflict=None, max_workers=None):
+    """
+    Mengirim batch [(nomor, baris), ...] secara paralel dengan retry+backoff
+    per batch. Menghasilkan laporan per batch sesuai urutan selesai sehingga
+    pemanggil dapat memperbarui progress bar di thread utama.
+    """
+    if not batches:
+        return
+    config = get_bulk_config()
+    max_workers = max_workers or config["max_workers"]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        futures = [
+            executor.submit(
+                _send_with_retry, supabase, table_name, number, rows, mode, on_conflict,
+                config["max_retries"], config["backoff"],
+            )
+            for number, rows in batches
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_bulk_insert_chunks(supabase: Client, table_name: str, chunks, total_rows=None, mode=MODE_INSERT, on_conflict=None):
+    """
+    Menjalankan `insert_batches` per chunk [(nomor, baris), ...] dengan satu
+    progress bar Streamlit. `chunks` boleh berupa generator sehingga hanya satu
+    chunk yang ada di memori. Mengembalikan (laporan per batch, batch gagal).
+    """
+    label = f"dari {total_rows} baris terkirim" if total_rows else "baris terkirim"
+    progress = st.progress(0.0, text=f"0 {label}")
+    sent_rows, done_rows, reports, failed = 0, 0, [], []
+    start = time.perf_counter()
+    for batches in chunks:
+        rows_by_number = dict(batches)
+        for report in insert_batches(supabase, table_name, batches, mode, on_conflict):
+            reports.append(report)
+            done_rows += report["baris"]
+            if report["status"] == STATUS_OK:
+                sent_rows += report["baris"]
+            else:
+                failed.append((report["batch"], rows_by_number[report["batch"]]))
+            rate = sent_rows / max(time.perf_counter() - start, 1e-6)
+            done = min(done_rows / total_rows, 1.0) if total_rows else 0.0
+            progress.progress(done, text=f"{sent_rows} {label} ({rate:,.0f} baris/detik)")
+    progress.progress(1.0, text=f"{sent_rows} {label}")
+    report = pd.DataFrame(reports).sort_values("batch").reset_index(drop=True) if reports else pd.DataFrame()
+    return report, sorted(failed, key=lambda batch: batch[0])
+
+
+def run_bulk_insert(supabase: Client, table_name: str, batches, mode=MODE_INSERT, on_conflict=None):
+    """
+    Menjalankan `insert_batches` dengan progress bar Streamlit.
+    Mengembalikan laporan per batch (DataFrame terurut per nomor batch).
+    """
+    total_rows = sum(len(rows) for _, rows in batches)
+    return run_bulk_insert_chunks(supabase, table_name, [batches], total_rows, mode, on_conflict)[0]
+
+
+def failed_batches(batches, report: pd.DataFrame):
+    """Batch dari `batches` yang statusnya gagal pada `report`, untuk dikirim ulang."""
+    if report is None or report.empty:
+        return []
+    failed = set(report.loc[report["status"] == STATUS_FAILED, "batch"])
+    return [(number, rows) for number, rows in batches if number in failed]
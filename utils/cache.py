@@ -0,0 +1,327 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+DEFAULT_CACHE_DIR = os.path.join(".sidama_cache", "cache")
+DEFAULT_MAX_MB = 256
+DEFAULT_MAX_DISK_MB = 1024
+
+# Tag untuk hasil yang bergantung pada skema database (bukan isi tabel)
+SCHEMA_TAG = "schema"
+
+
+def get_cache_config():
+    """Batas memori/disk dan direktori cache dari secrets bagian [cache] (jika ada)."""
+    config = {"max_mb": DEFAULT_MAX_MB, "max_disk_mb": DEFAULT_MAX_DISK_MB, "dir": DEFAULT_CACHE_DIR}
+    try:
+        config.update({k: type(config[k])(v) for k, v in st.secrets.get("cache", {}).items() if k in config})
+    except Exception:
+        pass
+    return config
+
+
+def table_tag(table_name):
+    """Tag cache untuk hasil yang bergantung pada isi sebuah tabel/RPC."""
+    return f"table:{table_name}"
+
+
+def _pickled_size(value) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def estimate_size(value, _depth=0) -> int:
+    """
+    Perkiraan ukuran objek di memori (byte) untuk batas LRU. Objek yang tidak
+    dikenali (mis. figure Plotly) diukur dari ukuran pickle-nya.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (pa.Table, pa.RecordBatch, pa.Array, pa.ChunkedArray)):
+        return int(value.nbytes)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes) if value.dtype != object else _pickled_size(value)
+    if value is None or isinstance(value, (str, bytes, int, float, bool, np.generic)):
+        return sys.getsizeof(value)
+    if _depth >= 3:
+        return _pickled_size(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    return _pickled_size(value)
+
+
+def _file_version(path):
+    # tags.json selalu diganti lewat os.replace, jadi inode ikut berubah walau mtime kasar
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_freeze(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def make_key(*parts) -> str:
+    """Kunci cache yang stabil antar-proses dari bagian-bagian yang bisa di-repr."""
+    return hashlib.sha1(repr(_freeze(parts)).encode()).hexdigest()
+
+
+class TieredCache:
+    """
+    Cache dua tingkat dengan tag untuk invalidasi.
+
+    Tier memori adalah LRU yang dibatasi perkiraan ukuran byte. Entri yang
+    diminta `disk=True` juga ditulis (pickle) ke direktori cache dan dibaca
+    kembali bila sudah keluar dari memori atau setelah restart.
+
+    Setiap tag (mis. `table:mahasiswas`) punya nomor generasi yang disimpan ke
+    disk. Entri mencatat generasi tagnya saat dibuat; `invalidate(tag)` menaikkan
+    generasi sehingga semua entri bertag itu, di memori maupun disk, tidak
+    dipakai lagi. Proses lain yang memakai direktori cache yang sama membaca
+    ulang `tags.json` setiap kali file itu berubah, sehingga invalidasi berlaku
+    lintas worker. Nilai yang dikembalikan dipakai bersama; jangan diubah.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> entry
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generations_version = None
+        self._generations = self._read_generations()
+        self.hits = self.misses = 0
+
+    # ---------- Generasi tag ----------
+
+    def _generations_path(self):
+        return os.path.join(self.disk_dir, "tags.json")
+
+    def _read_generations(self):
+        if not self.disk_dir:
+            return {}
+        try:
+            self._generations_version = _file_version(self._generations_path())
+            with open(self._generations_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _sync_generations(self):
+        # Generasi dari proses lain digabung (ambil yang terbesar) bila tags.json berubah
+        if not self.disk_dir:
+            return
+        try:
+            version = _file_version(self._generations_path())
+        except OSError:
+            return
+        if version == self._generations_version:
+            return
+        for tag, gen in self._read_generations().items():
+            if gen > self._generations.get(tag, 0):
+                self._generations[tag] = gen
+
+    def _write_generations(self):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(self._generations_path() + ".tmp", "w") as f:
+                json.dump(self._generations, f)
+            os.replace(self._generations_path() + ".tmp", self._generations_path())
+            self._generations_version = _file_version(self._generations_path())
+        except OSError as e:
+            print(f"Gagal menyimpan generasi tag cache: {e}")
+
+    def _current(self, entry):
+        if entry["expires_at"] is not None and time.time() > entry["expires_at"]:
+            return False
+        return all(self._generations.get(tag, 0) == gen for tag, gen in entry["tags"].items())
+
+    # ---------- Disk ----------
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _write_disk(self, key, entry):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._prune_disk()
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"Gagal menyimpan entri cache ke disk: {e}")
+
+    def _prune_disk(self):
+        if not self.max_disk_bytes:
+            return
+        files = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith(".pkl")]
+        total = sum(entry.stat().st_size for entry in files)
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+            if total <= self.max_disk_bytes:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _read_disk(self, key):
+        if not self.disk_dir or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = pickle.load(f)
+            os.utime(self._path(key))
+            return entry
+        except Exception as e:
+            print(f"Gagal membaca entri cache dari disk: {e}")
+            return None
+
+    # ---------- Memori ----------
+
+    def _remember(self, key, entry):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._bytes -= old["size"]
+        self._memory[key] = entry
+        self._bytes += entry["size"]
+        while self._bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= evicted["size"]
+
+    def _forget(self, key):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    # ---------- API ----------
+
+    def get(self, key):
+        """(True, nilai) bila ada entri yang masih berlaku, selain itu (False, None)."""
+        with self._lock:
+            self._sync_generations()
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._current(entry):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return True, entry["value"]
+                self._forget(key)
+        entry = self._read_disk(key)
+        with self._lock:
+            self._sync_generations()
+            if entry is not None and self._current(entry):
+                entry["size"] = estimate_size(entry["value"])
+                self._remember(key, entry)
+                self.hits += 1
+                return True, entry["value"]
+            self.misses += 1
+        return False, None
+
+    def set(self, key, value, tags=(), ttl=None, disk=False):
+        with self._lock:
+            self._sync_generations()
+            entry = {
+                "value": value,
+                "tags": {tag: self._generations.get(tag, 0) for tag in tags},
+                "expires_at": time.time() + ttl if ttl else None,
+                "size": estimate_size(value),
+            }
+            self._remember(key, entry)
+        if disk and self.disk_dir:
+            self._write_disk(key, entry)
+
+    def invalidate(self, tags):
+        """Membatalkan semua entri yang memiliki salah satu tag."""
+        tags = [tags] if isinstance(tags, str) else list(tags)
+        with self._lock:
+            self._sync_generations()
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in [k for k, entry in self._memory.items() if set(entry["tags"]) & set(tags)]:
+                self._forget(key)
+            self._write_generations()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "entri": len(self._memory),
+            "mb": round(self._bytes / 1e6, 1),
+            "batas_mb": round(self.max_bytes / 1e6, 1),
+            "hit": self.hits,
+            "miss": self.misses,
+        }
+
+
+@st.cache_resource
+def get_cache():
+    """Satu TieredCache per proses, dipakai bersama semua halaman dan sesi."""
+    config = get_cache_config()
+    return TieredCache(
+        max_bytes=config["max_mb"] * 1_000_000,
+        disk_dir=config["dir"] or None,
+        max_disk_bytes=config["max_disk_mb"] * 1_000_000,
+    )
+
+
+def cached(tags=(), ttl=None, disk=False):
+    """
+    Dekorator pengganti `st.cache_data` di atas TieredCache.
+
+    Seperti Streamlit, argumen berawalan `_` tidak ikut menjadi kunci. `tags`
+    boleh berupa list atau fungsi yang menerima argumen (tanpa `_`) dan
+    mengembalikan list, mis. `lambda table_name: [table_tag(table_name)]`.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if not k.startswith("_")}
+            key = make_key(name, params)
+            cache = get_cache()
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            cache.set(key, value, tags(**params) if callable(tags) else tags, ttl, disk)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,99 @@
+# Manifest kolom per halaman.
+# Hanya kolom yang tercantum di sini yang diminta dari Supabase, sehingga loader
+# tidak lagi mengunduh seluruh isi tabel dengan select("*").
+
+DASHBOARD = {
+    "mahasiswas": ["mahasiswa_id", "nama_lengkap", "nim", "jurusan", "tahun_masuk", "status_mahasiswa"],
+    "status_akademik_semesters": ["mahasiswa_id", "semester_id", "ipk", "tanggal_evaluasi"],
+    "penerimaan_beasiswas": ["mahasiswa_id", "beasiswa_id"],
+    "semesters": ["semester_id", "nama_semester"],
+}
+
+# Kolom ringan untuk opsi filter sidebar dan tren mahasiswa masuk (tanpa filter)
+DASHBOARD_FILTER_OPTIONS = {
+    "mahasiswas": ["mahasiswa_id", "jurusan", "tahun_masuk", "status_mahasiswa"],
+}
+
+EFEKTIFITAS_BEASISWA = {
+    "mahasiswas": ["mahasiswa_id", "nama_lengkap", "email", "status_mahasiswa"],
+    "beasiswas": ["beasiswa_id", "nama_beasiswa"],
+    "penerimaan_beasiswas": [
+        "mahasiswa_id", "beasiswa_id", "semester_penerimaan_id", "tanggal_pemberian", "jumlah_diterima",
+    ],
+    "semesters": ["semester_id", "nama_semester"],
+    "status_akademik_semesters": ["mahasiswa_id", "semester_id", "ipk"],
+    "partisipasi_kegiatans": ["mahasiswa_id", "kegiatan_id"],
+    "kegiatan_mahasiswas": ["kegiatan_id", "nama_kegiatan"],
+}
+
+ANALISIS_POLA_STUDI = {
+    "get_analisis_pola_studi": [
+        "mahasiswa_id", "nama_lengkap", "nim", "program_studi", "tahun_masuk",
+        "semester_id", "nama_semester", "sks_lulus_semester", "ipk", "ips",
+    ],
+}
+
+# Urutan stabil per tabel agar halaman `.range()` tidak tumpang tindih
+TABLE_ORDER = {
+    "mahasiswas": "mahasiswa_id",
+    "status_akademik_semesters": ("mahasiswa_id", "semester_id"),
+    "penerimaan_beasiswas": ("mahasiswa_id", "beasiswa_id", "semester_penerimaan_id"),
+    "semesters": "semester_id",
+    "beasiswas": "beasiswa_id",
+    "partisipasi_kegiatans": ("mahasiswa_id", "kegiatan_id"),
+    "kegiatan_mahasiswas": "kegiatan_id",
+    "get_analisis_pola_studi": ("mahasiswa_id", "semester_id"),
+}
+
+# Kunci dan watermark sinkronisasi inkremental per tabel.
+# `watermark` adalah kolom yang selalu naik saat baris ditambah/diubah; tabel
+# append-only memakai primary key sebagai high-water mark. Tabel yang tidak
+# tercantum selalu diunduh penuh.
+TABLE_SYNC = {
+    "mahasiswas": {"key": "mahasiswa_id", "watermark": "updated_at"},
+    "semesters": {"key": "semester_id", "watermark": "updated_at"},
+    # Beasiswa yang sama bisa diterima di beberapa semester
+    "penerimaan_beasiswas": {
+        "key": ("mahasiswa_id", "beasiswa_id", "semester_penerimaan_id"), "watermark": "updated_at",
+    },
+    "status_akademik_semesters": {
+        "key": "status_akademik_id", "watermark": "status_akademik_id", "append_only": True,
+    },
+}
+
+# Kolom numerik yang dikonversi sekali saat snapshot dibangun
+NUMERIC_COLUMNS = {
+    "mahasiswas": ["tahun_masuk"],
+    "status_akademik_semesters": ["ipk"],
+    "penerimaan_beasiswas": ["jumlah_diterima"],
+    "get_analisis_pola_studi": ["sks_lulus_semester", "ipk", "ips"],
+}
+
+# Sumber yang diambil lewat RPC, bukan tabel
+RPC_SOURCES = ("get_analisis_pola_studi",)
+
+# Tabel yang dibaca setiap RPC; perubahan pada tabel ini ikut membatalkan hasil RPC
+RPC_DEPENDENCIES = {
+    "get_analisis_pola_studi": ("mahasiswas", "semesters", "status_akademik_semesters"),
+}
+
+PAGE_MANIFESTS = (DASHBOARD, DASHBOARD_FILTER_OPTIONS, EFEKTIFITAS_BEASISWA, ANALISIS_POLA_STUDI)
+
+
+def dependent_sources(table_names):
+    """Tabel yang diminta beserta sumber RPC yang membacanya."""
+    sources = list(table_names)
+    for rpc, tables in RPC_DEPENDENCIES.items():
+        if rpc not in sources and set(tables) & set(table_names):
+            sources.append(rpc)
+    return sources
+
+
+def table_columns(table_name):
+    """Gabungan kolom sebuah tabel/RPC dari seluruh manifest halaman (urutan dipertahankan)."""
+    columns = []
+    for manifest in PAGE_MANIFESTS:
+        for column in manifest.get(table_name, []):
+            if column not in columns:
+                columns.append(column)
+    return columns or None
@@ -0,0 +1,233 @@
+import operator
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import streamlit as st
+from supabase import Client
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_MAX_WORKERS = 8
+
+# Operator filter deklaratif -> nama method PostgREST di query builder
+FILTER_OPS = {
+    "eq": "eq",
+    "neq": "neq",
+    "in": "in_",
+    "gt": "gt",
+    "gte": "gte",
+    "lt": "lt",
+    "lte": "lte",
+}
+
+# Padanan operator filter untuk evaluasi lokal di atas snapshot
+LOCAL_FILTER_OPS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+def get_loader_config():
+    """Mengambil ukuran halaman dan jumlah worker dari secrets (jika ada)."""
+    try:
+        page_size = int(st.secrets.get("LOADER_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+        max_workers = int(st.secrets.get("LOADER_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    except Exception:
+        page_size, max_workers = DEFAULT_PAGE_SIZE, DEFAULT_MAX_WORKERS
+    return max(1, page_size), max(1, max_workers)
+
+
+def select_list(columns=None):
+    """Mengubah daftar kolom manifest menjadi select list PostgREST."""
+    return ",".join(columns) if columns else "*"
+
+
+def _to_param(value):
+    # Nilai numpy/pandas (mis. 2021.0 dari kolom float) harus jadi literal yang dikenali Postgres
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value
+
+
+def apply_filters(query, filters=None):
+    """
+    Menerapkan filter deklaratif [(kolom, operator, nilai), ...] ke query builder.
+    Filter `in` dengan daftar kosong diabaikan (berarti tidak memfilter).
+    """
+    for column, op, value in filters or []:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Operator filter '{op}' tidak didukung.")
+        if op == "in":
+            value = [_to_param(v) for v in value]
+            if not value:
+                continue
+        else:
+            value = _to_param(value)
+        query = getattr(query, FILTER_OPS[op])(column, value)
+    return query
+
+
+def filter_frame(df, filters=None):
+    """
+    Mengevaluasi filter deklaratif yang sama dengan `apply_filters` secara lokal,
+    untuk tabel yang dilayani dari snapshot bersama alih-alih query baru.
+    """
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters or []:
+        if op == "in":
+            value = [_to_param(v) for v in value]
+            if not value:
+                continue
+            mask &= df[column].isin(value)
+        elif op in LOCAL_FILTER_OPS:
+            mask &= LOCAL_FILTER_OPS[op](df[column], _to_param(value))
+        else:
+            raise ValueError(f"Operator filter '{op}' tidak didukung.")
+    return df if mask.all() else df[mask]
+
+
+def _order(query, order_by=None):
+    if order_by:
+        for column in ([order_by] if isinstance(order_by, str) else order_by):
+            query = query.order(column)
+    return query
+
+
+def table_query(supabase: Client, table_name: str, columns=None, filters=None, order_by=None):
+    """Membuat factory query tabel: factory(count) -> query builder siap `.range()`."""
+    def factory(count=None):
+        query = supabase.table(table_name).select(select_list(columns), count=count)
+        return _order(apply_filters(query, filters), order_by)
+    return factory
+
+
+def rpc_query(supabase: Client, function_name: str, params=None, columns=None, filters=None, order_by=None):
+    """Membuat factory query untuk RPC set-returning dengan proyeksi dan filter di server."""
+    def factory(count=None):
+        query = supabase.rpc(function_name, params or {}, count=count).select(select_list(columns))
+        return _order(apply_filters(query, filters), order_by)
+    return factory
+
+
+def load_queries(queries, page_size=None, max_workers=None):
+    """
+    Mengambil beberapa sumber data sekaligus dengan request `.range()` per halaman.
+
+    `queries` berisi {nama: factory} dari `table_query`/`rpc_query`. Halaman pertama
+    tiap sumber diambil bersama `count="exact"` untuk mengetahui jumlah baris, lalu
+    halaman sisanya dikirim ke thread pool yang sama sehingga halaman dan sumber
+    berjalan paralel dengan jumlah koneksi yang terbatas.
+
+    Mengembalikan (frames, stats): {nama: DataFrame} dan
+    {nama: {"rows", "pages", "seconds"}}.
+    """
+    default_page_size, default_max_workers = get_loader_config()
+    page_size = page_size or default_page_size
+    max_workers = max_workers or default_max_workers
+
+    pages = {name: {} for name in queries}
+    started = {}
+    finished = {}
+
+    def fetch_page(name, start, end, count=None):
+        return queries[name](count).range(start, end).execute()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        first_pages = {}
+        for name in queries:
+            started[name] = time.perf_counter()
+            first_pages[executor.submit(fetch_page, name, 0, page_size - 1, "exact")] = name
+
+        rest_pages = {}
+        sequential = []
+        for future in as_completed(first_pages):
+            name = first_pages[future]
+            response = future.result()
+            rows = response.data or []
+            pages[name][0] = rows
+            finished[name] = time.perf_counter()
+
+            total = response.count
+            if total is None:
+                # Tanpa jumlah baris, lanjutkan halaman demi halaman sampai habis
+                if len(rows) >= page_size:
+                    sequential.append(name)
+                continue
+
+            # Server bisa membatasi max-rows di bawah page_size; ikuti batas tersebut
+            effective_size = len(rows) if 0 < len(rows) < min(page_size, total) else page_size
+            for start in range(len(rows), total, effective_size):
+                end = min(start + effective_size, total) - 1
+                rest_pages[executor.submit(fetch_page, name, start, end)] = (name, start)
+
+        for future in as_completed(rest_pages):
+            name, start = rest_pages[future]
+            pages[name][start] = future.result().data or []
+            finished[name] = time.perf_counter()
+
+    for name in sequential:
+        start = len(pages[name][0])
+        while True:
+            rows = fetch_page(name, start, start + page_size - 1).data or []
+            if not rows:
+                break
+            pages[name][start] = rows
+            start += len(rows)
+            if len(rows) < page_size:
+                break
+        finished[name] = time.perf_counter()
+
+    frames = {}
+    stats = {}
+    for name in queries:
+        ordered = [pages[name][start] for start in sorted(pages[name])]
+        records = [row for page in ordered for row in page]
+        frames[name] = pd.DataFrame.from_records(records)
+        stats[name] = {
+            "rows": len(records),
+            "pages": len(ordered),
+            "seconds": round(finished.get(name, started[name]) - started[name], 3),
+        }
+
+    return frames, stats
+
+
+def load_tables(supabase: Client, table_names, page_size=None, max_workers=None,
+                order_by=None, columns=None, filters=None):
+    """
+    Mengambil beberapa tabel secara paralel berhalaman.
+
+    `order_by`, `columns` dan `filters` berupa dict per tabel: kolom urutan agar
+    halaman stabil, manifest kolom untuk select list, dan filter yang didorong
+    ke server sebagai `in_`/`gte`/`lte`.
+    """
+    order_by = order_by or {}
+    columns = columns or {}
+    filters = filters or {}
+    queries = {
+        name: table_query(supabase, name, columns.get(name), filters.get(name), order_by.get(name))
+        for name in table_names
+    }
+    return load_queries(queries, page_size=page_size, max_workers=max_workers)
+
+
+def fetch_table(supabase: Client, table_name: str, page_size=None, max_workers=None,
+                order_by=None, columns=None, filters=None):
+    """Mengambil satu tabel secara lengkap dengan loader paralel berhalaman."""
+    query = table_query(supabase, table_name, columns, filters, order_by)
+    frames, stats = load_queries({table_name: query}, page_size=page_size, max_workers=max_workers)
+    return frames[table_name], stats[table_name]
+
+
+def fetch_rpc(supabase: Client, function_name: str, params=None, page_size=None, max_workers=None,
+              order_by=None, columns=None, filters=None):
+    """Mengambil seluruh hasil RPC secara berhalaman dengan proyeksi kolom dan filter."""
+    query = rpc_query(supabase, function_name, params, columns, filters, order_by)
+    frames, stats = load_queries({function_name: query}, page_size=page_size, max_workers=max_workers)
+    return frames[function_name], stats[function_name]
@@ -0,0 +1,380 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from supabase import Client
+
+from utils.cache import get_cache, table_tag
+from utils.column_manifest import NUMERIC_COLUMNS, RPC_SOURCES, TABLE_ORDER, TABLE_SYNC, dependent_sources, table_columns
+from utils.data_loader import load_queries, rpc_query, table_query
+from utils.postgrest_errors import is_missing_column
+
+# Umur maksimum snapshot sebelum disinkronkan ulang (detik)
+DEFAULT_MAX_AGE = 300
+
+# Sinkronisasi penuh berkala untuk menangkap baris yang dihapus di server
+FULL_SYNC_INTERVAL = 6 * 60 * 60
+
+# Naikkan jika format file snapshot berubah agar file lama diabaikan
+SNAPSHOT_FORMAT = 2
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(".sidama_cache", "snapshots")
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _coerce(table_name, frame):
+    for column in NUMERIC_COLUMNS.get(table_name, []):
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    return frame
+
+
+def _json_value(value):
+    if hasattr(value, "item"):
+        value = value.item()
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return value
+
+
+def get_snapshot_dir():
+    """Direktori snapshot Parquet; bisa diatur lewat secrets `SNAPSHOT_DIR`."""
+    try:
+        return st.secrets.get("SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+    except Exception:
+        return DEFAULT_SNAPSHOT_DIR
+
+
+class DataStore:
+    """
+    Lapisan akses data bersama: satu snapshot Arrow yang immutable per tabel.
+
+    Snapshot memuat gabungan kolom dari semua manifest halaman dan dibagikan
+    ke semua halaman dan sesi tanpa disalin. Saat disinkronkan ulang, hanya
+    baris dengan watermark lebih baru yang diambil lalu digabung berdasarkan
+    kunci tabel, sehingga biaya refresh sebanding dengan jumlah perubahan.
+
+    Setiap snapshot juga ditulis ke disk sebagai Parquet beserta metadata
+    versinya. Proses baru langsung melayani dari file tersebut (memory-mapped)
+    dan memvalidasi ulang ke Supabase di background.
+
+    Frame yang dikembalikan dipakai bersama; halaman tidak boleh mengubahnya
+    di tempat. Gunakan `.copy(deep=False)` sebelum menambah atau mengganti kolom.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE, full_sync_interval=FULL_SYNC_INTERVAL, snapshot_dir=None):
+        self.max_age = max_age
+        self.full_sync_interval = full_sync_interval
+        self.snapshot_dir = snapshot_dir
+        self._snapshots = {}
+        self._versions = {}
+        self._delta_disabled = set()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # ---------- Disk ----------
+
+    def _paths(self, table_name):
+        base = os.path.join(self.snapshot_dir, table_name)
+        return base + ".parquet", base + ".json"
+
+    def _write_disk(self, table_name, snapshot):
+        if not self.snapshot_dir:
+            return
+        data_path, meta_path = self._paths(table_name)
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "version": self._versions[table_name],
+            "columns": table_columns(table_name),
+            "watermark": _json_value(snapshot["watermark"]),
+            "synced_at": snapshot["synced_at"],
+            "full_synced_at": snapshot["full_synced_at"],
+        }
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            pq.write_table(snapshot["table"], data_path + ".tmp")
+            os.replace(data_path + ".tmp", data_path)
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError as e:
+            print(f"Gagal menyimpan snapshot '{table_name}' ke disk: {e}")
+
+    def _read_disk(self, table_name):
+        if not self.snapshot_dir:
+            return None
+        data_path, meta_path = self._paths(table_name)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("format") != SNAPSHOT_FORMAT or meta.get("columns") != table_columns(table_name):
+                return None
+            table = pq.read_table(data_path, memory_map=True)
+        except (OSError, ValueError, pa.ArrowException):
+            return None
+
+        self._versions[table_name] = max(self._versions.get(table_name, 0), meta["version"])
+        return {
+            "table": table,
+            "frame": table.to_pandas(),
+            "watermark": meta["watermark"],
+            "synced_at": meta["synced_at"],
+            "full_synced_at": meta["full_synced_at"],
+            "stats": {"rows": 0, "pages": 0, "seconds": 0.0, "mode": "disk"},
+        }
+
+    # ---------- Sinkronisasi ----------
+
+    def _sync_config(self, table_name):
+        if table_name in self._delta_disabled:
+            return None
+        return TABLE_SYNC.get(table_name)
+
+    def _plan(self, supabase, table_name):
+        config = self._sync_config(table_name)
+        columns = table_columns(table_name)
+        if config and columns is not None:
+            for column in _as_list(config["key"]) + [config["watermark"]]:
+                if column not in columns:
+                    columns.append(column)
+
+        snapshot = self._snapshots.get(table_name)
+        full = (
+            config is None
+            or snapshot is None
+            or snapshot["watermark"] is None
+            or time.time() - snapshot["full_synced_at"] > self.full_sync_interval
+        )
+        filters = []
+        if not full:
+            op = "gt" if config.get("append_only") else "gte"
+            filters.append((config["watermark"], op, snapshot["watermark"]))
+
+        order_by = TABLE_ORDER.get(table_name)
+        if table_name in RPC_SOURCES:
+            query = rpc_query(supabase, table_name, columns=columns, filters=filters, order_by=order_by)
+        else:
+            query = table_query(supabase, table_name, columns, filters, order_by)
+        return "full" if full else "delta", query
+
+    def _merge(self, table_name, mode, frame, stats):
+        config = self._sync_config(table_name)
+        snapshot = self._snapshots.get(table_name)
+        now = time.time()
+
+        if mode == "delta" and frame.empty:
+            with self._lock:
+                self._snapshots[table_name] = {**snapshot, "synced_at": now, "stats": stats, "expired": False}
+            return
+
+        frame = _coerce(table_name, frame)
+        if mode == "delta":
+            frame = pd.concat([snapshot["frame"], frame], ignore_index=True)
+            frame = frame.drop_duplicates(subset=_as_list(config["key"]), keep="last")
+            order_by = TABLE_ORDER.get(table_name)
+            if order_by:
+                frame = frame.sort_values(_as_list(order_by), kind="stable")
+            frame = frame.reset_index(drop=True)
+
+        watermark = None
+        if config and config["watermark"] in frame.columns and not frame.empty:
+            watermark = frame[config["watermark"]].max()
+            if pd.isna(watermark):
+                watermark = None
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        new_snapshot = {
+            "table": table,
+            # View pandas dibangun sekali per versi, bukan sekali per akses
+            "frame": table.to_pandas(),
+            "watermark": watermark,
+            "synced_at": now,
+            "full_synced_at": now if mode == "full" else snapshot["full_synced_at"],
+            "stats": stats,
+        }
+        with self._lock:
+            self._versions[table_name] = self._versions.get(table_name, 0) + 1
+            self._snapshots[table_name] = new_snapshot
+        self._write_disk(table_name, new_snapshot)
+
+    def _missing_sync_columns(self, plans, table_names):
+        """Tabel yang query-nya gagal karena kolom tidak ada, diperiksa satu per satu (satu baris)."""
+        missing = set()
+        for name in table_names:
+            try:
+                plans[name][1]().range(0, 0).execute()
+            except Exception as e:
+                if is_missing_column(e):
+                    missing.add(name)
+        return missing
+
+    def _sync(self, supabase, table_names, page_size=None, max_workers=None):
+        plans = {name: self._plan(supabase, name) for name in table_names}
+        try:
+            frames, stats = load_queries(
+                {name: query for name, (_, query) in plans.items()},
+                page_size=page_size, max_workers=max_workers,
+            )
+        except Exception as e:
+            # Kolom watermark bisa tidak ada di sebagian tabel; hanya tabel itu yang delta-nya
+            # dimatikan permanen. Error lain (timeout, jaringan) diteruskan dan dicoba lagi nanti.
+            synced = [name for name in table_names if self._sync_config(name)]
+            missing = self._missing_sync_columns(plans, synced) if synced and is_missing_column(e) else set()
+            if not missing:
+                raise
+            self._delta_disabled.update(missing)
+            plans = {name: self._plan(supabase, name) for name in table_names}
+            frames, stats = load_queries(
+                {name: query for name, (_, query) in plans.items()},
+                page_size=page_size, max_workers=max_workers,
+            )
+
+        for name, (mode, _) in plans.items():
+            stats[name]["mode"] = mode
+            self._merge(name, mode, frames[name], stats[name])
+
+    def _refresh(self, supabase, table_names, page_size=None, max_workers=None, background=False):
+        try:
+            self._sync(supabase, table_names, page_size=page_size, max_workers=max_workers)
+        except Exception as e:
+            if not background:
+                raise
+            print(f"Revalidasi snapshot {', '.join(table_names)} gagal: {e}")
+        finally:
+            with self._lock:
+                for name in table_names:
+                    self._inflight.pop(name).set()
+
+    def get_tables(self, supabase: Client, table_names, max_age=None, page_size=None, max_workers=None):
+        """
+        Mengembalikan (frames, stats) untuk tabel/RPC yang diminta berdasarkan nama.
+
+        Tabel tanpa snapshot (di memori maupun di disk) diambil saat itu juga.
+        Snapshot yang lebih tua dari `max_age` detik tetap langsung dilayani,
+        sementara sinkronisasinya berjalan di background.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            now = time.time()
+            missing, stale = [], []
+            for name in table_names:
+                if name not in self._snapshots:
+                    snapshot = self._read_disk(name)
+                    if snapshot is not None:
+                        self._snapshots[name] = snapshot
+                snapshot = self._snapshots.get(name)
+                if snapshot is None or snapshot.get("expired"):
+                    # Snapshot kedaluwarsa (mis. setelah upload) disinkronkan sebelum dilayani
+                    missing.append(name)
+                elif now - snapshot["synced_at"] > max_age:
+                    stale.append(name)
+
+            waits = [self._inflight[name] for name in missing if name in self._inflight]
+            fetch_now = [name for name in missing if name not in self._inflight]
+            revalidate = [name for name in stale if name not in self._inflight]
+            for name in fetch_now + revalidate:
+                self._inflight[name] = threading.Event()
+
+        if revalidate:
+            threading.Thread(
+                target=self._refresh,
+                args=(supabase, revalidate, page_size, max_workers, True),
+                daemon=True,
+            ).start()
+        if fetch_now:
+            self._refresh(supabase, fetch_now, page_size=page_size, max_workers=max_workers)
+        for event in waits:
+            event.wait()
+
+        with self._lock:
+            unavailable = [name for name in table_names if name not in self._snapshots]
+            if unavailable:
+                raise RuntimeError(f"Snapshot tidak tersedia untuk: {', '.join(unavailable)}")
+            frames = {name: self._snapshots[name]["frame"] for name in table_names}
+            stats = {
+                name: {**self._snapshots[name]["stats"], "total": self._snapshots[name]["table"].num_rows}
+                for name in table_names
+            }
+        return frames, stats
+
+    def get_arrow(self, table_name):
+        """Snapshot Arrow sebuah tabel (None jika belum pernah dimuat)."""
+        snapshot = self._snapshots.get(table_name)
+        return snapshot["table"] if snapshot else None
+
+    def derived(self, table_name, name, builder):
+        """
+        Objek turunan snapshot (mis. ringkasan atau indeks pencarian).
+
+        `builder(frame)` dipanggil sekali per versi snapshot; hasilnya disimpan
+        bersama snapshot sehingga otomatis ikut diganti atau dihapus bersamanya.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(table_name)
+            if snapshot is None:
+                raise KeyError(f"Snapshot '{table_name}' belum dimuat.")
+            derived = snapshot.setdefault("derived", {})
+            if name in derived:
+                return derived[name]
+
+        value = builder(snapshot["frame"])
+        with self._lock:
+            derived.setdefault(name, value)
+            return derived[name]
+
+    def version(self, table_name):
+        """Nomor versi snapshot; naik setiap kali isi tabel berubah."""
+        return self._versions.get(table_name, 0)
+
+    def expire(self, table_names):
+        """
+        Menandai snapshot harus disinkronkan ulang sebelum dilayani lagi. Snapshot
+        lama tetap dipakai sebagai dasar sinkronisasi delta.
+        """
+        with self._lock:
+            for name in table_names:
+                if name in self._snapshots:
+                    self._snapshots[name] = {**self._snapshots[name], "expired": True}
+
+    def invalidate(self, table_name=None):
+        """Menghapus snapshot sebuah tabel (atau semua), termasuk file di disk."""
+        with self._lock:
+            names = list(self._snapshots) if table_name is None else [table_name]
+            for name in names:
+                self._snapshots.pop(name, None)
+                if self.snapshot_dir:
+                    for path in self._paths(name):
+                        if os.path.exists(path):
+                            os.remove(path)
+
+
+@st.cache_resource
+def get_data_store():
+    """Satu DataStore per proses, dipakai bersama semua halaman dan sesi."""
+    return DataStore(snapshot_dir=get_snapshot_dir())
+
+
+def get_tables(supabase: Client, table_names, max_age=None):
+    """Pintasan untuk mengambil tabel dari DataStore bersama."""
+    return get_data_store().get_tables(supabase, table_names, max_age=max_age)
+
+
+def invalidate_tables(table_names):
+    """
+    Dipanggil setelah upload/inject: snapshot tabel yang diubah (dan RPC yang
+    membacanya) disinkronkan ulang pada akses berikutnya, dan semua entri cache
+    bertag tabel tersebut dibatalkan.
+    """
+    sources = dependent_sources(table_names)
+    get_data_store().expire(sources)
+    get_cache().invalidate([table_tag(name) for name in sources])
@@ -1,68 +1,264 @@
 
 
+import time
 import streamlit as st
 import pandas as pd
 from supabase import Client  
 from io import BytesIO
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import xlsxwriter
+from openpyxl import load_workbook
+from xlsxwriter.utility import xl_col_to_name
+from utils.bulk_loader import STATUS_OK, insert_batches, make_batches, to_json_rows
+from utils.cache import SCHEMA_TAG, cached
+from utils.data_store import invalidate_tables
+from utils.schema_catalog import get_column_specs, get_public_tables, get_schema_version, get_table_columns
+from utils.schema_validation import ERROR_COLUMN, is_required, validate_frame
 
+UPLOAD_SHEET = "Data Upload"
+DEFAULT_BLOCK_ROWS = 5000
 
-@st.cache_data(ttl=3600)
-def get_public_tables(_supabase: Client):
-    """Mengambil semua nama tabel publik."""
-    result = _supabase.rpc("get_public_tables").execute()
-    return sorted([row["table_name"] for row in result.data]) if result.data else []
+# Format file unggahan yang didukung, berdasarkan ekstensi
+UPLOAD_FORMATS = {"xlsx": "excel", "csv": "csv", "parquet": "parquet"}
 
-@st.cache_data(ttl=300) 
-def get_table_columns_with_details(_supabase: Client, table_name: str):
-    """Mengambil detail kolom dari Supabase."""
-    result = _supabase.rpc("get_full_column_details", {"t_name": table_name}).execute()
-    return result.data or []
 
+# Lebar kolom template (karakter) per keluarga tipe; teks memakai panjang maksimum kolom
+TEMPLATE_WIDTHS = {"integer": 10, "float": 12, "boolean": 8, "date": 12, "timestamp": 20, "text": 20}
+MAX_TEMPLATE_WIDTH = 50
+ENUM_SHEET = "Daftar Nilai"
+GUIDE_SHEET = "Panduan Pengisian"
 
-@st.cache_data(ttl=300)
-def get_enum_values(_supabase: Client, table_name: str, column_name: str):
-    """Mengambil semua nilai yang mungkin untuk sebuah kolom ENUM."""
-    result = _supabase.rpc("get_enum_values", {"schema_name": "public", "table_name": table_name, "column_name": column_name}).execute()
-    return [row["enum_value"] for row in result.data] if result.data else []
 
-def generate_excel_template(supabase: Client, table_name: str) -> bytes:
-    """Membuat file Excel di memori dengan sheet data dan panduan."""
+def _template_width(spec) -> int:
+    """Lebar kolom dari metadata skema, bukan dari isi sel."""
+    width = TEMPLATE_WIDTHS.get(spec["kind"], TEMPLATE_WIDTHS["text"])
+    if spec["kind"] == "text" and spec.get("max_length"):
+        width = int(spec["max_length"])
+    if spec.get("enum_values"):
+        width = max(len(str(value)) for value in spec["enum_values"])
+    return min(max(width, len(spec["name"])) + 2, MAX_TEMPLATE_WIDTH)
+
+
+@cached(tags=[SCHEMA_TAG], ttl=3600, disk=True)
+def _build_excel_template(_columns_details, _specs, table_name: str, schema_version) -> bytes:
+    """Workbook template, dibangun sekali per (tabel, versi skema)."""
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+    header = workbook.add_format({"bold": True, "bg_color": "#DDEBF7", "border": 1})
+    required_header = workbook.add_format({"bold": True, "bg_color": "#FCE4D6", "border": 1})
+
+    data_sheet = workbook.add_worksheet(UPLOAD_SHEET)
+    guide_sheet = workbook.add_worksheet(GUIDE_SHEET)
+    enum_sheet = None
+
+    guide_columns = ["Nama Kolom", "Wajib Diisi?", "Tipe Data", "Nilai yang Diizinkan"]
+    guide_widths = [len(name) + 2 for name in guide_columns]
+    guide_sheet.write_row(0, 0, guide_columns, header)
+
+    for index, (column, spec) in enumerate(zip(_columns_details, _specs)):
+        required = is_required(column)
+        data_sheet.write(0, index, spec["name"], required_header if required else header)
+        data_sheet.set_column(index, index, _template_width(spec))
+
+        allowed = ""
+        if spec.get("enum_values"):
+            # Daftar nilai ditaruh di sheet tersembunyi: sumber list langsung dibatasi 255 karakter
+            if enum_sheet is None:
+                enum_sheet = workbook.add_worksheet(ENUM_SHEET)
+                enum_sheet.hide()
+            enum_column = xl_col_to_name(index)
+            enum_sheet.write(0, index, spec["name"])
+            enum_sheet.write_column(1, index, spec["enum_values"])
+            data_sheet.data_validation(1, index, 1_048_575, index, {
+                "validate": "list",
+                "source": f"='{ENUM_SHEET}'!${enum_column}$2:${enum_column}${len(spec['enum_values']) + 1}",
+                "error_title": "Nilai tidak valid",
+                "error_message": f"Pilih salah satu nilai untuk kolom {spec['name']}.",
+            })
+            allowed = ", ".join(map(str, spec["enum_values"]))
 
-    columns_details = get_table_columns_with_details(supabase, table_name)
+        row = [spec["name"], "YA" if required else "TIDAK", column.get("data_type") or "", allowed]
+        guide_sheet.write_row(index + 1, 0, row)
+        guide_widths = [max(width, len(value) + 2) for width, value in zip(guide_widths, row)]
+
+    for index, width in enumerate(guide_widths):
+        guide_sheet.set_column(index, index, min(width, MAX_TEMPLATE_WIDTH))
+    data_sheet.freeze_panes(1, 0)
+    data_sheet.activate()
+    workbook.close()
+    return output.getvalue()
+
+
+def generate_excel_template(supabase: Client, table_name: str) -> bytes:
+    """Membuat file Excel di memori dengan sheet data, panduan dan dropdown untuk kolom ENUM."""
+    columns_details = get_table_columns(supabase, table_name)
     if not columns_details:
         raise ValueError(f"Tidak dapat menemukan detail kolom untuk tabel '{table_name}'.")
+    specs = get_column_specs(supabase, table_name)
+    return _build_excel_template(columns_details, specs, table_name, get_schema_version(supabase))
 
-    df_data = pd.DataFrame(columns=[col['column_name'] for col in columns_details])
-    
-    guide_data = []
-    for col in columns_details:
-        guide_data.append({
-            "Nama Kolom": col['column_name'],
-            "Wajib Diisi?": "YA" if col['is_nullable'] == 'NO' else "TIDAK",
-            "Tipe Data": col['data_type'],
-        })
-    df_guide = pd.DataFrame(guide_data)
 
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_data.to_excel(writer, sheet_name='Data Upload', index=False)
-        df_guide.to_excel(writer, sheet_name='Panduan Pengisian', index=False)
-
-        for sheet_name in writer.sheets:
-            worksheet = writer.sheets[sheet_name]
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+def _open_upload_sheet(file, sheet_name=UPLOAD_SHEET):
+    file.seek(0)
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    if sheet_name not in workbook.sheetnames:
+        workbook.close()
+        raise ValueError(f"Sheet '{sheet_name}' tidak ditemukan.")
+    return workbook, workbook[sheet_name]
 
-    return output.getvalue()
+
+def iter_excel_blocks(file, sheet_name=UPLOAD_SHEET, block_rows=DEFAULT_BLOCK_ROWS, skip_rows=0):
+    """
+    Membaca sheet blok demi blok lewat openpyxl mode read-only sehingga memori
+    tetap datar. Menghasilkan (offset baris data, DataFrame blok); baris kosong
+    dilewati dan `skip_rows` baris data pertama tidak ikut dibaca ulang.
+    """
+    workbook, worksheet = _open_upload_sheet(file, sheet_name)
+    try:
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        positions = [i for i, name in enumerate(header) if name is not None]
+        columns = [str(header[i]) for i in positions]
+
+        offset, block = 0, []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in positions]
+            if all(v is None for v in values):
+                continue
+            if offset + len(block) < skip_rows:
+                offset += 1
+                continue
+            block.append(values)
+            if len(block) >= block_rows:
+                yield offset, pd.DataFrame.from_records(block, columns=columns)
+                offset += len(block)
+                block = []
+        if block:
+            yield offset, pd.DataFrame.from_records(block, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _arrow_blocks(batches, block_rows, skip_rows=0):
+    """Menyusun ulang record batch Arrow menjadi blok berukuran tetap (deterministik untuk resume)."""
+    offset, pending, pending_rows = 0, [], 0
+    for batch in batches:
+        if offset < skip_rows:
+            cut = min(skip_rows - offset, batch.num_rows)
+            batch = batch.slice(cut)
+            offset += cut
+        if batch.num_rows:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+        while pending_rows >= block_rows:
+            table = pa.Table.from_batches(pending)
+            yield offset, table.slice(0, block_rows).to_pandas()
+            pending = table.slice(block_rows).to_batches()
+            pending_rows -= block_rows
+            offset += block_rows
+    if pending_rows:
+        yield offset, pa.Table.from_batches(pending).to_pandas()
+
+
+def iter_csv_blocks(file, block_rows=DEFAULT_BLOCK_ROWS, skip_rows=0, text_columns=()):
+    """
+    Membaca CSV secara streaming dengan parser pyarrow. `text_columns` dibaca
+    sebagai string agar nilai seperti NIM tidak kehilangan nol di depan.
+    """
+    file.seek(0)
+    reader = pa_csv.open_csv(
+        file,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in text_columns},
+            strings_can_be_null=True,
+        ),
+    )
+    yield from _arrow_blocks(reader, block_rows, skip_rows)
+
+
+def iter_parquet_blocks(file, block_rows=DEFAULT_BLOCK_ROWS, skip_rows=0):
+    """Membaca Parquet per record batch langsung ke Arrow."""
+    file.seek(0)
+    yield from _arrow_blocks(pq.ParquetFile(file).iter_batches(batch_size=block_rows), block_rows, skip_rows)
+
+
+def iter_upload_blocks(file, file_format, specs=(), block_rows=DEFAULT_BLOCK_ROWS, skip_rows=0):
+    """Membaca file unggahan (excel/csv/parquet) sebagai blok (offset, DataFrame)."""
+    if file_format == "csv":
+        text_columns = [spec["name"] for spec in specs if spec["kind"] in ("text", "enum")]
+        return iter_csv_blocks(file, block_rows, skip_rows, text_columns)
+    if file_format == "parquet":
+        return iter_parquet_blocks(file, block_rows, skip_rows)
+    return iter_excel_blocks(file, block_rows=block_rows, skip_rows=skip_rows)
+
+
+def upload_format(file_name: str) -> str:
+    return UPLOAD_FORMATS.get(file_name.rsplit(".", 1)[-1].lower(), "excel")
+
+
+def read_upload_preview(file, file_format, specs=(), n=5):
+    """Beberapa baris pertama dan perkiraan jumlah baris data (0 bila tidak diketahui) tanpa membaca seluruh file."""
+    if file_format == "excel":
+        workbook, worksheet = _open_upload_sheet(file)
+        total_rows = max((worksheet.max_row or 1) - 1, 0)
+        workbook.close()
+    elif file_format == "parquet":
+        file.seek(0)
+        total_rows = pq.ParquetFile(file).metadata.num_rows
+    else:
+        total_rows = 0
+    preview = next(iter(iter_upload_blocks(file, file_format, specs, block_rows=n)), (0, pd.DataFrame()))[1]
+    return preview, total_rows
+
+
+def missing_columns(df: pd.DataFrame, specs):
+    """Kolom wajib yang sama sekali tidak ada di header file."""
+    return [spec["name"] for spec in specs if spec["required"] and spec["name"] not in df.columns]
+
+
+def ingest_upload(supabase: Client, table_name: str, file, file_format, specs, resume=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Mengunggah file blok demi blok: setiap blok divalidasi dan dikonversi
+    sesuai skema, lalu hanya baris valid yang dikirim sebagai batch insert
+    terbatas. Posisi terakhir yang sudah tersimpan dicatat di `resume`
+    ({rows, skip_batches}) agar pengiriman dapat dilanjutkan.
+    Menghasilkan (resume, jumlah baris terkirim, baris ditolak, pesan error atau None) per blok.
+    """
+    resume = dict(resume or {"rows": 0, "skip_batches": []})
+    for offset, block in iter_upload_blocks(file, file_format, specs, block_rows, skip_rows=resume["rows"]):
+        valid, rejected = validate_frame(block, specs)
+        skip = set(resume.get("skip_batches", []))
+        if skip:
+            # Blok ini sudah pernah divalidasi; baris ditolaknya sudah dilaporkan
+            rejected = rejected.iloc[:0]
+
+        batches = make_batches(to_json_rows(valid))
+        pending = [(number, rows) for number, rows in batches if number not in skip]
+        reports = list(insert_batches(supabase, table_name, pending))
+        done = skip | {r["batch"] for r in reports if r["status"] == STATUS_OK}
+        sent = sum(r["baris"] for r in reports if r["status"] == STATUS_OK)
+
+        failed = [r for r in reports if r["status"] != STATUS_OK]
+        if failed:
+            # Batch yang sudah masuk pada blok ini tidak dikirim ulang saat dilanjutkan
+            resume = {"rows": offset, "skip_batches": sorted(done)}
+            yield resume, sent, rejected, f"{len(failed)} batch gagal pada baris data {offset + 1}-{offset + len(block)}: {failed[0]['error']}"
+            return
+
+        resume = {"rows": offset + len(block), "skip_batches": []}
+        yield resume, sent, rejected, None
+
+
+def generate_csv_template(supabase: Client, table_name: str) -> bytes:
+    """Template CSV berisi baris header kolom tabel."""
+    columns_details = get_table_columns(supabase, table_name)
+    if not columns_details:
+        raise ValueError(f"Tidak dapat menemukan detail kolom untuk tabel '{table_name}'.")
+    return pd.DataFrame(columns=[col['column_name'] for col in columns_details]).to_csv(index=False).encode("utf-8")
 
 
 def display_excel_uploader(supabase: Client):
@@ -89,36 +285,98 @@ def display_excel_uploader(supabase: Client):
                 file_name=f"template_{selected_table}.xlsx",
                 mime="application/vnd.ms-excel"
             )
+        st.download_button(
+            label="Download Template CSV",
+            data=generate_csv_template(supabase, selected_table),
+            file_name=f"template_{selected_table}.csv",
+            mime="text/csv"
+        )
         
         st.divider()
 
         st.header("3. Unggah File yang Sudah Diisi")
         uploaded_file = st.file_uploader(
-            f"Pilih file Excel (.xlsx) untuk tabel `{selected_table}`",
-            type=['xlsx'],
+            f"Pilih file Excel (.xlsx), CSV atau Parquet untuk tabel `{selected_table}`",
+            type=list(UPLOAD_FORMATS),
             key=f"uploader_{selected_table}"
         )
         
         if uploaded_file:
             try:
-                df = pd.read_excel(uploaded_file, sheet_name="Data Upload")
-                columns_details = get_table_columns_with_details(supabase, selected_table)
-                required_cols = [col['column_name'] for col in columns_details if not col['is_nullable']]
-                missing_cols = [col for col in required_cols if col not in df.columns or df[col].isnull().any()]
-                
-                if missing_cols:
-                    st.error(f"Validasi Gagal! Kolom berikut wajib diisi dan tidak boleh kosong: **{', '.join(missing_cols)}**.")
-                else:
-                    st.success("Validasi Awal Berhasil. Berikut adalah pratinjau data:")
-                    st.dataframe(df.head(), use_container_width=True)
-                    
-                    if st.button(f"Kirim {len(df)} Baris Data ke Tabel `{selected_table}`"):
-                        with st.spinner("Mengirim data..."):
-                            data_to_insert = df.to_dict(orient='records')
-                            try:
-                                supabase.table(selected_table).insert(data_to_insert, returning="minimal").execute()
-                                st.success(f"Berhasil! {len(df)} baris data telah diunggah.")
-                            except Exception as e:
-                                st.error(f"Terjadi kesalahan saat menyimpan: {e}")
+                file_format = upload_format(uploaded_file.name)
+                specs = get_column_specs(supabase, selected_table)
+                preview, total_rows = read_upload_preview(uploaded_file, file_format, specs)
+                missing_cols = missing_columns(preview, specs)
             except Exception as e:
-                st.error(f"Gagal memproses file. Pastikan sheet 'Data Upload' ada. Detail: {e}")
\ No newline at end of file
+                hint = " Pastikan sheet 'Data Upload' ada." if file_format == "excel" else ""
+                st.error(f"Gagal memproses file.{hint} Detail: {e}")
+                return
+
+            if missing_cols:
+                st.error(f"Validasi Gagal! Kolom wajib berikut tidak ada di file: **{', '.join(missing_cols)}**.")
+                return
+
+            st.success("Validasi Awal Berhasil. Berikut adalah pratinjau data:")
+            st.dataframe(preview, use_container_width=True)
+            _, preview_rejected = validate_frame(preview, specs)
+            if not preview_rejected.empty:
+                st.warning(f"{len(preview_rejected)} dari {len(preview)} baris pratinjau tidak valid dan akan dilewati:")
+                st.dataframe(preview_rejected[[ERROR_COLUMN]], use_container_width=True)
+
+            # Posisi terakhir yang sudah tersimpan untuk file ini (untuk melanjutkan pengiriman)
+            resume_key = f"upload_resume_{selected_table}"
+            file_id = (uploaded_file.name, uploaded_file.size)
+            saved = st.session_state.get(resume_key)
+            resume = saved["resume"] if saved and saved["file"] == file_id else None
+            rejected_parts = saved["rejected"] if saved and saved["file"] == file_id else []
+
+            if resume:
+                st.info(f"{resume['rows']} baris sudah tersimpan sebelumnya. Pengiriman akan dilanjutkan dari baris data ke-{resume['rows'] + 1}.")
+                if st.button("Mulai dari Awal"):
+                    del st.session_state[resume_key]
+                    st.rerun()
+
+            if resume:
+                label = "Lanjutkan Pengiriman"
+            elif total_rows:
+                label = f"Kirim ±{total_rows} Baris Data ke Tabel `{selected_table}`"
+            else:
+                label = f"Kirim Data ke Tabel `{selected_table}`"
+            if st.button(label):
+                progress = st.progress(0.0, text="Mengirim data...")
+                throughput = st.empty()
+                sent_total, error = 0, None
+                start = time.perf_counter()
+                base = resume["rows"] if resume else 0
+                if not resume:
+                    rejected_parts = []
+
+                for resume, sent, rejected, error in ingest_upload(supabase, selected_table, uploaded_file, file_format, specs, resume):
+                    if not rejected.empty:
+                        rejected_parts.append(rejected)
+                    st.session_state[resume_key] = {"file": file_id, "resume": resume, "rejected": rejected_parts}
+                    sent_total += sent
+                    elapsed = max(time.perf_counter() - start, 1e-6)
+                    throughput.metric("Throughput", f"{sent_total / elapsed:,.0f} baris/detik", f"{sent_total} baris terkirim")
+                    if total_rows:
+                        progress.progress(min(resume["rows"] / total_rows, 1.0), text=f"{base + sent_total} dari ±{total_rows} baris")
+
+                if sent_total:
+                    # Halaman analitik langsung melihat data baru pada akses berikutnya
+                    invalidate_tables([selected_table])
+                if error:
+                    st.error(f"Pengiriman berhenti: {error} Perbaiki masalahnya lalu klik 'Lanjutkan Pengiriman'.")
+                else:
+                    progress.progress(1.0, text="Selesai")
+                    st.session_state[resume_key] = {"file": file_id, "resume": None, "rejected": rejected_parts}
+                    st.success(f"Berhasil! {sent_total} baris data telah diunggah.")
+
+            if rejected_parts:
+                df_rejected = pd.concat(rejected_parts)
+                st.warning(f"{len(df_rejected)} baris ditolak karena tidak lolos validasi skema dan tidak dikirim.")
+                st.download_button(
+                    label="📥 Unduh Baris yang Ditolak (CSV)",
+                    data=df_rejected.to_csv(index=False),
+                    file_name=f"ditolak_{selected_table}.csv",
+                    mime="text/csv"
+                )
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+
+import streamlit as st
+
+DEFAULT_HTTP_CACHE_DIR = os.path.join(".sidama_cache", "http")
+
+
+def get_http_cache_dir():
+    """Direktori cache respons HTTP; bisa diatur lewat secrets [api_fetch] `cache_dir` (kosong = nonaktif)."""
+    try:
+        return st.secrets.get("api_fetch", {}).get("cache_dir", DEFAULT_HTTP_CACHE_DIR)
+    except Exception:
+        return DEFAULT_HTTP_CACHE_DIR
+
+
+class ResponseCache:
+    """
+    Cache respons GET di disk, satu file per (URL, parameter, header) halaman.
+
+    Setiap file berisi satu baris metadata JSON (ETag, Last-Modified, header
+    Link, waktu simpan) diikuti body terkompresi, ditulis atomik sehingga
+    metadata dan body selalu berpasangan. Dipakai untuk permintaan kondisional
+    (If-None-Match / If-Modified-Since) dan TTL per sumber.
+
+    Header permintaan (mis. Authorization) ikut menjadi kunci sehingga respons
+    milik satu kredensial tidak dilayani untuk kredensial lain. Kunci berupa
+    hash, jadi nilai header tidak tersimpan di disk.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, url, params, headers=None):
+        key = json.dumps([
+            url,
+            sorted((str(k), str(v)) for k, v in (params or {}).items()),
+            sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items()),
+        ])
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".cache")
+
+    def lookup(self, url, params, headers=None):
+        """Metadata entri untuk halaman ini, atau None."""
+        path = self._path(url, params, headers)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        meta["path"] = path
+        return meta
+
+    def _read_compressed(self, entry):
+        # Entri bisa dihapus proses lain (pruning) setelah lookup; None berarti unduh ulang
+        try:
+            with open(entry["path"], "rb") as f:
+                f.readline()
+                return f.read()
+        except OSError:
+            return None
+
+    def body(self, entry):
+        """Body entri, atau None bila file entri sudah hilang atau rusak."""
+        compressed = self._read_compressed(entry)
+        try:
+            return None if compressed is None else zlib.decompress(compressed)
+        except zlib.error:
+            return None
+
+    def store(self, url, params, response, ttl=0, headers=None):
+        """Menyimpan respons 200 bila punya validator atau sumbernya memakai TTL."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified or ttl):
+            return
+        meta = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "links": response.links,
+            "stored_at": time.time(),
+        }
+        self._write(self._path(url, params, headers), meta, zlib.compress(response.content, 1))
+
+    def touch(self, entry):
+        """
+        Menandai entri masih valid (setelah 304) agar TTL dihitung ulang dari
+        sekarang, lalu mengembalikan body-nya; None bila entri sudah hilang.
+        """
+        compressed = self._read_compressed(entry)
+        if compressed is None:
+            return None
+        meta = {k: v for k, v in entry.items() if k != "path"}
+        meta["stored_at"] = time.time()
+        self._write(entry["path"], meta, compressed)
+        try:
+            return zlib.decompress(compressed)
+        except zlib.error:
+            return None
+
+    def _write(self, path, meta, compressed):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(json.dumps(meta).encode() + b"\n")
+                f.write(compressed)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Gagal menyimpan cache HTTP: {e}")
+
+
+def is_fresh(entry, ttl):
+    """Entri masih dalam TTL sumber sehingga tidak perlu menghubungi server."""
+    return bool(entry and ttl and time.time() - entry["stored_at"] < ttl)
+
+
+def conditional_headers(entry):
+    """Header If-None-Match / If-Modified-Since dari entri cache."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+@st.cache_resource
+def get_response_cache():
+    """Satu ResponseCache per proses; None bila cache HTTP dinonaktifkan."""
+    cache_dir = get_http_cache_dir()
+    return ResponseCache(cache_dir) if cache_dir else None
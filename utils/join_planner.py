@@ -0,0 +1,228 @@
+import time
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+
+JOIN_KEY = "__join_key"
+
+# Join N:M yang diperkirakan menghasilkan lebih dari kelipatan ini dari sisi terbesar dianggap ledakan
+EXPLOSION_FACTOR = 10
+
+# Angka dengan eksponen di atas ini (mis. "1e400") dibiarkan sebagai teks aslinya
+MAX_KEY_DIGITS = 100
+
+
+def build_frames(api_data, aliases):
+    """
+    Mengumpulkan data per alias. DataFrame dan handle (ArtifactHandle,
+    SpilledFrame) diteruskan apa adanya; list of dict dijadikan DataFrame.
+    """
+    frames = {}
+    for alias in aliases:
+        if alias not in api_data:
+            raise KeyError(f"Data untuk alias '{alias}' tidak ditemukan.")
+        data = api_data[alias]
+        frames[alias] = data if isinstance(data, pd.DataFrame) or hasattr(data, "iter_tables") else pd.DataFrame(data)
+    return frames
+
+
+def _normalize_scalar(value):
+    # Angka bulat ditulis tanpa ".0" dan tanpa nol di depan; dihitung lewat int/Decimal
+    # (presisi penuh) agar kunci panjang tidak meluap atau kehilangan digit
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        if value != value:
+            return pd.NA
+        text = repr(float(value))
+    else:
+        text = str(value).strip()
+    if "_" in text:
+        return text
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return text
+    if not number.is_finite() or abs(number.adjusted()) > MAX_KEY_DIGITS:
+        return text
+    text = format(number, "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def normalize_key(values: pd.Series) -> pd.Series:
+    """
+    Menormalkan kolom kunci menjadi string agar "123", 123 dan 123.0 dianggap
+    sama. Normalisasi berlaku per nilai (hasilnya tidak bergantung pada isi
+    kolom lain), sehingga konsisten antar-chunk. Nilai kosong tetap kosong.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype("string")
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype("string")
+    flags = None
+    if values.dtype == object:
+        # factorize menyamakan True dengan 1, jadi bool dinormalkan tersendiri
+        flags = values.map(type).isin([bool, np.bool_])
+        if flags.any():
+            values, booleans = values.where(~flags), values[flags].astype(str)
+        else:
+            flags = None
+    # Dinormalkan per nilai unik: kolom kunci biasanya jauh lebih sedikit nilai uniknya
+    codes, uniques = pd.factorize(values)
+    normalized = np.array([_normalize_scalar(value) for value in uniques] + [pd.NA], dtype=object)
+    result = pd.Series(normalized[codes], index=values.index, dtype="string")
+    if flags is not None:
+        result[flags] = booleans
+    return result
+
+
+def _key_series(df, key):
+    if key not in df.columns:
+        raise KeyError(key)
+    return df[key]
+
+
+def cardinality(left: pd.Series, right: pd.Series):
+    """Label kardinalitas (1:1, 1:N, N:1, N:M) dan perkiraan jumlah baris hasil inner join."""
+    left_counts = left.value_counts()
+    right_counts = right.value_counts()
+    estimate = int((left_counts * right_counts.reindex(left_counts.index, fill_value=0)).sum())
+    label = f"{'N' if (left_counts > 1).any() else '1'}:{'M' if (right_counts > 1).any() else '1'}"
+    return label.replace("1:M", "1:N"), estimate
+
+
+def _can_reorder(rules):
+    # Hanya INNER join yang bisa ditukar urutannya tanpa mengubah hasil
+    return all(rule["join_type"].upper() == "INNER" for rule in rules)
+
+
+def plan_joins(frames, join_rules):
+    """
+    Menyusun urutan eksekusi aturan join. Untuk rangkaian INNER join, aturan
+    yang kuncinya sudah tersedia dan perkiraan hasilnya paling kecil dijalankan
+    lebih dulu agar hasil antara tetap kecil; selain itu urutan asli dipakai.
+    Nama kolom hasil tetap mengikuti urutan asli (lihat `run_join_plan`).
+    """
+    if not _can_reorder(join_rules):
+        return list(join_rules)
+
+    base = frames[join_rules[0]["left_api_alias"]]
+    available = set(base.columns)
+    key_cache = {}
+
+    def estimate(rule):
+        left = frames[rule["left_api_alias"]]
+        if rule["left_on_key"] not in left.columns:
+            return float("inf")
+        cache_key = (rule["left_api_alias"], rule["left_on_key"], rule["right_api_alias"], rule["right_on_key"])
+        if cache_key not in key_cache:
+            right = frames[rule["right_api_alias"]]
+            if rule["right_on_key"] not in right.columns:
+                key_cache[cache_key] = float("inf")
+            else:
+                key_cache[cache_key] = cardinality(
+                    normalize_key(left[rule["left_on_key"]]), normalize_key(right[rule["right_on_key"]])
+                )[1]
+        return key_cache[cache_key]
+
+    pending, ordered = list(join_rules), []
+    while pending:
+        ready = [rule for rule in pending if rule["left_on_key"] in available]
+        rule = min(ready, key=estimate) if ready else pending[0]
+        pending.remove(rule)
+        ordered.append(rule)
+        right = frames[rule["right_api_alias"]]
+        available |= {c if c not in available else f"{c}_{rule['right_api_alias']}" for c in right.columns}
+    return ordered
+
+
+def output_columns(frames, base_alias, numbered_rules):
+    """
+    Nama kolom hasil bila `numbered_rules` (pasangan posisi, aturan) dijalankan
+    berurutan dari tabel `base_alias`, sebagai list pasangan
+    ((posisi aturan, kolom asal), nama hasil). Posisi -1 adalah tabel dasar.
+    Kolom kanan yang bentrok diberi akhiran `_{alias}`; kunci bernama sama
+    digabung menjadi satu kolom.
+    """
+    names = {}
+    for column in frames[base_alias].columns:
+        names[(-1, column)] = column
+    taken = set(names.values())
+    for position, rule in numbered_rules:
+        alias = rule["right_api_alias"]
+        same_key = rule["left_on_key"] == rule["right_on_key"]
+        added = {}
+        for column in frames[alias].columns:
+            if column not in taken:
+                added[(position, column)] = column
+            elif not (same_key and column == rule["right_on_key"]):
+                added[(position, column)] = f"{column}_{alias}"
+        names.update(added)
+        taken |= set(added.values())
+    return list(names.items())
+
+
+def run_join_plan(frames, join_rules):
+    """
+    Mengeksekusi aturan join sesuai rencana dengan kunci yang dinormalkan.
+    Mengembalikan (DataFrame hasil, laporan per langkah, daftar peringatan).
+    """
+    ordered = plan_joins(frames, join_rules)
+    positions = {id(rule): position for position, rule in enumerate(join_rules)}
+    result = frames[join_rules[0]["left_api_alias"]]
+    steps, warnings = [], []
+
+    for i, rule in enumerate(ordered, start=1):
+        start = time.perf_counter()
+        right_alias = rule["right_api_alias"]
+        right = frames[right_alias]
+        left_key = normalize_key(_key_series(result, rule["left_on_key"]))
+        right_key = normalize_key(_key_series(right, rule["right_on_key"]))
+
+        label, estimate = cardinality(left_key, right_key)
+        if label == "N:M" and estimate > EXPLOSION_FACTOR * max(len(result), len(right), 1):
+            warnings.append(
+                f"Langkah {i} ({rule['left_api_alias']}.{rule['left_on_key']} → {right_alias}.{rule['right_on_key']}) "
+                f"adalah join N:M dan diperkirakan menghasilkan {estimate:,} baris."
+            )
+
+        rows_left = len(result)
+        result = pd.merge(
+            left=result.assign(**{JOIN_KEY: left_key}),
+            right=right.assign(**{JOIN_KEY: right_key}),
+            on=JOIN_KEY,
+            how=rule["join_type"].lower(),
+            suffixes=("", f"_{right_alias}"),
+        ).drop(columns=JOIN_KEY)
+        same_key = rule["left_on_key"] == rule["right_on_key"]
+        suffixed = f"{rule['right_on_key']}_{right_alias}"
+        if same_key and suffixed in result.columns:
+            # Seperti merge(left_on=..., right_on=...) dengan nama sama: satu kolom kunci saja
+            result[rule["left_on_key"]] = result[rule["left_on_key"]].fillna(result.pop(suffixed))
+
+        steps.append({
+            "langkah": i,
+            "join": f"{rule['left_api_alias']}.{rule['left_on_key']} {rule['join_type']} {right_alias}.{rule['right_on_key']}",
+            "kardinalitas": label,
+            "baris_kiri": rows_left,
+            "baris_kanan": len(right),
+            "baris_hasil": len(result),
+            "detik": round(time.perf_counter() - start, 3),
+        })
+
+    executed = [(positions[id(rule)], rule) for rule in ordered]
+    original = list(enumerate(join_rules))
+    if executed != original:
+        # Nama dan urutan kolom mengikuti urutan aturan dari pengguna, bukan urutan
+        # eksekusi, agar profil pemetaan (berdasarkan nama kolom) tetap cocok
+        base_alias = join_rules[0]["left_api_alias"]
+        wanted = output_columns(frames, base_alias, original)
+        renamed = dict(wanted)
+        result = result.rename(columns={
+            name: renamed[source] for source, name in output_columns(frames, base_alias, executed)
+        })
+        result = result[[name for _, name in wanted]]
+    return result, steps, warnings
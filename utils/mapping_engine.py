@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from difflib import SequenceMatcher
+
+import pandas as pd
+import streamlit as st
+
+DEFAULT_MAPPING_PROFILE_DIR = os.path.join(".sidama_cache", "mapping_profiles")
+
+# Skor minimum agar sebuah saran dipakai untuk mengisi mapping
+MIN_SCORE = 0.55
+
+# Bobot komponen skor; komponen yang tidak berlaku (mis. enum pada kolom non-enum) tidak dihitung
+WEIGHTS = {"nama": 0.6, "tipe": 0.25, "enum": 0.25, "unik": 0.15}
+
+# Seberapa cocok tipe hasil profil field (baris) dengan tipe kolom tabel (kolom)
+TYPE_COMPATIBILITY = {
+    "integer": {"integer": 1.0, "float": 1.0, "text": 0.6, "enum": 0.3, "boolean": 0.3},
+    "float": {"float": 1.0, "integer": 0.4, "text": 0.5},
+    "boolean": {"boolean": 1.0, "text": 0.5, "integer": 0.3},
+    "date": {"date": 1.0, "timestamp": 0.9, "text": 0.5},
+    "timestamp": {"timestamp": 1.0, "date": 0.7, "text": 0.5},
+    "text": {"text": 1.0, "enum": 0.8, "date": 0.3, "timestamp": 0.3, "integer": 0.2, "float": 0.2, "boolean": 0.2},
+}
+
+
+def get_mapping_profile_dir():
+    """Direktori profil mapping; bisa diatur lewat secrets `MAPPING_PROFILE_DIR`."""
+    try:
+        return st.secrets.get("MAPPING_PROFILE_DIR", DEFAULT_MAPPING_PROFILE_DIR)
+    except Exception:
+        return DEFAULT_MAPPING_PROFILE_DIR
+
+
+def name_tokens(name) -> list:
+    """'mahasiswaId' / 'id_mahasiswa' / 'Mahasiswa-ID' -> ['mahasiswa', 'id'] (tanpa memandang urutan)."""
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", str(name))
+    return sorted(token for token in re.split(r"[^0-9a-zA-Z]+", name.lower()) if token)
+
+
+def name_similarity(field, column) -> float:
+    """Kemiripan nama 0..1: maksimum dari rasio karakter dan irisan token."""
+    field_tokens, column_tokens = name_tokens(field), name_tokens(column)
+    if not field_tokens or not column_tokens:
+        return 0.0
+    ratio = SequenceMatcher(None, "".join(field_tokens), "".join(column_tokens)).ratio()
+    overlap = len(set(field_tokens) & set(column_tokens)) / len(set(field_tokens) | set(column_tokens))
+    return max(ratio, overlap)
+
+
+def is_key_column(column) -> bool:
+    """Kolom kunci (PK/unik) menurut detail kolom; tanpa informasi itu, kolom bernama 'id'."""
+    if "is_primary_key" in column or "is_unique" in column:
+        return bool(column.get("is_primary_key") or column.get("is_unique"))
+    return column["column_name"] == "id"
+
+
+def score_pair(field_stats, spec, key_column) -> dict:
+    """Skor satu pasangan field API -> kolom tabel beserta komponennya."""
+    parts = {
+        "nama": name_similarity(field_stats["field"], spec["name"]),
+        "tipe": TYPE_COMPATIBILITY.get(field_stats["tipe"], {}).get(spec["kind"], 0.0),
+    }
+    if spec["kind"] == "enum" and spec.get("enum_values"):
+        samples = [str(v).strip().lower() for v in field_stats["contoh"]]
+        allowed = {str(v).lower() for v in spec["enum_values"]}
+        parts["enum"] = sum(v in allowed for v in samples) / len(samples) if samples else 0.0
+    if key_column:
+        parts["unik"] = float(field_stats.get("rasio_unik", 0.0))
+    score = sum(WEIGHTS[k] * v for k, v in parts.items()) / sum(WEIGHTS[k] for k in parts)
+    if parts["tipe"] == 0:
+        # Tipe yang tidak mungkin dikonversi: saran hanya bila nama benar-benar sama
+        score *= 0.5
+    return {"skor": round(score, 3), **{k: round(v, 3) for k, v in parts.items()}}
+
+
+def suggest_mapping(profile: pd.DataFrame, specs, key_columns=()) -> pd.DataFrame:
+    """
+    Menilai setiap field (dari profil data) terhadap setiap kolom (dari spesifikasi
+    kolom) lalu memilih pasangan satu-ke-satu secara greedy dari skor tertinggi.
+    Mengembalikan DataFrame saran [field, kolom, skor, komponen...] dengan skor >= MIN_SCORE.
+    """
+    candidates = []
+    for field_stats in profile.to_dict("records"):
+        for spec in specs:
+            result = score_pair(field_stats, spec, spec["name"] in key_columns)
+            if result["skor"] >= MIN_SCORE:
+                candidates.append({"field": field_stats["field"], "kolom": spec["name"], **result})
+
+    chosen, used_fields, used_columns = [], set(), set()
+    for candidate in sorted(candidates, key=lambda c: c["skor"], reverse=True):
+        if candidate["field"] in used_fields or candidate["kolom"] in used_columns:
+            continue
+        chosen.append(candidate)
+        used_fields.add(candidate["field"])
+        used_columns.add(candidate["kolom"])
+    return pd.DataFrame(chosen, columns=["field", "kolom", "skor", "nama", "tipe", "enum", "unik"])
+
+
+# ---------- Profil mapping per (sumber, tabel) ----------
+
+def _profile_path(source_key, table_name):
+    digest = hashlib.sha1(source_key.encode()).hexdigest()[:12]
+    return os.path.join(get_mapping_profile_dir(), f"{table_name}__{digest}.json")
+
+
+def save_mapping_profile(source_key, table_name, mapping, converters=None):
+    """Menyimpan mapping field->kolom dan konverter untuk pasangan (sumber, tabel)."""
+    profile = {
+        "source": source_key,
+        "table": table_name,
+        "mapping": mapping,
+        "converters": converters or {},
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    path = _profile_path(source_key, table_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(profile, f, indent=2, default=str)
+    os.replace(path + ".tmp", path)
+    return profile
+
+
+def load_mapping_profile(source_key, table_name):
+    """Profil mapping tersimpan untuk (sumber, tabel), atau None."""
+    try:
+        with open(_profile_path(source_key, table_name)) as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return profile if profile.get("source") == source_key else None
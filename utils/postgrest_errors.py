@@ -0,0 +1,50 @@
+# Klasifikasi error PostgREST/Postgres untuk menentukan reaksi pemanggil
+# (fallback permanen vs. coba lagi nanti).
+
+import httpx
+
+# Kolom tidak dikenal: Postgres undefined_column / PostgREST schema cache
+MISSING_COLUMN_CODES = {"42703", "PGRST204"}
+# Fungsi RPC tidak ada: PostgREST schema cache / Postgres undefined_function
+MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+# Error sementara: koneksi/pool PostgREST, serialisasi, deadlock, sumber daya, shutdown
+TRANSIENT_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "40001", "40P01", "57014", "57P01", "57P02", "57P03"}
+TRANSIENT_CODE_PREFIXES = ("08", "53")
+
+
+def error_code(error):
+    """Kode error PostgREST (`APIError.code`) sebagai string, atau None."""
+    code = getattr(error, "code", None)
+    if code is None and error.args and isinstance(error.args[0], dict):
+        code = error.args[0].get("code")
+    return None if code is None else str(code)
+
+
+def is_missing_column(error) -> bool:
+    """Query menyebut kolom yang tidak ada di tabel (mis. kolom watermark delta)."""
+    if error_code(error) in MISSING_COLUMN_CODES:
+        return True
+    message = str(getattr(error, "message", None) or error).lower()
+    return "column" in message and "does not exist" in message
+
+
+def is_missing_function(error) -> bool:
+    """RPC yang dipanggil belum dipasang di database."""
+    return error_code(error) in MISSING_FUNCTION_CODES
+
+
+def is_transient(error) -> bool:
+    """
+    Error yang layak dicoba ulang: timeout/koneksi, HTTP 429 atau 5xx, dan
+    kode Postgres untuk koneksi putus atau kontensi. Error lain (4xx, constraint)
+    akan gagal lagi dengan data yang sama.
+    """
+    if isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError)):
+        return True
+    code = error_code(error)
+    if code is None:
+        return False
+    if code.isdigit() and len(code) == 3:
+        # APIError tanpa body JSON membawa status HTTP sebagai kode
+        return code == "429" or code.startswith("5")
+    return code in TRANSIENT_CODES or code.startswith(TRANSIENT_CODE_PREFIXES)
@@ -0,0 +1,151 @@
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.cache import cached
+from utils.schema_validation import FALSE_VALUES, TRUE_VALUES
+
+# Jumlah hash terkecil yang disimpan per kolom (sketsa KMV); di bawah ini hitungan distinct eksak
+SKETCH_SIZE = 2048
+# Nilai terbanyak per chunk yang digabung untuk top-k (perkiraan heavy hitter)
+HEAVY_HITTERS = 100
+TOP_K = 5
+# Jumlah nilai contoh untuk menebak tipe kolom
+TYPE_SAMPLE = 1000
+
+MAX_HASH = float(2 ** 64)
+
+
+def _hashes(values: pd.Series) -> np.ndarray:
+    try:
+        hashed = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+        # Nilai bersarang (dict/list) tidak bisa di-hash langsung
+        hashed = pd.util.hash_pandas_object(values.astype(str), index=False)
+    return hashed.to_numpy(dtype=np.uint64)
+
+
+def _merge_sketch(sketch, hashes: np.ndarray):
+    if len(sketch) == SKETCH_SIZE:
+        # Hanya hash di bawah batas sketsa yang bisa masuk
+        hashes = hashes[hashes < sketch[-1]]
+    if len(hashes) > SKETCH_SIZE:
+        hashes = np.partition(hashes, SKETCH_SIZE - 1)[:SKETCH_SIZE]
+    return np.union1d(sketch, hashes)[:SKETCH_SIZE]
+
+
+def _estimate_distinct(sketch):
+    """Distinct eksak bila sketsa belum penuh; selain itu estimator KMV."""
+    if len(sketch) < SKETCH_SIZE:
+        return len(sketch), False
+    return int((SKETCH_SIZE - 1) * MAX_HASH / float(sketch[-1])), True
+
+
+def _top_counts(values: pd.Series, all_unique):
+    if all_unique:
+        # Semua nilai berbeda: frekuensi tidak informatif, cukup ambil contoh awal
+        return dict.fromkeys(values.head(HEAVY_HITTERS).map(str), 1)
+    try:
+        counts = values.value_counts().head(HEAVY_HITTERS)
+    except TypeError:
+        counts = values.astype(str).value_counts().head(HEAVY_HITTERS)
+    return dict(zip(counts.index.map(str), counts.tolist()))
+
+
+def infer_kind(values: pd.Series) -> str:
+    """Menebak keluarga tipe (seperti `column_kind`) dari contoh nilai yang tidak kosong."""
+    if values.empty:
+        return "text"
+    if pd.api.types.is_bool_dtype(values):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(values):
+        return "integer"
+    if pd.api.types.is_float_dtype(values):
+        return "integer" if (values % 1 == 0).all() else "float"
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "timestamp"
+
+    if values.map(type).eq(bool).all():
+        return "boolean"
+    text = values.astype(str).str.strip()
+    lowered = text.str.lower()
+    if lowered.isin(TRUE_VALUES | FALSE_VALUES).all() and not lowered.isin({"0", "1"}).all():
+        return "boolean"
+    numeric = pd.to_numeric(text, errors="coerce")
+    if numeric.notna().all():
+        return "integer" if (numeric % 1 == 0).all() else "float"
+    dates = pd.to_datetime(text, errors="coerce", format="ISO8601", utc=True)
+    if dates.notna().all():
+        return "date" if text.str.len().le(10).all() else "timestamp"
+    return "text"
+
+
+def profile_frames(frames) -> pd.DataFrame:
+    """
+    Profil per field dalam satu kali lewat atas chunk DataFrame: jumlah distinct
+    (perkiraan KMV untuk data besar), rasio null dan unik, tipe hasil tebakan
+    dan nilai terbanyak. Memori per kolom terbatas sehingga aman untuk data di disk.
+    """
+    fields = {}
+    rows = 0
+    for frame in frames:
+        for name in frame.columns:
+            if name not in fields:
+                fields[name] = {
+                    "nulls": rows, "sketch": np.array([], dtype=np.uint64),
+                    "counts": Counter(), "sample": [], "sampled": 0,
+                }
+            state = fields[name]
+            values = frame[name]
+            present = values.dropna()
+            state["nulls"] += len(values) - len(present)
+            if present.empty:
+                continue
+            hashes = pd.unique(_hashes(present))
+            state["sketch"] = _merge_sketch(state["sketch"], hashes)
+            state["counts"].update(_top_counts(present, len(hashes) == len(present)))
+            if len(state["counts"]) > HEAVY_HITTERS:
+                state["counts"] = Counter(dict(state["counts"].most_common(HEAVY_HITTERS)))
+            if state["sampled"] < TYPE_SAMPLE:
+                state["sample"].append(present.head(TYPE_SAMPLE - state["sampled"]))
+                state["sampled"] += len(state["sample"][-1])
+        for name in fields.keys() - set(frame.columns):
+            # Field yang tidak muncul di chunk ini dihitung null
+            fields[name]["nulls"] += len(frame)
+        rows += len(frame)
+
+    profile = []
+    for name, state in fields.items():
+        distinct, approximate = _estimate_distinct(state["sketch"])
+        present_rows = rows - state["nulls"]
+        sample = pd.concat(state["sample"], ignore_index=True) if state["sample"] else pd.Series(dtype=object)
+        profile.append({
+            "field": name,
+            "tipe": infer_kind(sample),
+            "distinct": distinct,
+            "distinct_perkiraan": approximate,
+            "rasio_null": round(state["nulls"] / rows, 4) if rows else 0.0,
+            "rasio_unik": round(min(distinct / present_rows, 1.0), 4) if present_rows else 0.0,
+            "contoh": [value for value, _ in state["counts"].most_common(TOP_K)],
+        })
+    return pd.DataFrame(profile, columns=[
+        "field", "tipe", "distinct", "distinct_perkiraan", "rasio_null", "rasio_unik", "contoh",
+    ])
+
+
+def dataset_key(source) -> str:
+    """Identitas dataset untuk cache profil: hash isi artefak atau part Parquet di disk."""
+    if hasattr(source, "content_hash"):
+        return source.content_hash
+    parts = [(part, os.path.getmtime(part)) for part in getattr(source, "parts", [])]
+    return f"{getattr(source, 'path', id(source))}:{parts}"
+
+
+@cached(disk=True)
+def get_profile(_source, key: str) -> pd.DataFrame:
+    """Profil dataset, dihitung sekali per `key` (lihat `dataset_key`)."""
+    with st.spinner("Memprofilkan data..."):
+        return profile_frames(_source.iter_frames())
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import threading
+import time
+
+import streamlit as st
+from supabase import Client
+
+from utils.cache import SCHEMA_TAG, get_cache
+from utils.postgrest_errors import is_missing_function
+from utils.schema_validation import build_column_specs
+
+# Jeda minimum (detik) antar pemeriksaan versi katalog ke database
+CATALOG_CHECK_INTERVAL = 60
+
+# Di mode cadangan setiap pemeriksaan mengunduh ulang detail tabel, jadi jedanya lebih panjang
+FALLBACK_CHECK_INTERVAL = 10 * 60
+
+
+class SchemaCatalog:
+    """
+    Katalog skema tabel publik: kolom, nullability, tipe, domain ENUM, primary
+    key dan relasi FK, diambil dengan satu RPC `get_schema_catalog`
+    (lihat `sql/get_schema_catalog.sql`).
+
+    Katalog dipakai bersama seluruh proses. Paling sering sekali per
+    `CATALOG_CHECK_INTERVAL` katalog mengirim versi yang dimilikinya; server
+    hanya mengirim ulang isi katalog bila versinya berubah. Perubahan versi
+    juga membatalkan entri cache bertag `SCHEMA_TAG`.
+
+    Bila RPC katalog belum dipasang, katalog mengisi diri per tabel dengan
+    RPC lama (`get_public_tables`, `get_full_column_details`, `get_enum_values`).
+    Versinya berupa hash isi per tabel, diperiksa tiap `FALLBACK_CHECK_INTERVAL`.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+        self.version = None
+        self.batched = True
+        self._tables = {}  # tabel -> list detail kolom
+        self._table_names = None
+        self._specs = {}  # tabel -> spesifikasi kolom untuk versi saat ini
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---------- Sinkronisasi ----------
+
+    def _refresh(self):
+        interval = CATALOG_CHECK_INTERVAL if self.batched else FALLBACK_CHECK_INTERVAL
+        if time.time() - self._checked_at < interval:
+            return
+        self._checked_at = time.time()
+        try:
+            if not self.batched:
+                self._refresh_fallback()
+                return
+            result = self.supabase.rpc("get_schema_catalog", {"known_version": self.version}).execute()
+        except Exception as e:
+            if self.batched and is_missing_function(e):
+                print(f"RPC get_schema_catalog tidak tersedia, memakai RPC per tabel: {e}")
+                self.batched = False
+                self._reset(None)
+                self._checked_at = 0.0
+                self._refresh()
+                return
+            # Error sementara: katalog yang ada tetap dipakai dan RPC dicoba lagi pada
+            # pemeriksaan berikutnya; tanpa katalog sama sekali, error diteruskan.
+            print(f"Gagal memeriksa versi katalog skema: {e}")
+            if self.version is None:
+                self._checked_at = 0.0
+                raise
+            return
+        catalog = result.data or {}
+        if catalog.get("version") == self.version and self.version is not None:
+            return
+        self._reset(catalog.get("version"))
+        self._tables = catalog.get("tables") or {}
+        self._table_names = sorted(self._tables)
+
+    def _reset(self, version):
+        previous = self.version
+        self.version = version
+        self._tables, self._table_names, self._specs = {}, None, {}
+        if previous is not None and previous != version:
+            get_cache().invalidate(SCHEMA_TAG)
+
+    def refresh(self):
+        """Memaksa pemeriksaan versi pada akses berikutnya (mis. setelah migrasi)."""
+        with self._lock:
+            self._checked_at = 0.0
+
+    # ---------- Mode cadangan (RPC per tabel) ----------
+
+    def _refresh_fallback(self):
+        # Tabel yang sudah dimuat diunduh ulang dan dibandingkan; katalog (beserta
+        # spesifikasi dan cache bertag skema) hanya diganti bila isinya berubah
+        names = self._load_table_names()
+        tables = {name: self._load_table(name) for name in self._tables if name in names}
+        if self.version is not None and names == self._table_names and tables == self._tables:
+            return
+        payload = json.dumps({"tables": names, "columns": tables}, sort_keys=True, default=str)
+        self._reset("fallback:" + hashlib.md5(payload.encode()).hexdigest())
+        self._table_names, self._tables = names, tables
+
+    def _load_table_names(self):
+        result = self.supabase.rpc("get_public_tables").execute()
+        return sorted(row["table_name"] for row in result.data or [])
+
+    def _load_table(self, table_name):
+        result = self.supabase.rpc("get_full_column_details", {"t_name": table_name}).execute()
+        columns = [dict(column) for column in result.data or []]
+        for column in columns:
+            if column.get("data_type") == "USER-DEFINED" and "enum_values" not in column:
+                enum = self.supabase.rpc("get_enum_values", {
+                    "schema_name": "public", "table_name": table_name, "column_name": column["column_name"],
+                }).execute()
+                column["enum_values"] = [row["enum_value"] for row in enum.data or []] or None
+        return columns
+
+    # ---------- API ----------
+
+    def table_names(self):
+        with self._lock:
+            self._refresh()
+            if self._table_names is None:
+                self._table_names = self._load_table_names()
+            return self._table_names
+
+    def columns(self, table_name):
+        """Detail kolom tabel berurutan (list dict); list kosong bila tabel tidak ada."""
+        with self._lock:
+            self._refresh()
+            if table_name not in self._tables and not self.batched:
+                self._tables[table_name] = self._load_table(table_name)
+            return self._tables.get(table_name, [])
+
+    def column_specs(self, table_name):
+        """Spesifikasi validasi kolom, dibangun sekali per (tabel, versi katalog)."""
+        columns = self.columns(table_name)
+        with self._lock:
+            if table_name not in self._specs:
+                enums = {column["column_name"]: column.get("enum_values") or [] for column in columns}
+                self._specs[table_name] = build_column_specs(columns, enums.get)
+            return self._specs[table_name]
+
+    def enum_values(self, table_name, column_name):
+        for column in self.columns(table_name):
+            if column["column_name"] == column_name:
+                return list(column.get("enum_values") or [])
+        return []
+
+
+@st.cache_resource
+def get_schema_catalog(_supabase: Client):
+    """Satu SchemaCatalog per proses, dipakai bersama semua halaman dan sesi."""
+    return SchemaCatalog(_supabase)
+
+
+def get_public_tables(supabase: Client):
+    """Semua nama tabel publik, terurut."""
+    return get_schema_catalog(supabase).table_names()
+
+
+def get_schema_version(supabase: Client):
+    """Versi katalog saat ini (setelah pemeriksaan versi bila intervalnya lewat)."""
+    catalog = get_schema_catalog(supabase)
+    catalog.table_names()
+    return catalog.version
+
+
+def get_table_columns(supabase: Client, table_name: str):
+    """Detail kolom tabel dari katalog skema."""
+    return get_schema_catalog(supabase).columns(table_name)
+
+
+def get_enum_values(supabase: Client, table_name: str, column_name: str):
+    """Semua nilai yang mungkin untuk sebuah kolom ENUM."""
+    return get_schema_catalog(supabase).enum_values(table_name, column_name)
+
+
+def get_column_specs(supabase: Client, table_name: str):
+    """Spesifikasi validasi kolom (tipe, wajib, panjang, nilai ENUM) untuk sebuah tabel."""
+    return get_schema_catalog(supabase).column_specs(table_name)
@@ -0,0 +1,178 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# Keluarga tipe data Postgres (information_schema.columns.data_type)
+INTEGER_TYPES = {"smallint", "integer", "bigint"}
+FLOAT_TYPES = {"numeric", "decimal", "real", "double precision"}
+DATE_TYPES = {"date"}
+TIMESTAMP_TYPES = {"timestamp without time zone", "timestamp with time zone"}
+BOOLEAN_TYPES = {"boolean"}
+ENUM_TYPES = {"USER-DEFINED"}
+
+TRUE_VALUES = {"true", "t", "1", "ya", "y", "yes"}
+FALSE_VALUES = {"false", "f", "0", "tidak", "n", "no"}
+
+ERROR_COLUMN = "alasan_penolakan"
+
+
+def is_required(column) -> bool:
+    """`is_nullable` bisa berupa bool atau 'YES'/'NO' tergantung RPC yang dipakai."""
+    nullable = column.get("is_nullable")
+    if isinstance(nullable, str):
+        return nullable.upper() == "NO"
+    return nullable is False
+
+
+def column_kind(data_type) -> str:
+    """Keluarga tipe untuk validasi; tipe yang tidak dikenal diperlakukan sebagai teks."""
+    data_type = (data_type or "").strip()
+    for kind, types in (
+        ("integer", INTEGER_TYPES),
+        ("float", FLOAT_TYPES),
+        ("date", DATE_TYPES),
+        ("timestamp", TIMESTAMP_TYPES),
+        ("boolean", BOOLEAN_TYPES),
+        ("enum", ENUM_TYPES),
+    ):
+        if data_type in types:
+            return kind
+    return "text"
+
+
+def build_column_specs(columns_details, enum_lookup=None):
+    """
+    Menyusun spesifikasi validasi per kolom dari detail kolom Supabase.
+    `enum_lookup(nama_kolom)` dipanggil untuk kolom ENUM (USER-DEFINED).
+    """
+    specs = []
+    for column in columns_details:
+        kind = column_kind(column.get("data_type"))
+        enum_values = None
+        if kind == "enum" and enum_lookup:
+            enum_values = list(enum_lookup(column["column_name"])) or None
+            if enum_values is None:
+                kind = "text"
+        specs.append({
+            "name": column["column_name"],
+            "kind": kind,
+            "required": is_required(column),
+            "max_length": column.get("character_maximum_length"),
+            "enum_values": enum_values,
+        })
+    return specs
+
+
+def is_blank(values: pd.Series) -> pd.Series:
+    """Nilai kosong: NA atau teks yang hanya berisi spasi (dtype object maupun string pandas)."""
+    blank = values.isna()
+    if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+        blank |= values.astype(object).map(type).eq(str) & values.astype(str).str.strip().eq("")
+    return blank
+
+
+def _coerce_datetime(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    values = values.astype(object)
+    types = values.map(type)
+    is_text = types.eq(str)
+    is_date = values.map(lambda v: isinstance(v, (datetime.date, pd.Timestamp)))
+
+    parsed = pd.to_datetime(values.where(is_date), errors="coerce")
+    text = values.where(is_text).str.strip()
+    try:
+        iso = pd.to_datetime(text, errors="coerce", format="ISO8601")
+        # Sisanya dianggap format lokal (hari lebih dulu), mis. 31/12/2023
+        local = pd.to_datetime(text.where(iso.isna()), errors="coerce", format="mixed", dayfirst=True)
+    except (ValueError, TypeError):
+        iso = pd.to_datetime(text, errors="coerce", format="ISO8601", utc=True).dt.tz_localize(None)
+        local = pd.to_datetime(text.where(iso.isna()), errors="coerce", format="mixed", dayfirst=True, utc=True).dt.tz_localize(None)
+    return parsed.fillna(iso).fillna(local)
+
+
+def _to_text(value):
+    if isinstance(value, float) and value.is_integer():
+        # Angka bulat dari Excel (mis. NIM 2101001.0) ditulis tanpa ".0"
+        return str(int(value))
+    return str(value).strip()
+
+
+def _coerce_text(values: pd.Series) -> pd.Series:
+    return values.astype(object).where(values.notna(), None).map(lambda v: v if v is None else _to_text(v))
+
+
+def coerce_column(values: pd.Series, spec):
+    """Mengonversi satu kolom sesuai tipe; mengembalikan (nilai baru, mask nilai tidak valid, pesan)."""
+    kind = spec["kind"]
+    present = ~is_blank(values)
+
+    if kind in ("integer", "float"):
+        coerced = pd.to_numeric(values.where(present), errors="coerce")
+        bad = present & coerced.isna()
+        if kind == "integer":
+            fractional = coerced.notna() & (coerced % 1 != 0)
+            bad |= fractional
+            coerced = coerced.where(~fractional).astype("Int64")
+        return coerced, bad, "bukan angka yang valid" if kind == "float" else "bukan bilangan bulat"
+
+    if kind in ("date", "timestamp"):
+        coerced = _coerce_datetime(values.where(present))
+        bad = present & coerced.isna()
+        if kind == "date":
+            coerced = coerced.dt.strftime("%Y-%m-%d").where(coerced.notna(), None)
+        return coerced, bad, "format tanggal tidak dikenali"
+
+    if kind == "boolean":
+        if pd.api.types.is_bool_dtype(values):
+            return values, pd.Series(False, index=values.index), ""
+        text = values.astype(str).str.strip().str.lower()
+        coerced = pd.Series(np.select([text.isin(TRUE_VALUES), text.isin(FALSE_VALUES)], [True, False], default=None),
+                            index=values.index, dtype=object).where(present, None)
+        return coerced, present & coerced.isna(), "bukan nilai ya/tidak"
+
+    coerced = _coerce_text(values).where(present, None)
+    if kind == "enum":
+        bad = present & ~coerced.isin(spec["enum_values"])
+        return coerced, bad, f"bukan salah satu dari: {', '.join(spec['enum_values'])}"
+
+    max_length = spec.get("max_length")
+    if max_length:
+        bad = present & coerced.str.len().gt(int(max_length))
+        return coerced, bad, f"lebih dari {int(max_length)} karakter"
+    return coerced, pd.Series(False, index=values.index), ""
+
+
+def validate_frame(df: pd.DataFrame, specs):
+    """
+    Validasi dan konversi kolom-per-kolom secara vektor.
+
+    Mengembalikan (df_valid, df_ditolak): df_valid berisi baris yang lolos
+    dengan nilai yang sudah dikonversi; df_ditolak berisi baris asli yang
+    gagal beserta kolom `alasan_penolakan`.
+    """
+    coerced = pd.DataFrame(index=df.index)
+    errors = pd.Series("", index=df.index, dtype=object)
+    spec_by_name = {spec["name"]: spec for spec in specs}
+
+    for column in df.columns:
+        spec = spec_by_name.get(column)
+        if spec is None:
+            # Kolom di luar skema tidak dikirim
+            continue
+        values, bad, message = coerce_column(df[column], spec)
+        if spec["required"]:
+            missing = values.isna() & ~bad
+            errors = errors.where(~missing, errors + f"{column}: wajib diisi; ")
+        if bad.any():
+            errors = errors.where(~bad, errors + f"{column}: {message}; ")
+        coerced[column] = values
+
+    for spec in specs:
+        if spec["required"] and spec["name"] not in df.columns:
+            errors = errors + f"{spec['name']}: kolom wajib tidak ada; "
+
+    error_mask = errors.ne("")
+    rejected = df[error_mask].assign(**{ERROR_COLUMN: errors[error_mask].str.rstrip("; ")})
+    return coerced[~error_mask], rejected
@@ -0,0 +1,152 @@
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import get_data_store
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text) -> str:
+    """Huruf kecil, tanpa diakritik, spasi dirapikan."""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _postings(index):
+    return {key: np.fromiter(sorted(rows), dtype=np.int32, count=len(rows)) for key, rows in index.items()}
+
+
+class StudentSearchIndex:
+    """
+    Indeks pencarian mahasiswa berdasarkan NIM dan nama.
+
+    Mendukung NIM persis, awalan NIM, awalan token nama, serta substring
+    nama/NIM lewat posting list trigram yang kandidatnya diverifikasi ulang,
+    sehingga hasilnya sama dengan `str.contains` tanpa memindai seluruh baris.
+    Kueri yang lebih pendek dari trigram memindai kolom nama/NIM secara langsung.
+    """
+
+    def __init__(self, ids, nims, names):
+        self._ids = np.asarray(ids)
+        self._nims = [normalize(nim) for nim in nims]
+        self._names = [normalize(name) for name in names]
+        self._name_series = pd.Series(self._names, dtype=object)
+        self._nim_series = pd.Series(self._nims, dtype=object)
+
+        self._nim_exact = defaultdict(list)
+        for row, nim in enumerate(self._nims):
+            if nim:
+                self._nim_exact[nim].append(row)
+        nim_sorted = sorted((nim, row) for row, nim in enumerate(self._nims) if nim)
+        self._nim_keys = [nim for nim, _ in nim_sorted]
+        self._nim_rows = np.asarray([row for _, row in nim_sorted], dtype=np.int32)
+
+        tokens = defaultdict(set)
+        name_grams = defaultdict(set)
+        nim_grams = defaultdict(set)
+        for row, (name, nim) in enumerate(zip(self._names, self._nims)):
+            for token in name.split(" "):
+                if token:
+                    tokens[token].add(row)
+            for gram in _trigrams(name):
+                name_grams[gram].add(row)
+            for gram in _trigrams(nim):
+                nim_grams[gram].add(row)
+
+        self._token_keys = sorted(tokens)
+        self._tokens = _postings(tokens)
+        self._name_grams = _postings(name_grams)
+        self._nim_grams = _postings(nim_grams)
+
+    def __len__(self):
+        return len(self._ids)
+
+    @staticmethod
+    def _prefix_range(keys, query):
+        start = bisect.bisect_left(keys, query)
+        end = bisect.bisect_right(keys, query + "\U0010ffff", lo=start)
+        return start, end
+
+    def _substring_rows(self, grams, texts, query):
+        postings = []
+        for gram in _trigrams(query):
+            posting = grams.get(gram)
+            if posting is None:
+                return np.empty(0, dtype=np.int32)
+            postings.append(posting)
+        if len(query) == 3:
+            # Kueri tepat satu trigram: posting list sudah merupakan hasil akhir
+            return postings[0]
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                break
+        return np.fromiter((row for row in candidates if query in texts[row]), dtype=np.int32)
+
+    def search_rows(self, query) -> np.ndarray:
+        """Posisi baris yang cocok, terurut sesuai urutan data asli."""
+        query = normalize(query)
+        if not query:
+            return np.arange(len(self._ids), dtype=np.int32)
+        if len(query) < 3:
+            # Tidak ada trigram untuk kueri pendek: pindai substring seperti `str.contains`
+            matches = self._name_series.str.contains(query, regex=False)
+            matches |= self._nim_series.str.contains(query, regex=False)
+            return np.flatnonzero(matches.to_numpy()).astype(np.int32)
+
+        # Awalan NIM sudah mencakup NIM yang persis sama
+        start, end = self._prefix_range(self._nim_keys, query)
+        parts = [self._nim_rows[start:end]]
+        start, end = self._prefix_range(self._token_keys, query)
+        parts += [self._tokens[token] for token in self._token_keys[start:end]]
+        parts.append(self._substring_rows(self._name_grams, self._names, query))
+        parts.append(self._substring_rows(self._nim_grams, self._nims, query))
+        return np.unique(np.concatenate(parts))
+
+    def find_nim(self, nim) -> np.ndarray:
+        """`mahasiswa_id` dengan NIM yang persis sama."""
+        return self._ids[np.asarray(self._nim_exact.get(normalize(nim), []), dtype=np.int32)]
+
+    def search(self, query) -> np.ndarray:
+        """`mahasiswa_id` yang cocok dengan kueri."""
+        return self._ids[self.search_rows(query)]
+
+    def mask(self, query, ids: pd.Series) -> pd.Series:
+        """Mask boolean untuk `ids` (mis. kolom mahasiswa_id) yang cocok dengan kueri."""
+        return ids.isin(self.search(query))
+
+
+def build_search_index(df: pd.DataFrame) -> StudentSearchIndex:
+    """Membangun indeks dari frame yang memiliki mahasiswa_id, nim dan nama_lengkap."""
+    missing = [None] * len(df)
+    return StudentSearchIndex(
+        df["mahasiswa_id"],
+        df["nim"] if "nim" in df.columns else missing,
+        df["nama_lengkap"] if "nama_lengkap" in df.columns else missing,
+    )
+
+
+def get_search_index(source: str, frame_builder=None, name="search_index") -> StudentSearchIndex:
+    """
+    Indeks pencarian untuk snapshot `source` di DataStore bersama.
+
+    Indeks dibangun sekali per versi snapshot dan ikut diganti bersamanya.
+    `frame_builder` opsional mengubah frame snapshot sebelum diindeks.
+    """
+    def builder(frame):
+        return build_search_index(frame_builder(frame) if frame_builder else frame)
+    return get_data_store().derived(source, name, builder)
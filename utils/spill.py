@@ -0,0 +1,284 @@
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.join_planner import EXPLOSION_FACTOR, JOIN_KEY, cardinality, normalize_key
+
+DEFAULT_SPILL_DIR = os.path.join(".sidama_cache", "spill")
+DEFAULT_SPILL_ROWS = 50_000
+DEFAULT_PARTITIONS = 16
+# Direktori spill sesi yang tidak disentuh selama ini (jam) dianggap milik sesi yang sudah berakhir
+DEFAULT_SESSION_TTL_HOURS = 24
+
+
+def get_spill_config():
+    """Direktori spill, ukuran part dan jumlah partisi hash dari secrets bagian [spill] (jika ada)."""
+    config = {
+        "dir": DEFAULT_SPILL_DIR,
+        "rows": DEFAULT_SPILL_ROWS,
+        "partitions": DEFAULT_PARTITIONS,
+        "session_ttl_hours": DEFAULT_SESSION_TTL_HOURS,
+    }
+    try:
+        config.update({k: type(config[k])(v) for k, v in st.secrets.get("spill", {}).items() if k in config})
+    except Exception:
+        pass
+    return config
+
+
+def prune_session_dirs(root, max_age, keep=None):
+    """Menghapus direktori sesi di `root` yang tidak disentuh lebih dari `max_age` detik."""
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(root):
+        if entry.name == keep or not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def session_spill_dir(reset=False):
+    """
+    Direktori spill milik sesi Streamlit ini; `reset` menghapus isinya. Saat
+    sesi baru membuat direktorinya, direktori sesi lain yang sudah kedaluwarsa
+    (lihat `session_ttl_hours`) ikut dibersihkan.
+    """
+    config = get_spill_config()
+    if "spill_session_id" not in st.session_state:
+        st.session_state.spill_session_id = uuid.uuid4().hex
+        prune_session_dirs(config["dir"], config["session_ttl_hours"] * 3600, keep=st.session_state.spill_session_id)
+    path = os.path.join(config["dir"], st.session_state.spill_session_id)
+    if reset and os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    # Menandai direktori masih dipakai agar tidak terhapus selama sesi aktif
+    os.utime(path)
+    return path
+
+
+def to_arrow_array(values):
+    """List nilai Python -> array Arrow; kolom bertipe campuran disimpan sebagai teks."""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+class SpillWriter:
+    """Menulis chunk kolom/DataFrame sebagai part Parquet berurutan di satu direktori."""
+
+    def __init__(self, path):
+        self.path = path
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        self._parts = 0
+
+    def write_columns(self, columns):
+        if columns and len(next(iter(columns.values()))):
+            self.write_table(pa.table({name: to_arrow_array(values) for name, values in columns.items()}))
+
+    def write_table(self, table: pa.Table):
+        if table.num_rows:
+            pq.write_table(table, os.path.join(self.path, f"part-{self._parts:05d}.parquet"))
+            self._parts += 1
+
+    def close(self):
+        return SpilledFrame(self.path)
+
+
+class SpilledFrame:
+    """
+    Handle ke data kolumnar di disk (direktori part Parquet). Yang disimpan di
+    session state hanya handle ini; data dibaca per part saat dibutuhkan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._schema = None
+
+    @property
+    def parts(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith(".parquet"))
+
+    def __len__(self):
+        return sum(pq.ParquetFile(part).metadata.num_rows for part in self.parts)
+
+    @property
+    def schema(self) -> pa.Schema:
+        """Skema gabungan semua part; kolom dengan tipe bertentangan dijadikan string."""
+        if self._schema is None:
+            schemas = [pq.read_schema(part) for part in self.parts]
+            try:
+                self._schema = pa.unify_schemas(schemas, promote_options="permissive") if schemas else pa.schema([])
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                fields = {}
+                for schema in schemas:
+                    for field in schema:
+                        known = fields.get(field.name)
+                        if known is None or pa.types.is_null(known.type):
+                            fields[field.name] = field
+                        elif not pa.types.is_null(field.type) and known.type != field.type:
+                            fields[field.name] = pa.field(field.name, pa.string())
+                self._schema = pa.schema(list(fields.values()))
+        return self._schema
+
+    @property
+    def columns(self):
+        return self.schema.names
+
+    def iter_tables(self, columns=None):
+        schema = self.schema
+        for part in self.parts:
+            table = pq.read_table(part)
+            for field in schema:
+                if field.name not in table.column_names:
+                    table = table.append_column(field, pa.nulls(table.num_rows, field.type))
+            table = table.select(schema.names).cast(schema)
+            yield table.select(columns) if columns else table
+
+    def iter_frames(self, columns=None):
+        for table in self.iter_tables(columns):
+            yield table.to_pandas()
+
+    def head(self, n=1000) -> pd.DataFrame:
+        tables, rows = [], 0
+        for table in self.iter_tables():
+            tables.append(table.slice(0, n - rows))
+            rows += tables[-1].num_rows
+            if rows >= n:
+                break
+        return pa.concat_tables(tables).to_pandas() if tables else pd.DataFrame(columns=self.columns)
+
+
+def spill_frame(df: pd.DataFrame, path, rows_per_part=None) -> SpilledFrame:
+    """Menulis DataFrame yang sudah ada di memori ke direktori spill."""
+    rows_per_part = rows_per_part or get_spill_config()["rows"]
+    writer = SpillWriter(path)
+    for start in range(0, len(df), rows_per_part):
+        writer.write_table(pa.Table.from_pandas(df.iloc[start:start + rows_per_part], preserve_index=False))
+    return writer.close()
+
+
+def _partition(source: SpilledFrame, key, path, partitions):
+    """
+    Mempartisi sumber berdasarkan hash kunci yang dinormalkan ke `partitions`
+    file Parquet. Kolom JOIN_KEY ikut ditulis agar tidak dihitung ulang.
+    """
+    schema = source.schema
+    if key not in schema.names:
+        raise KeyError(key)
+    os.makedirs(path, exist_ok=True)
+    out_schema = schema.append(pa.field(JOIN_KEY, pa.string()))
+    writers = {}
+    try:
+        for table in source.iter_tables():
+            keys = normalize_key(table.column(key).to_pandas())
+            buckets = (pd.util.hash_pandas_object(keys, index=False).to_numpy() % partitions).astype(np.int64)
+            order = np.argsort(buckets, kind="stable")
+            counts = np.bincount(buckets, minlength=partitions)
+            table = table.append_column(JOIN_KEY, pa.array(keys.to_numpy(dtype=object), type=pa.string())).take(order)
+            start = 0
+            for bucket, count in enumerate(counts):
+                if count:
+                    if bucket not in writers:
+                        writers[bucket] = pq.ParquetWriter(os.path.join(path, f"p{bucket:04d}.parquet"), out_schema)
+                    writers[bucket].write_table(table.slice(start, count))
+                    start += count
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+
+def _read_partition(path, bucket):
+    file = os.path.join(path, f"p{bucket:04d}.parquet")
+    return pq.read_table(file).to_pandas() if os.path.exists(file) else None
+
+
+def spill_join(sources, join_rules, work_dir, partitions=None):
+    """
+    Join out-of-core: setiap aturan dijalankan sebagai hash-partitioned join
+    di atas file Parquet, sehingga yang ada di memori hanya satu pasang
+    partisi pada satu waktu. `sources` berisi {alias: SpilledFrame}.
+    Mengembalikan (SpilledFrame hasil, laporan per langkah, peringatan).
+    """
+    partitions = partitions or get_spill_config()["partitions"]
+    result = sources[join_rules[0]["left_api_alias"]]
+    steps, warnings = [], []
+
+    for i, rule in enumerate(join_rules, start=1):
+        start = time.perf_counter()
+        right_alias = rule["right_api_alias"]
+        right = sources[right_alias]
+        step_dir = os.path.join(work_dir, f"step{i}")
+        shutil.rmtree(step_dir, ignore_errors=True)
+        _partition(result, rule["left_on_key"], os.path.join(step_dir, "left"), partitions)
+        _partition(right, rule["right_on_key"], os.path.join(step_dir, "right"), partitions)
+        if i > 1:
+            # Hasil langkah sebelumnya sudah dipartisi ulang; tidak diperlukan lagi
+            shutil.rmtree(os.path.join(work_dir, f"step{i - 1}"), ignore_errors=True)
+
+        how = rule["join_type"].lower()
+        writer = SpillWriter(os.path.join(step_dir, "out"))
+        left_many = right_many = False
+        estimate = rows_left = rows_right = rows_out = 0
+        left_columns, right_columns = result.columns, right.columns
+        same_key = rule["left_on_key"] == rule["right_on_key"]
+        suffixed = f"{rule['right_on_key']}_{right_alias}"
+
+        for bucket in range(partitions):
+            left_df = _read_partition(os.path.join(step_dir, "left"), bucket)
+            right_df = _read_partition(os.path.join(step_dir, "right"), bucket)
+            if left_df is None and right_df is None:
+                continue
+            if left_df is None:
+                left_df = pd.DataFrame(columns=left_columns + [JOIN_KEY])
+            if right_df is None:
+                right_df = pd.DataFrame(columns=right_columns + [JOIN_KEY])
+            rows_left += len(left_df)
+            rows_right += len(right_df)
+
+            part_label, part_estimate = cardinality(left_df[JOIN_KEY], right_df[JOIN_KEY])
+            left_many |= part_label[0] == "N"
+            right_many |= part_label[-1] in ("N", "M")
+            estimate += part_estimate
+
+            merged = pd.merge(left_df, right_df, on=JOIN_KEY, how=how, suffixes=("", f"_{right_alias}")).drop(columns=JOIN_KEY)
+            if same_key and suffixed in merged.columns:
+                merged[rule["left_on_key"]] = merged[rule["left_on_key"]].fillna(merged.pop(suffixed))
+            rows_out += len(merged)
+            if len(merged):
+                writer.write_table(pa.Table.from_pandas(merged, preserve_index=False))
+
+        label = {(False, False): "1:1", (False, True): "1:N", (True, False): "N:1", (True, True): "N:M"}[(left_many, right_many)]
+        if label == "N:M" and estimate > EXPLOSION_FACTOR * max(rows_left, rows_right, 1):
+            warnings.append(
+                f"Langkah {i} ({rule['left_api_alias']}.{rule['left_on_key']} → {right_alias}.{rule['right_on_key']}) "
+                f"adalah join N:M dan diperkirakan menghasilkan {estimate:,} baris."
+            )
+        result = writer.close()
+        shutil.rmtree(os.path.join(step_dir, "left"), ignore_errors=True)
+        shutil.rmtree(os.path.join(step_dir, "right"), ignore_errors=True)
+
+        steps.append({
+            "langkah": i,
+            "join": f"{rule['left_api_alias']}.{rule['left_on_key']} {rule['join_type']} {right_alias}.{rule['right_on_key']}",
+            "kardinalitas": label,
+            "baris_kiri": rows_left,
+            "baris_kanan": rows_right,
+            "baris_hasil": rows_out,
+            "detik": round(time.perf_counter() - start, 3),
+        })
+    return result, steps, warnings
@@ -0,0 +1,44 @@
+import pandas as pd
+from supabase import Client
+
+from utils.academic_rules import classify_students
+from utils.data_store import get_data_store, get_tables
+
+POLA_STUDI_SOURCE = "get_analisis_pola_studi"
+
+IDENTITY_COLUMNS = ["nama_lengkap", "nim", "program_studi", "tahun_masuk"]
+
+
+def build_student_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ringkasan per mahasiswa dalam satu groupby().agg(): total SKS lulus,
+    jumlah semester aktif, serta IPK/IPS terakhir.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["mahasiswa_id"] + IDENTITY_COLUMNS + [
+            "total_sks", "semester_aktif", "ipk_terakhir", "ips_terakhir",
+        ])
+
+    aggregations = {column: (column, "first") for column in IDENTITY_COLUMNS if column in df.columns}
+    aggregations.update(
+        total_sks=("sks_lulus_semester", "sum"),
+        semester_aktif=("semester_id", "nunique"),
+        ipk_terakhir=("ipk", "last"),
+        ips_terakhir=("ips", "last"),
+    )
+    return df.groupby("mahasiswa_id", sort=False).agg(**aggregations).reset_index()
+
+
+def get_student_summary(supabase: Client):
+    """
+    Mengembalikan (df_semester, df_summary) untuk Analisis Pola Studi.
+
+    Ringkasan beserta klasifikasi status studi dan peringatan dini dihitung
+    sekali per versi snapshot RPC dan dibagikan tanpa salinan; filter halaman
+    cukup diterapkan ke ringkasan ini.
+    """
+    frames, _ = get_tables(supabase, [POLA_STUDI_SOURCE])
+    summary = get_data_store().derived(
+        POLA_STUDI_SOURCE, "student_summary", lambda df: classify_students(build_student_summary(df))
+    )
+    return frames[POLA_STUDI_SOURCE], summary
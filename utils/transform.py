@@ -0,0 +1,80 @@
+import pandas as pd
+
+from utils.schema_validation import is_blank, validate_frame
+
+
+def default_converters(specs):
+    """Konverter awal dari spesifikasi kolom: teks dan ENUM di-trim, sisanya apa adanya."""
+    return {
+        spec["name"]: {
+            "trim": spec["kind"] in ("text", "enum"),
+            "date_format": None,
+            "enum_map": {},
+            "default": None,
+        }
+        for spec in specs
+    }
+
+
+def project(frame: pd.DataFrame, mapping) -> pd.DataFrame:
+    """Proyeksi field API -> kolom tabel secara kolumnar (field ganda ke satu kolom: yang terakhir menang)."""
+    frame = frame[[field for field in mapping if field in frame.columns]].rename(columns=mapping)
+    return frame.loc[:, ~frame.columns.duplicated(keep="last")]
+
+
+def _trim(values: pd.Series) -> pd.Series:
+    is_text = values.astype(object).map(type).eq(str)
+    if not is_text.any():
+        return values
+    return values.astype(object).where(~is_text, values.astype(str).str.strip())
+
+
+def _remap_enum(values: pd.Series, enum_values, enum_map) -> pd.Series:
+    # Nilai ENUM dicocokkan tanpa memandang huruf besar/kecil dan spasi, ditambah peta manual
+    lookup = {str(v).strip().lower(): v for v in enum_values or []}
+    lookup.update({str(k).strip().lower(): v for k, v in (enum_map or {}).items()})
+    if not lookup:
+        return values
+    mapped = values.astype(str).str.strip().str.lower().map(lookup)
+    return values.astype(object).where(mapped.isna() | values.isna(), mapped)
+
+
+def _parse_dates(values: pd.Series, date_format) -> pd.Series:
+    parsed = pd.to_datetime(values.where(~is_blank(values)), format=date_format, errors="coerce")
+    # Nilai yang tidak cocok format dibiarkan agar validasi berikutnya yang menolak/menebak
+    return values.astype(object).where(parsed.isna(), parsed.astype(object))
+
+
+def apply_converters(df: pd.DataFrame, specs, converters) -> pd.DataFrame:
+    """Menjalankan trim, parse tanggal, remap ENUM dan nilai default per kolom."""
+    df = df.copy()
+    spec_by_name = {spec["name"]: spec for spec in specs}
+    for column, converter in (converters or {}).items():
+        spec = spec_by_name.get(column)
+        default = converter.get("default")
+        if column not in df.columns:
+            if default not in (None, "") and spec is not None:
+                df[column] = default
+            continue
+        values = df[column]
+        if converter.get("trim"):
+            values = _trim(values)
+        if converter.get("date_format"):
+            values = _parse_dates(values, converter["date_format"])
+        if spec is not None and spec["kind"] == "enum":
+            values = _remap_enum(values, spec.get("enum_values"), converter.get("enum_map"))
+        if default not in (None, ""):
+            values = values.astype(object).where(~is_blank(values), default)
+        df[column] = values
+    return df
+
+
+def transform_frame(frame: pd.DataFrame, mapping, specs, converters=None):
+    """
+    Tahap transformasi: proyeksi mapping, konverter deklaratif, lalu cast ke
+    tipe kolom dan validasi (`validate_frame`). Kolom yang tidak di-map tidak
+    divalidasi (bisa punya nilai default di database). Mengembalikan (baris
+    siap insert, baris ditolak beserta alasannya).
+    """
+    df = apply_converters(project(frame, mapping), specs, converters)
+    return validate_frame(df, [spec for spec in specs if spec["name"] in df.columns])